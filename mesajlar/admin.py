@@ -1,7 +1,13 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models.functions import Substr
 from django.utils import timezone
-from datetime import timedelta
-from .models import Mesaj, Kategori, Etiket
+from datetime import datetime, time, timedelta
+from .models import ArsivMesaj, Mesaj, Kategori, Etiket, Gorev
+from . import arsiv
+from .sayfalama import TahminiSayfalayici
 from django.utils.html import mark_safe
 
 # Admin site adını ve başlığını değiştirme
@@ -24,23 +30,33 @@ class TarihAraligi(admin.SimpleListFilter):
         )
 
     def queryset(self, request, queryset):
-        if self.value() == 'today':
-            return queryset.filter(tarih__date=timezone.now().date())
-        if self.value() == 'yesterday':
-            return queryset.filter(tarih__date=timezone.now().date() - timedelta(days=1))
-        if self.value() == 'this_week':
-            start_of_week = timezone.now().date() - timedelta(days=timezone.now().weekday())
-            return queryset.filter(tarih__date__gte=start_of_week)
-        if self.value() == 'this_month':
-            today = timezone.now().date()
-            start_of_month = today.replace(day=1)
-            return queryset.filter(tarih__date__gte=start_of_month)
-        if self.value() == 'last_month':
-            today = timezone.now().date()
-            first_day_this_month = today.replace(day=1)
-            last_day_last_month = first_day_this_month - timedelta(days=1)
-            first_day_last_month = last_day_last_month.replace(day=1)
-            return queryset.filter(tarih__date__gte=first_day_last_month, tarih__date__lte=last_day_last_month)
+        # tarih__date yerine yarı açık aralıklar: tarih indeksi kullanılabilir
+        aralik = self.aralik(self.value())
+        if aralik:
+            baslangic, bitis = aralik
+            queryset = queryset.filter(tarih__gte=baslangic)
+            return queryset.filter(tarih__lt=bitis) if bitis else queryset
+
+    @staticmethod
+    def aralik(deger):
+        """Seçeneği yerel saat dilimindeki (başlangıç, bitiş) anlarına çevirir"""
+        bugun = timezone.localdate()
+
+        def gun_basi(gun):
+            return timezone.make_aware(datetime.combine(gun, time.min))
+
+        if deger == 'today':
+            return gun_basi(bugun), gun_basi(bugun + timedelta(days=1))
+        if deger == 'yesterday':
+            return gun_basi(bugun - timedelta(days=1)), gun_basi(bugun)
+        if deger == 'this_week':
+            return gun_basi(bugun - timedelta(days=bugun.weekday())), None
+        if deger == 'this_month':
+            return gun_basi(bugun.replace(day=1)), None
+        if deger == 'last_month':
+            bu_ay = bugun.replace(day=1)
+            return gun_basi((bu_ay - timedelta(days=1)).replace(day=1)), gun_basi(bu_ay)
+        return None
 
 class IcerikUzunlugu(admin.SimpleListFilter):
     """İçerik uzunluğuna göre filtreler"""
@@ -55,20 +71,64 @@ class IcerikUzunlugu(admin.SimpleListFilter):
         )
 
     def queryset(self, request, queryset):
+        # Önceden hesaplanmış ve indeksli icerik_uzunlugu sütunu kullanılır
         if self.value() == 'short':
-            return queryset.filter(icerik__length__lte=100)
+            return queryset.filter(icerik_uzunlugu__lte=100)
         if self.value() == 'medium':
-            return queryset.filter(icerik__length__gt=100, icerik__length__lte=300)
+            return queryset.filter(icerik_uzunlugu__gt=100, icerik_uzunlugu__lte=300)
         if self.value() == 'long':
-            return queryset.filter(icerik__length__gt=300)
+            return queryset.filter(icerik_uzunlugu__gt=300)
+
+class OtomatikTamamlamaFiltresi(admin.RelatedFieldListFilter):
+    """İlişkili tablonun tüm satırlarını listelemek yerine arama kutusu gösteren filtre.
+
+    Seçenekler admin'in autocomplete uç noktasından gelir; ilgili modelin
+    admin sınıfında search_fields tanımlı olmalıdır.
+    """
+    template = 'admin/mesajlar/otomatik_tamamlama_filtresi.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        # Autocomplete uç noktası alanı kaynak modelden çözer
+        self.app_label = field.model._meta.app_label
+        self.model_name = field.model._meta.model_name
+
+    def field_choices(self, field, request, model_admin):
+        # Yalnızca seçili değer yüklenir
+        secili = [pk for pk in self.lookup_val or [] if pk.isdigit()]
+        if not secili:
+            return []
+        return [(nesne.pk, str(nesne)) for nesne in field.related_model._default_manager.filter(pk__in=secili)]
+
+    def has_output(self):
+        return True
+
+class MesajChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        # Liste yalnızca içeriğin başını gösterir, tam metin okunmaz
+        return (
+            super().get_queryset(request, exclude_parameters)
+            .defer('icerik')
+            .annotate(ozet=Substr('icerik', 1, 51))
+        )
 
 @admin.register(Mesaj)
 class MesajAdmin(admin.ModelAdmin):
     list_display = ('baslik', 'yazar', 'tarih', 'icerik_kisaltilmis', 'yorum_sayisi')
-    list_filter = ('tarih', 'yazar', TarihAraligi, IcerikUzunlugu)
+    list_select_related = ('yazar',)
+    list_filter = (
+        'tarih',
+        ('yazar', OtomatikTamamlamaFiltresi),
+        ('kategori', OtomatikTamamlamaFiltresi),
+        TarihAraligi,
+        IcerikUzunlugu,
+    )
     search_fields = ('baslik', 'icerik', 'yazar__username')
-    date_hierarchy = 'tarih'
+    autocomplete_fields = ('yazar', 'kategori', 'etiketler')
     list_per_page = 20
+    # Büyük tablolarda her sayfada iki kez COUNT(*) çalışmasın
+    paginator = TahminiSayfalayici
+    show_full_result_count = False
     list_display_links = ('baslik',)
     readonly_fields = ('tarih', 'preview_text')
     fieldsets = (
@@ -87,7 +147,10 @@ class MesajAdmin(admin.ModelAdmin):
     
     # Liste görünümünde görüntülenecek içeriği kısaltır
     def icerik_kisaltilmis(self, obj):
-        return obj.icerik[:50] + '...' if len(obj.icerik) > 50 else obj.icerik
+        icerik = getattr(obj, 'ozet', None)
+        if icerik is None:
+            icerik = obj.icerik
+        return icerik[:50] + '...' if len(icerik) > 50 else icerik
     icerik_kisaltilmis.short_description = 'İçerik'
     
     # Mesajın HTML formatında önizlemesi
@@ -100,11 +163,50 @@ class MesajAdmin(admin.ModelAdmin):
         return 0  # Şu anda yorum özelliği olmadığı için 0 döner
     yorum_sayisi.short_description = 'Yorum Sayısı'
     
+    def get_changelist(self, request, **kwargs):
+        return MesajChangeList
+
+    @property
+    def media(self):
+        # Liste filtrelerindeki arama kutuları için select2 ve yönlendirme betiği
+        autocomplete = AutocompleteSelect(Mesaj._meta.get_field('yazar'), self.admin_site).media
+        return super().media + autocomplete + forms.Media(js=['mesajlar/admin/otomatik_tamamlama_filtresi.js'])
+    
     def save_model(self, request, obj, form, change):
         if not change:  # Yeni bir nesne oluşturuyorsa
             obj.yazar = request.user
         super().save_model(request, obj, form, change)
 
+@admin.register(ArsivMesaj)
+class ArsivMesajAdmin(admin.ModelAdmin):
+    """Arşive taşınmış mesajlar; salt okunurdur, gerekirse geri yüklenir"""
+    # Yazar ve kategori başka veritabanında olabilir; listede yalnızca id'leri gösterilir
+    list_display = ('baslik', 'yazar_id', 'tarih', 'arsivlenme')
+    list_filter = (TarihAraligi, IcerikUzunlugu)
+    search_fields = ('baslik',)
+    list_per_page = 20
+    paginator = TahminiSayfalayici
+    show_full_result_count = False
+    actions = ['geri_yukle']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description='Seçili mesajları arşivden geri yükle', permissions=['delete'])
+    def geri_yukle(self, request, queryset):
+        sayi, atlanan = arsiv.geri_yukle(list(queryset.values_list('pk', flat=True)))
+        self.message_user(request, f'{sayi} mesaj arşivden geri yüklendi.')
+        if atlanan:
+            self.message_user(
+                request,
+                f"{len(atlanan)} mesaj sıcak tabloda zaten olduğu için arşivde bırakıldı: "
+                f"{', '.join(map(str, atlanan))}",
+                messages.WARNING,
+            )
+
 @admin.register(Kategori)
 class KategoriAdmin(admin.ModelAdmin):
     list_display = ('isim', 'aciklama')
@@ -113,4 +215,28 @@ class KategoriAdmin(admin.ModelAdmin):
 @admin.register(Etiket)
 class EtiketAdmin(admin.ModelAdmin):
     list_display = ('isim',)
-    search_fields = ('isim',)
\ No newline at end of file
+    search_fields = ('isim',)
+
+@admin.register(Gorev)
+class GorevAdmin(admin.ModelAdmin):
+    list_display = ('tur', 'anahtar', 'durum', 'deneme', 'zaman', 'hata')
+    list_filter = ('durum', 'tur')
+    search_fields = ('anahtar',)
+    readonly_fields = ('tur', 'anahtar', 'veri', 'deneme', 'kilit', 'hata', 'olusturma')
+    actions = ['yeniden_dene']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Seçili başarısız görevleri yeniden dene')
+    def yeniden_dene(self, request, queryset):
+        sayi = 0
+        for gorev in queryset.filter(durum=Gorev.BASARISIZ):
+            # Aynı anahtarla bekleyen bir görev varsa iş zaten yapılacak
+            if Gorev.objects.filter(durum=Gorev.BEKLIYOR, tur=gorev.tur, anahtar=gorev.anahtar).exists():
+                gorev.delete()
+            else:
+                gorev.durum, gorev.deneme, gorev.zaman = Gorev.BEKLIYOR, 0, timezone.now()
+                gorev.save(update_fields=['durum', 'deneme', 'zaman'])
+            sayi += 1
+        self.message_user(request, f'{sayi} görev yeniden kuyruğa alındı.')
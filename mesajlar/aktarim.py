@@ -0,0 +1,320 @@
+"""mesaj_import ve mesaj_export komutlarının ortak okuma/yazma mantığı.
+
+Desteklenen biçimler: csv, jsonl (satır başına bir JSON nesnesi) ve json
+(tek bir dizi). Her biçimde alanlar aynıdır: baslik, icerik, tarih, yazar,
+kategori ve etiketler. CSV'de etiketler "|" ile ayrılır.
+"""
+import csv
+import json
+import time
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import beslemeler, gorevler, havuz, istatistik, onbellek
+from .arama import arama_motoru
+from .etiket_servisi import DIZIN_SURUMU
+from .forms import MesajForm
+from .models import Etiket, Kategori, Mesaj
+
+BICIMLER = ('csv', 'jsonl', 'json')
+ALANLAR = ('baslik', 'icerik', 'tarih', 'yazar', 'kategori', 'etiketler')
+CSV_ETIKET_AYRACI = '|'
+
+
+class AktarimHatasi(ValueError):
+    """Bir satırın içe aktarılamamasının nedeni"""
+
+
+class IceAktarimFormu(MesajForm):
+    """MesajForm'un metin alanı kuralları; kategori ve etiketler adla çözüldüğü için ayrı denetlenir"""
+
+    class Meta(MesajForm.Meta):
+        fields = ['baslik', 'icerik']
+
+
+# -- Okuyucular -----------------------------------------------------------------
+
+def _csv_oku(dosya):
+    for satir in csv.DictReader(dosya):
+        etiketler = satir.get('etiketler') or ''
+        satir['etiketler'] = [e for e in etiketler.split(CSV_ETIKET_AYRACI) if e.strip()]
+        yield satir
+
+
+def _jsonl_oku(dosya):
+    for satir in dosya:
+        if satir.strip():
+            yield json.loads(satir)
+
+
+def _json_oku(dosya, parca_boyutu=64 * 1024):
+    """Üst düzey bir JSON dizisini tamamını belleğe almadan nesne nesne okur"""
+    cozucu = json.JSONDecoder()
+    tampon = ''
+    dizi_basladi = False
+    while True:
+        parca = dosya.read(parca_boyutu)
+        tampon += parca
+        konum = 0
+        while True:
+            while konum < len(tampon) and tampon[konum] in ' \t\r\n,':
+                konum += 1
+            if not dizi_basladi and konum < len(tampon):
+                if tampon[konum] != '[':
+                    raise AktarimHatasi('JSON girdisi bir dizi ile başlamalı.')
+                dizi_basladi = True
+                konum += 1
+                continue
+            if konum < len(tampon) and tampon[konum] == ']':
+                return
+            try:
+                nesne, son = cozucu.raw_decode(tampon, konum)
+            except json.JSONDecodeError:
+                # Nesnenin geri kalanı henüz okunmadı
+                break
+            yield nesne
+            konum = son
+        tampon = tampon[konum:]
+        if not parca:
+            if tampon.strip():
+                raise AktarimHatasi('JSON girdisi eksik ya da bozuk.')
+            return
+
+
+OKUYUCULAR = {'csv': _csv_oku, 'jsonl': _jsonl_oku, 'json': _json_oku}
+
+
+def satirlari_oku(dosya, bicim):
+    return OKUYUCULAR[bicim](dosya)
+
+
+# -- İçe aktarım ----------------------------------------------------------------
+
+class IceAktarici:
+    """Satırları doğrulayıp toplu olarak yazar.
+
+    Kategori, etiket ve kullanıcılar adlarıyla bellekteki sözlüklerden
+    çözülür; yalnızca ilk kez görülen adlar için veritabanına gidilir.
+    Her parti tek bir işlemde bulk_create ile yazılır. bulk_create sinyal
+    göndermediğinden sayaçlar, arama indeksi ve önbellek sürümleri parti
+    sonunda burada güncellenir.
+    """
+
+    def __init__(self, parti_boyutu=1000, varsayilan_yazar=None, kuru_calisma=False, ilerleme=None):
+        self.parti_boyutu = parti_boyutu
+        self.varsayilan_yazar = varsayilan_yazar
+        self.kuru_calisma = kuru_calisma
+        self.ilerleme = ilerleme or (lambda durum: None)
+        self.kategoriler = {}
+        self.etiketler = {}
+        self.yazarlar = {}
+        self.okunan = 0
+        self.yazilan = 0
+        self.hatalar = []
+        self.baslangic = None
+
+    @property
+    def hiz(self):
+        gecen = time.monotonic() - self.baslangic if self.baslangic else 0
+        return self.okunan / gecen if gecen else 0.0
+
+    def calistir(self, satirlar):
+        self.baslangic = time.monotonic()
+        parti = []
+        for satir in satirlar:
+            self.okunan += 1
+            try:
+                parti.append(self.dogrula(satir))
+            except AktarimHatasi as hata:
+                self.hatalar.append((self.okunan, str(hata)))
+            if len(parti) >= self.parti_boyutu:
+                self.yaz(parti)
+                parti = []
+        if parti:
+            self.yaz(parti)
+        return self
+
+    def dogrula(self, satir):
+        form = IceAktarimFormu(data={'baslik': satir.get('baslik', ''), 'icerik': satir.get('icerik', '')})
+        if not form.is_valid():
+            raise AktarimHatasi('; '.join(
+                f'{alan}: {" ".join(hatalar)}' for alan, hatalar in form.errors.items()
+            ))
+
+        tarih = satir.get('tarih') or None
+        if tarih:
+            tarih = parse_datetime(tarih) if isinstance(tarih, str) else None
+            if tarih is None:
+                raise AktarimHatasi(f"tarih: geçersiz tarih {satir.get('tarih')!r}")
+            if timezone.is_naive(tarih):
+                tarih = timezone.make_aware(tarih)
+
+        yazar = (satir.get('yazar') or self.varsayilan_yazar or '').strip()
+        if not yazar:
+            raise AktarimHatasi('yazar: boş (--yazar ile varsayılan verilebilir)')
+        yazar_id = self._yazar_id(yazar)
+        if yazar_id is None:
+            raise AktarimHatasi(f"yazar: '{yazar}' kullanıcısı yok")
+
+        kategori = (satir.get('kategori') or '').strip()
+        etiketler = satir.get('etiketler') or []
+        if isinstance(etiketler, str):
+            etiketler = etiketler.split(CSV_ETIKET_AYRACI)
+        etiketler = sorted({e.strip() for e in etiketler if e and e.strip()})
+        self._ad_uzunlugunu_denetle(Kategori, kategori)
+        for etiket in etiketler:
+            self._ad_uzunlugunu_denetle(Etiket, etiket)
+
+        return {
+            'baslik': form.cleaned_data['baslik'],
+            'icerik': form.cleaned_data['icerik'],
+            'tarih': tarih or timezone.now(),
+            'yazar_id': yazar_id,
+            'kategori': kategori,
+            'etiketler': etiketler,
+        }
+
+    def _ad_uzunlugunu_denetle(self, model, ad):
+        sinir = model._meta.get_field('isim').max_length
+        if ad and len(ad) > sinir:
+            raise AktarimHatasi(f'{model._meta.verbose_name}: "{ad[:20]}..." {sinir} karakterden uzun')
+
+    def _yazar_id(self, kullanici_adi):
+        if kullanici_adi not in self.yazarlar:
+            self.yazarlar[kullanici_adi] = (
+                User.objects.filter(username=kullanici_adi).values_list('pk', flat=True).first()
+            )
+        return self.yazarlar[kullanici_adi]
+
+    def _idleri_coz(self, model, sozluk, adlar):
+        """Bilinmeyen adları tek sorguda arar, eksikleri toplu oluşturur"""
+        eksik = [ad for ad in set(adlar) if ad and ad not in sozluk]
+        if not eksik:
+            return
+        for pk, isim in model.objects.filter(isim__in=eksik).values_list('pk', 'isim'):
+            sozluk[isim] = pk
+        yeni = [model(isim=ad) for ad in eksik if ad not in sozluk]
+        if yeni:
+            model.objects.bulk_create(yeni, ignore_conflicts=True)
+            for pk, isim in model.objects.filter(isim__in=[n.isim for n in yeni]).values_list('pk', 'isim'):
+                sozluk[isim] = pk
+            if model is Etiket:
+                # bulk_create sinyal göndermez; süreçlerdeki tamamlama dizinleri yeniden kurulsun
+                transaction.on_commit(lambda: onbellek.gecersiz_kil(DIZIN_SURUMU))
+
+    def yaz(self, parti):
+        if self.kuru_calisma:
+            self.ilerleme(self)
+            return
+
+        with transaction.atomic():
+            self._idleri_coz(Kategori, self.kategoriler, [s['kategori'] for s in parti])
+            self._idleri_coz(Etiket, self.etiketler, [e for s in parti for e in s['etiketler']])
+
+            mesajlar, etiket_listeleri = [], []
+            for satir in parti:
+                mesajlar.append(Mesaj(
+                    baslik=satir['baslik'],
+                    icerik=satir['icerik'],
+                    icerik_uzunlugu=len(satir['icerik']),
+                    tarih=satir['tarih'],
+                    yazar_id=satir['yazar_id'],
+                    kategori_id=self.kategoriler.get(satir['kategori']),
+                ))
+                etiket_listeleri.append([self.etiketler[e] for e in satir['etiketler']])
+
+            Mesaj.objects.bulk_create(mesajlar, batch_size=self.parti_boyutu)
+            Baglanti = Mesaj.etiketler.through
+            Baglanti.objects.bulk_create([
+                Baglanti(mesaj_id=mesaj.pk, etiket_id=etiket_id)
+                for mesaj, etiket_idleri in zip(mesajlar, etiket_listeleri)
+                for etiket_id in etiket_idleri
+            ], batch_size=self.parti_boyutu)
+
+            self._turetilmis_verileri_guncelle(mesajlar, etiket_listeleri)
+
+        self.yazilan += len(mesajlar)
+        self.ilerleme(self)
+
+    def _turetilmis_verileri_guncelle(self, mesajlar, etiket_listeleri):
+        from .sayaclar import etiket_sayaclarini_degistir, kategori_sayacini_degistir
+
+        kategori_farki = Counter(m.kategori_id for m in mesajlar if m.kategori_id)
+        etiket_farki = Counter(e for idler in etiket_listeleri for e in idler)
+        for kategori_id, fark in kategori_farki.items():
+            kategori_sayacini_degistir(kategori_id, fark)
+        for fark in set(etiket_farki.values()):
+            etiket_sayaclarini_degistir([e for e, f in etiket_farki.items() if f == fark], fark)
+        kategori_idleri, etiket_idleri = set(kategori_farki), set(etiket_farki)
+
+        arama_motoru().toplu_indeksle(mesajlar)
+        # Geçmişe yayılan içe aktarımda gün başına tek görev birikir
+        gorevler.istatistik_guncellensin(*{istatistik.tarihin_gunu(m.tarih) for m in mesajlar})
+        havuz.havuzlari_sil(kategori_idleri)
+        beslemeler.beslemeleri_sil([
+            beslemeler.TUM,
+            *(beslemeler.kapsam(kategori_id=pk) for pk in kategori_idleri),
+            *(beslemeler.kapsam(etiket_id=pk) for pk in etiket_idleri),
+        ])
+        onbellek.gecersiz_kil(
+            'liste', 'kategoriler',
+            *(f'kategori:{pk}' for pk in kategori_idleri),
+            *(f'etiket:{pk}' for pk in etiket_idleri),
+        )
+
+
+# -- Dışa aktarım ---------------------------------------------------------------
+
+def _satir(mesaj):
+    return {
+        'baslik': mesaj.baslik,
+        'icerik': mesaj.icerik,
+        'tarih': mesaj.tarih,
+        'yazar': mesaj.yazar.username,
+        'kategori': mesaj.kategori.isim if mesaj.kategori_id else '',
+        'etiketler': [etiket.isim for etiket in mesaj.etiketler.all()],
+    }
+
+
+def disa_aktar(dosya, bicim, parca_boyutu=2000, ilerleme=None):
+    """Tüm mesajları sunucu tarafı imleçle parça parça okuyup dosyaya yazar"""
+    mesajlar = (
+        Mesaj.objects.select_related('yazar', 'kategori')
+        .prefetch_related('etiketler')
+        .order_by('pk')
+        .iterator(chunk_size=parca_boyutu)
+    )
+    ilerleme = ilerleme or (lambda sayi: None)
+    sayi = 0
+
+    if bicim == 'csv':
+        yazici = csv.DictWriter(dosya, fieldnames=ALANLAR)
+        yazici.writeheader()
+    elif bicim == 'json':
+        dosya.write('[')
+
+    for mesaj in mesajlar:
+        satir = _satir(mesaj)
+        if bicim == 'csv':
+            satir['tarih'] = satir['tarih'].isoformat()
+            satir['etiketler'] = CSV_ETIKET_AYRACI.join(satir['etiketler'])
+            yazici.writerow(satir)
+        else:
+            metin = json.dumps(satir, cls=DjangoJSONEncoder, ensure_ascii=False)
+            if bicim == 'json':
+                dosya.write(('\n' if sayi == 0 else ',\n') + metin)
+            else:
+                dosya.write(metin + '\n')
+        sayi += 1
+        if sayi % parca_boyutu == 0:
+            ilerleme(sayi)
+
+    if bicim == 'json':
+        dosya.write('\n]\n')
+    ilerleme(sayi)
+    return sayi
@@ -0,0 +1,220 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from . import etiket_servisi, hiz_siniri, istatistik
+from .arama import arama_motoru
+from .kosullu import liste_kosullu_get
+from .models import Etiket, Kategori, Mesaj
+from .oturum import herkese_acik
+from .replika import replikadan_okunabilir
+from .sayfalama import keyset_sayfala, sayfa_boyutu_al
+
+# Otomatik tamamlamada döndürülen varsayılan ve en çok etiket sayısı
+TAMAMLAMA_BOYUTU = 10
+EN_BUYUK_TAMAMLAMA_BOYUTU = 50
+
+# Dışa aktarımda veritabanından tek seferde okunan satır sayısı
+DISA_AKTARIM_PARCA_BOYUTU = 2000
+
+# ?fields= ile seçilebilecek alanlar ve serileştiricileri
+MESAJ_ALANLARI = {
+    'id': lambda m: m.pk,
+    'baslik': lambda m: m.baslik,
+    'ozet': lambda m: m.kisaltilmis_icerik(),
+    'icerik': lambda m: m.icerik,
+    'tarih': lambda m: m.tarih,
+    'guncellenme': lambda m: m.guncellenme,
+    'yazar': lambda m: m.yazar.username,
+    'kategori': lambda m: m.kategori_id and {'id': m.kategori_id, 'isim': m.kategori.isim},
+    'etiketler': lambda m: [etiket.isim for etiket in m.etiketler.all()],
+    'url': lambda m: m.get_absolute_url(),
+}
+VARSAYILAN_MESAJ_ALANLARI = ('id', 'baslik', 'ozet', 'tarih', 'yazar', 'kategori', 'etiketler', 'url')
+
+
+class GecersizAlan(ValueError):
+    pass
+
+
+def hata_yaniti(mesaj, durum=400):
+    return JsonResponse({'hata': mesaj}, status=durum, json_dumps_params={'ensure_ascii': False})
+
+
+def _json(veri):
+    return JsonResponse(veri, json_dumps_params={'ensure_ascii': False})
+
+
+def alanlari_al(request):
+    """?fields=baslik,tarih parametresini doğrular"""
+    istenen = request.GET.get('fields', '')
+    if not istenen:
+        return VARSAYILAN_MESAJ_ALANLARI
+    alanlar = tuple(alan.strip() for alan in istenen.split(',') if alan.strip())
+    bilinmeyen = [alan for alan in alanlar if alan not in MESAJ_ALANLARI]
+    if bilinmeyen:
+        raise GecersizAlan(', '.join(bilinmeyen))
+    return alanlar
+
+
+def mesaj_sorgusu(request, alanlar):
+    """HTML listeleriyle aynı filtreleri (arama, kategori, etiket) uygular"""
+    mesajlar = Mesaj.objects.all()
+    if 'icerik' in alanlar:
+        mesajlar = mesajlar.select_related('yazar', 'kategori').prefetch_related('etiketler')
+    else:
+        mesajlar = mesajlar.listing()
+    if 'etiketler' not in alanlar:
+        mesajlar = mesajlar.prefetch_related(None)
+
+    arama_sorgusu = request.GET.get('arama', '')
+    if arama_sorgusu:
+        mesajlar = arama_motoru().filtrele(mesajlar, arama_sorgusu, hafif=hiz_siniri.hafif_mod(request))
+    kategori_id = request.GET.get('kategori', '')
+    if kategori_id.isdigit():
+        mesajlar = mesajlar.filter(kategori_id=int(kategori_id))
+    etiket_id = request.GET.get('etiket', '')
+    if etiket_id.isdigit():
+        mesajlar = mesajlar.filter(etiketler=int(etiket_id))
+    return mesajlar
+
+
+def mesaji_serilestir(mesaj, alanlar):
+    return {alan: MESAJ_ALANLARI[alan](mesaj) for alan in alanlar}
+
+
+def sayfa_yaniti(request, sonuclar, sonraki_link, onceki_link):
+    return _json({
+        'sonuclar': sonuclar,
+        'sonraki': request.build_absolute_uri(sonraki_link) if sonraki_link else None,
+        'onceki': request.build_absolute_uri(onceki_link) if onceki_link else None,
+    })
+
+
+@herkese_acik
+@replikadan_okunabilir
+@require_GET
+@liste_kosullu_get('liste', 'adlar')
+def mesajlar(request):
+    try:
+        alanlar = alanlari_al(request)
+    except GecersizAlan as hata:
+        return hata_yaniti(f'Bilinmeyen alan: {hata}')
+    sayfa = keyset_sayfala(mesaj_sorgusu(request, alanlar), request)
+    response = sayfa_yaniti(
+        request,
+        [mesaji_serilestir(mesaj, alanlar) for mesaj in sayfa],
+        sayfa.sonraki_link,
+        sayfa.onceki_link,
+    )
+    return hiz_siniri.hafif_yanit(response) if hiz_siniri.hafif_mod(request) else response
+
+
+def id_sayfa_sorgusu(request, queryset):
+    """Küçük tablolar için ?sonra=<id> ile artan id sırasında sayfalama sorgusu"""
+    boyut = sayfa_boyutu_al(request)
+    sonra = request.GET.get('sonra', '')
+    if sonra.isdigit():
+        queryset = queryset.filter(pk__gt=int(sonra))
+    return queryset.order_by('pk')[:boyut + 1], boyut
+
+
+def id_sayfasi(request, satirlar, boyut):
+    """Fazladan okunan satıra bakarak (sayfa satırları, sonraki link) döndürür"""
+    if len(satirlar) <= boyut:
+        return satirlar, None
+    satirlar = satirlar[:boyut]
+    parametreler = request.GET.copy()
+    parametreler['sonra'] = satirlar[-1].pk
+    return satirlar, '?' + parametreler.urlencode()
+
+
+def kategoriyi_serilestir(kategori):
+    return {
+        'id': kategori.pk,
+        'isim': kategori.isim,
+        'aciklama': kategori.aciklama,
+        'mesaj_sayisi': kategori.mesaj_sayisi,
+        'url': kategori.get_absolute_url(),
+    }
+
+
+def etiketi_serilestir(etiket):
+    return {'id': etiket.pk, 'isim': etiket.isim, 'mesaj_sayisi': etiket.mesaj_sayisi}
+
+
+@herkese_acik
+@replikadan_okunabilir
+@require_GET
+@liste_kosullu_get('kategoriler')
+def kategoriler(request):
+    sorgu, boyut = id_sayfa_sorgusu(request, Kategori.objects.all())
+    satirlar, sonraki_link = id_sayfasi(request, list(sorgu), boyut)
+    return sayfa_yaniti(request, [kategoriyi_serilestir(k) for k in satirlar], sonraki_link, None)
+
+
+@herkese_acik
+@replikadan_okunabilir
+@require_GET
+def etiketler(request):
+    sorgu, boyut = id_sayfa_sorgusu(request, Etiket.objects.all())
+    satirlar, sonraki_link = id_sayfasi(request, list(sorgu), boyut)
+    return sayfa_yaniti(request, [etiketi_serilestir(e) for e in satirlar], sonraki_link, None)
+
+
+# Replikaya yönlendirilmez: gecikmeli bir replikadan kurulan dizin yeni sürümle etiketlenip eski kalabilir
+@require_GET
+def etiket_tamamla(request):
+    """Adı ?q= ile başlayan etiketler (ada göre, en çok ?boyut= kadar); veritabanına gitmez"""
+    boyut = request.GET.get('boyut', '')
+    boyut = min(int(boyut), EN_BUYUK_TAMAMLAMA_BOYUTU) if boyut.isdigit() and int(boyut) > 0 else TAMAMLAMA_BOYUTU
+    etiketler = etiket_servisi.dizin().ara(request.GET.get('q', ''), boyut)
+    return _json({'sonuclar': [{'id': pk, 'isim': isim} for pk, isim in etiketler]})
+
+
+@herkese_acik
+@replikadan_okunabilir
+@require_GET
+def mesajlar_disa_aktar(request):
+    """Tüm (filtrelenmiş) mesajları satır satır JSON olarak akıtır.
+
+    Satırlar sunucu tarafı imleçle parça parça okunur ve yanıt üretildikçe
+    gönderilir; bellek kullanımı tablo boyutundan bağımsızdır.
+    """
+    try:
+        alanlar = alanlari_al(request)
+    except GecersizAlan as hata:
+        return hata_yaniti(f'Bilinmeyen alan: {hata}')
+    mesajlar = mesaj_sorgusu(request, alanlar).order_by('pk')
+    # Satırlar middleware'ler bittikten sonra okunur; veritabanı seçimi şimdi sabitlenir
+    mesajlar = mesajlar.using(mesajlar.db)
+
+    def satirlar():
+        for mesaj in mesajlar.iterator(chunk_size=DISA_AKTARIM_PARCA_BOYUTU):
+            yield ndjson_satiri(mesaj, alanlar)
+
+    return ndjson_yaniti(satirlar())
+
+
+def ndjson_satiri(mesaj, alanlar):
+    return json.dumps(mesaji_serilestir(mesaj, alanlar), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def ndjson_yaniti(satirlar):
+    response = StreamingHttpResponse(satirlar, content_type='application/x-ndjson; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="mesajlar.ndjson"'
+    return response
+
+
+@require_GET
+def istatistikler(request):
+    """?baslangic=&bitis= aralığının istatistikleri; yalnızca personel için"""
+    if not request.user.is_staff:
+        return hata_yaniti('Bu uç nokta yalnızca personel içindir.', 403)
+    try:
+        baslangic, bitis = istatistik.aralik_al(request.GET)
+    except ValueError as hata:
+        return hata_yaniti(str(hata))
+    return _json(istatistik.ozet(baslangic, bitis))
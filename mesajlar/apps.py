@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class MesajlarConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mesajlar'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .veritabani import baglanti_ayarla
+
+        connection_created.connect(baglanti_ayarla, dispatch_uid='mesajlar_baglanti_ayarla')
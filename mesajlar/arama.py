@@ -0,0 +1,225 @@
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, connections, router
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+# Türkçe büyük/küçük harf ve aksan dönüşümleri: "İ" -> "i", "I" -> "ı",
+# ardından klavyesinde Türkçe karakter olmayan kullanıcılar için katlama
+_TR_KUCUK_HARF = str.maketrans({'İ': 'i', 'I': 'ı'})
+_TR_KATLAMA = str.maketrans('çğıöşüâîû', 'cgiosuaiu')
+_KELIME = re.compile(r'\w+', re.UNICODE)
+
+FTS_TABLOSU = 'mesajlar_mesaj_fts'
+
+# PostgreSQL GIN indeksi ile sorgu aynı ifadeyi kullanmalı, aksi halde indeks seçilmez
+PG_ARAMA_IFADESI = (
+    "setweight(to_tsvector('turkish', coalesce(baslik, '')), 'A') || "
+    "setweight(to_tsvector('turkish', coalesce(icerik, '')), 'B')"
+)
+
+
+def normallestir(metin):
+    """Metni Türkçe kurallarına göre küçültür ve aksanlarından arındırır"""
+    return (metin or '').translate(_TR_KUCUK_HARF).lower().translate(_TR_KATLAMA)
+
+
+def kelimeler(sorgu):
+    """Arama sorgusunu normalleştirilmiş kelimelere ayırır"""
+    return _KELIME.findall(normallestir(sorgu))
+
+
+def _okuma_baglantisi():
+    """Sıralı arama sorguları için yönlendiricinin seçtiği okuma bağlantısı (replika olabilir)"""
+    from .models import Mesaj
+    return connections[router.db_for_read(Mesaj)]
+
+
+class AramaMotoru(ABC):
+    """Mesaj araması için ortak arayüz.
+
+    filtrele() eşleşen mesajlarla sınırlandırılmış bir queryset, en_ilgili()
+    ise alaka sırasına dizilmiş mesaj id'leri döndürür. hafif=True yük
+    altında daha ucuz bir aramayı (yalnızca başlık) ister; desteklemeyen
+    motorlar yok sayabilir. Mesajlar kaydedilip silindikçe
+    yeniden_indeksle() arka plan görevlerinden çağrılır.
+    """
+
+    @abstractmethod
+    def filtrele(self, queryset, sorgu, hafif=False):
+        """Queryset'i sorguyla eşleşen mesajlarla sınırlar"""
+
+    @abstractmethod
+    def en_ilgili(self, sorgu, limit):
+        """Sorguyla en ilgili en fazla `limit` mesajın id'lerini alaka sırasıyla döndürür"""
+
+    def indeksle(self, mesaj):
+        pass
+
+    def toplu_indeksle(self, mesajlar):
+        """Sinyal göndermeyen bulk_create ile eklenen yeni mesajları indeksler"""
+        for mesaj in mesajlar:
+            self.indeksle(mesaj)
+
+    def sil(self, mesaj_id):
+        pass
+
+    def yeniden_indeksle(self, mesaj_idleri):
+        """Mesajların indeks kayıtlarını veritabanındaki güncel hallerine getirir; silinenler çıkarılır"""
+        from .models import Mesaj
+        for mesaj_id in mesaj_idleri:
+            self.sil(mesaj_id)
+        self.toplu_indeksle(Mesaj.objects.filter(pk__in=mesaj_idleri).only('pk', 'baslik', 'icerik'))
+
+    def yeniden_olustur(self):
+        pass
+
+
+class IcontainsMotoru(AramaMotoru):
+    """İndeks gerektirmeyen yedek motor (diğer veritabanları için)"""
+
+    def filtrele(self, queryset, sorgu, hafif=False):
+        for kelime in sorgu.split():
+            kosul = Q(baslik__icontains=kelime)
+            if not hafif:
+                kosul |= Q(icerik__icontains=kelime)
+            queryset = queryset.filter(kosul)
+        return queryset
+
+    def en_ilgili(self, sorgu, limit):
+        from .models import Mesaj
+        return list(self.filtrele(Mesaj.objects.all(), sorgu).values_list('pk', flat=True)[:limit])
+
+
+class SqliteFtsMotoru(AramaMotoru):
+    """SQLite FTS5 sanal tablosu üzerinde arama.
+
+    Tabloda başlık ve içeriğin normalleştirilmiş hali mesaj id'si ile aynı
+    rowid altında tutulur; her kelime önek olarak (kelime*) aranır, böylece
+    "başarı" sorgusu "başarılı" ve "başarılar" ile de eşleşir.
+    """
+
+    def eslesme_ifadesi(self, sorgu):
+        return ' '.join(f'"{kelime}"*' for kelime in kelimeler(sorgu))
+
+    def filtrele(self, queryset, sorgu, hafif=False):
+        ifade = self.eslesme_ifadesi(sorgu)
+        if not ifade:
+            return queryset
+        if hafif:
+            # Başlık sütunu kısa olduğundan eşleşme listeleri çok daha küçüktür
+            ifade = f'baslik : ({ifade})'
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLOSU} WHERE {FTS_TABLOSU} MATCH %s', [ifade]
+        ))
+
+    def en_ilgili(self, sorgu, limit):
+        ifade = self.eslesme_ifadesi(sorgu)
+        if not ifade:
+            return []
+        with _okuma_baglantisi().cursor() as cursor:
+            # Başlıktaki eşleşmeler içerikteki eşleşmelerden daha ağır sayılır
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLOSU} WHERE {FTS_TABLOSU} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLOSU}, 10.0, 1.0) LIMIT %s',
+                [ifade, limit],
+            )
+            return [satir[0] for satir in cursor.fetchall()]
+
+    def indeksle(self, mesaj):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLOSU} WHERE rowid = %s', [mesaj.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLOSU} (rowid, baslik, icerik) VALUES (%s, %s, %s)',
+                [mesaj.pk, normallestir(mesaj.baslik), normallestir(mesaj.icerik)],
+            )
+
+    def toplu_indeksle(self, mesajlar):
+        with connection.cursor() as cursor:
+            self._toplu_ekle(cursor, [
+                (mesaj.pk, normallestir(mesaj.baslik), normallestir(mesaj.icerik)) for mesaj in mesajlar
+            ])
+
+    def sil(self, mesaj_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLOSU} WHERE rowid = %s', [mesaj_id])
+
+    def yeniden_indeksle(self, mesaj_idleri):
+        from .models import Mesaj
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLOSU} WHERE rowid = %s', [(pk,) for pk in mesaj_idleri])
+        self.toplu_indeksle(Mesaj.objects.filter(pk__in=mesaj_idleri).only('pk', 'baslik', 'icerik'))
+
+    def yeniden_olustur(self, parca_boyutu=2000):
+        from .models import Mesaj
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLOSU}')
+            satirlar = Mesaj.objects.order_by().values_list('pk', 'baslik', 'icerik')
+            parca = []
+            for pk, baslik, icerik in satirlar.iterator(chunk_size=parca_boyutu):
+                parca.append((pk, normallestir(baslik), normallestir(icerik)))
+                if len(parca) >= parca_boyutu:
+                    self._toplu_ekle(cursor, parca)
+                    parca = []
+            if parca:
+                self._toplu_ekle(cursor, parca)
+            cursor.execute(f"INSERT INTO {FTS_TABLOSU} ({FTS_TABLOSU}) VALUES ('optimize')")
+
+    def _toplu_ekle(self, cursor, parca):
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLOSU} (rowid, baslik, icerik) VALUES (%s, %s, %s)', parca
+        )
+
+
+class PostgresMotoru(AramaMotoru):
+    """PostgreSQL tsvector/GIN ile arama.
+
+    'turkish' metin arama yapılandırması kelime köklerini çıkarır; vektör
+    tabloda saklanmaz, 0002 göçündeki GIN ifade indeksi ile aynı ifadeden
+    hesaplanır.
+    """
+
+    def tsquery(self, sorgu):
+        return ' & '.join(f'{kelime}:*' for kelime in _KELIME.findall(
+            (sorgu or '').translate(_TR_KUCUK_HARF).lower()
+        ))
+
+    def filtrele(self, queryset, sorgu, hafif=False):
+        # GIN indeksi başlık ve içeriği birlikte kapsar; hafif arama ayrıca ucuzlamaz
+        ifade = self.tsquery(sorgu)
+        if not ifade:
+            return queryset
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT id FROM mesajlar_mesaj WHERE ({PG_ARAMA_IFADESI}) @@ to_tsquery('turkish', %s)",
+            [ifade],
+        ))
+
+    def en_ilgili(self, sorgu, limit):
+        ifade = self.tsquery(sorgu)
+        if not ifade:
+            return []
+        with _okuma_baglantisi().cursor() as cursor:
+            cursor.execute(
+                f"SELECT id FROM mesajlar_mesaj "
+                f"WHERE ({PG_ARAMA_IFADESI}) @@ to_tsquery('turkish', %s) "
+                f"ORDER BY ts_rank({PG_ARAMA_IFADESI}, to_tsquery('turkish', %s)) DESC LIMIT %s",
+                [ifade, ifade, limit],
+            )
+            return [satir[0] for satir in cursor.fetchall()]
+
+
+@lru_cache(maxsize=None)
+def arama_motoru():
+    """Ayarlardaki ya da veritabanına uygun arama motorunu döndürür"""
+    yol = getattr(settings, 'MESAJ_ARAMA_MOTORU', None)
+    if yol:
+        return import_string(yol)()
+    if connection.vendor == 'sqlite':
+        return SqliteFtsMotoru()
+    if connection.vendor == 'postgresql':
+        return PostgresMotoru()
+    return IcontainsMotoru()
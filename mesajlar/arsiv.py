@@ -0,0 +1,223 @@
+"""Eski mesajların arşive taşınması ve arşivde arama.
+
+`manage.py mesaj_arsivle` settings.MESAJ_ARSIV_YASI günden eski mesajları
+partiler halinde ArsivMesaj tablosuna, etiket bağlantılarıyla birlikte
+taşır. Böylece Mesaj tablosu ve indeksleri (arama indeksi dahil) yalnızca
+güncel mesajları içerir ve bellekte kalacak kadar küçük olur.
+
+Arşiv tablosu settings.MESAJ_ARSIV_VERITABANI'ndadır; ayrı bir SQLite
+dosyası tanımlanmışsa (MESAJ_ARSIV) sıcak veritabanının sayfa önbelleğini
+de paylaşmaz. ArsivYonlendirici arşiv modelini oraya, diğer her şeyi
+birincil veritabanına yönlendirir.
+
+Arşivdeki mesajlar açıkça istendiğinde bulunur: mesaj_detay sıcak tabloda
+bulamadığı id'yi arşivde arar, /arsiv/ arşivde başlık ve içerik araması
+yapar, admin'de "Arşivlenmiş Mesajlar" listelenir ve geri yüklenebilir.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, router, transaction
+from django.utils import timezone
+
+from . import beslemeler, havuz, onbellek
+from .arama import IcontainsMotoru, arama_motoru
+from .models import ArsivMesaj, Etiket, Mesaj
+from .sayaclar import etiket_sayaclarini_degistir, kategori_sayacini_degistir
+
+ARSIV_VERITABANI = getattr(settings, 'MESAJ_ARSIV_VERITABANI', DEFAULT_DB_ALIAS)
+ARSIV_YASI = getattr(settings, 'MESAJ_ARSIV_YASI', 365)
+PARTI_BOYUTU = 1000
+
+_ARSIV_MODELLERI = {'mesajlar.arsivmesaj'}
+_ALANLAR = ('baslik', 'icerik', 'tarih', 'guncellenme', 'icerik_uzunlugu', 'yazar_id', 'kategori_id')
+
+Baglanti = Mesaj.etiketler.through
+
+
+class ArsivYonlendirici:
+    """Arşiv modelini ARSIV_VERITABANI'na yönlendirir; DATABASE_ROUTERS'da en başta olmalıdır"""
+
+    def _arsiv_mi(self, model):
+        return model._meta.label_lower in _ARSIV_MODELLERI
+
+    def db_for_read(self, model, **hints):
+        return ARSIV_VERITABANI if self._arsiv_mi(model) else None
+
+    def db_for_write(self, model, **hints):
+        return ARSIV_VERITABANI if self._arsiv_mi(model) else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Arşivin kullanıcı ve kategori ilişkileri veritabanları arasında, kısıtsızdır
+        if self._arsiv_mi(obj1) or self._arsiv_mi(obj2):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == 'mesajlar' and f'{app_label}.{model_name}' in _ARSIV_MODELLERI:
+            return db == ARSIV_VERITABANI
+        if db == ARSIV_VERITABANI and db != DEFAULT_DB_ALIAS:
+            return False
+        return None
+
+
+# -- Taşıma ----------------------------------------------------------------------
+
+def _etiket_haritasi(mesaj_idleri):
+    etiketler = defaultdict(list)
+    for mesaj_id, etiket_id in (Baglanti.objects.filter(mesaj_id__in=mesaj_idleri)
+                                .order_by('mesaj_id', 'etiket_id').values_list('mesaj_id', 'etiket_id')):
+        etiketler[mesaj_id].append(etiket_id)
+    return etiketler
+
+
+def _turetilmis_verileri_guncelle(mesajlar, etiket_listeleri, fark):
+    """Sayaçları ve arama indeksini sıcak tablodaki değişikliğe göre düzeltir, önbellekleri işlemden sonra.
+
+    Toplu taşımada sinyaller kullanılmaz (bkz. aktarim.py); fark taşınan
+    mesajlar için -1, geri yüklenenler için +1'dir.
+    """
+    kategori_farki = Counter(m.kategori_id for m in mesajlar if m.kategori_id)
+    etiket_farki = Counter(e for idler in etiket_listeleri for e in idler)
+    for kategori_id, sayi in kategori_farki.items():
+        kategori_sayacini_degistir(kategori_id, sayi * fark)
+    for sayi in set(etiket_farki.values()):
+        etiket_sayaclarini_degistir([e for e, s in etiket_farki.items() if s == sayi], sayi * fark)
+    kategori_idleri, etiket_idleri = set(kategori_farki), set(etiket_farki)
+    arama_motoru().yeniden_indeksle([m.pk for m in mesajlar])
+    transaction.on_commit(lambda: _onbellekleri_sil(mesajlar, kategori_idleri, etiket_idleri))
+
+
+def _onbellekleri_sil(mesajlar, kategori_idleri, etiket_idleri):
+    havuz.havuzlari_sil(kategori_idleri)
+    beslemeler.beslemeleri_sil([
+        beslemeler.TUM,
+        *(beslemeler.kapsam(kategori_id=pk) for pk in kategori_idleri),
+        *(beslemeler.kapsam(etiket_id=pk) for pk in etiket_idleri),
+    ])
+    onbellek.gecersiz_kil(
+        'liste', 'kategoriler',
+        *(f'kategori:{pk}' for pk in kategori_idleri),
+        *(f'etiket:{pk}' for pk in etiket_idleri),
+        *(f'mesaj:{m.pk}' for m in mesajlar),
+    )
+
+
+def _parti_arsivle(mesajlar):
+    idler = [m.pk for m in mesajlar]
+    etiketler = _etiket_haritasi(idler)
+    arsivlenme = timezone.now()
+    # Arşiv işlemi önce tamamlanır. Sıcak taraftaki silme başarısız olursa mesaj iki
+    # yerde de kalır; sıcak kopya önceliklidir ve yeniden çalıştırma arşivi günceller.
+    # Arşiv aynı veritabanındaysa iki işlem tek bir işlemdir.
+    with transaction.atomic(), transaction.atomic(using=ARSIV_VERITABANI):
+        ArsivMesaj.objects.bulk_create(
+            [
+                ArsivMesaj(id=m.pk, etiket_idleri=etiketler.get(m.pk, []), arsivlenme=arsivlenme,
+                           **{alan: getattr(m, alan) for alan in _ALANLAR})
+                for m in mesajlar
+            ],
+            update_conflicts=True,
+            unique_fields=['id'],
+            update_fields=[*_ALANLAR, 'etiket_idleri', 'arsivlenme'],
+        )
+        Baglanti.objects.filter(mesaj_id__in=idler).delete()
+        # Mesaj başına silme sinyalleri (görev kuyruğu, havuzlar, önbellek) yerine
+        # türetilmiş veriler parti için bir kez düzeltilir
+        Mesaj.objects.filter(pk__in=idler)._raw_delete(router.db_for_write(Mesaj))
+        _turetilmis_verileri_guncelle(mesajlar, [etiketler.get(pk, []) for pk in idler], -1)
+
+
+def arsivlenecekler(gun=ARSIV_YASI):
+    return Mesaj.objects.filter(tarih__lt=timezone.now() - timedelta(days=gun))
+
+
+def arsivle(gun=ARSIV_YASI, parti_boyutu=PARTI_BOYUTU, ilerleme=None):
+    """`gun` günden eski mesajları partiler halinde arşive taşır; taşınan sayıyı döndürür.
+
+    Her parti ayrı işlemdir; yarıda kesilen bir çalışma kaldığı yerden sürer.
+    """
+    ilerleme = ilerleme or (lambda sayi: None)
+    sinir = timezone.now() - timedelta(days=gun)
+    tasinan = 0
+    while True:
+        parti = list(Mesaj.objects.filter(tarih__lt=sinir).order_by('tarih', 'id').only('pk', *_ALANLAR)[:parti_boyutu])
+        if not parti:
+            return tasinan
+        _parti_arsivle(parti)
+        tasinan += len(parti)
+        ilerleme(tasinan)
+
+
+def geri_yukle(arsiv_idleri):
+    """Arşivdeki mesajları sıcak tabloya geri taşır; (geri yüklenen sayı, atlanan id'ler) döndürür.
+
+    Sıcak tabloda aynı id'li bir mesaj varsa (ör. sıcak taraftaki silmesi
+    başarısız olmuş bir arşivleme) sıcak kopya önceliklidir: arşivdeki kopya
+    yerinde bırakılır ve id'si atlananlar arasında döner.
+    """
+    arsivdekiler = list(ArsivMesaj.objects.filter(pk__in=arsiv_idleri))
+    if not arsivdekiler:
+        return 0, []
+    with transaction.atomic(), transaction.atomic(using=ARSIV_VERITABANI):
+        sicaktakiler = set(Mesaj.objects.filter(pk__in=[a.pk for a in arsivdekiler]).values_list('pk', flat=True))
+        atlanan = sorted(sicaktakiler)
+        arsivdekiler = [a for a in arsivdekiler if a.pk not in sicaktakiler]
+        if not arsivdekiler:
+            return 0, atlanan
+        mesajlar = Mesaj.objects.bulk_create(
+            [Mesaj(pk=a.pk, **{alan: getattr(a, alan) for alan in _ALANLAR}) for a in arsivdekiler]
+        )
+        # auto_now bulk_create'te guncellenme'yi şimdiye çeker; arşivdeki değer geri yazılır
+        for mesaj, arsivdeki in zip(mesajlar, arsivdekiler):
+            mesaj.guncellenme = arsivdeki.guncellenme
+        Mesaj.objects.bulk_update(mesajlar, ['guncellenme'])
+        # Arşivdeyken silinmiş etiketlerin bağlantıları kurulmaz
+        var_olanlar = set(Etiket.objects.filter(
+            pk__in={e for a in arsivdekiler for e in a.etiket_idleri}).values_list('pk', flat=True))
+        etiket_listeleri = [[e for e in a.etiket_idleri if e in var_olanlar] for a in arsivdekiler]
+        Baglanti.objects.bulk_create(
+            [Baglanti(mesaj_id=a.pk, etiket_id=e) for a, idler in zip(arsivdekiler, etiket_listeleri) for e in idler],
+            ignore_conflicts=True,
+        )
+        ArsivMesaj.objects.filter(pk__in=[a.pk for a in arsivdekiler]).delete()
+        _turetilmis_verileri_guncelle(mesajlar, etiket_listeleri, +1)
+    return len(mesajlar), atlanan
+
+
+# -- Okuma -----------------------------------------------------------------------
+
+def mesaj_getir(pk):
+    """Mesajı yazarıyla birlikte sıcak tablodan, yoksa arşivden getirir; ikisinde de yoksa None"""
+    mesaj = Mesaj.objects.select_related('yazar').filter(pk=pk).first()
+    if mesaj is None:
+        mesaj = ArsivMesaj.objects.filter(pk=pk).first()
+        if mesaj is not None:
+            yazarlari_ekle([mesaj])
+    return mesaj
+
+
+async def amesaj_getir(pk):
+    mesaj = await Mesaj.objects.select_related('yazar').filter(pk=pk).afirst()
+    if mesaj is None:
+        mesaj = await ArsivMesaj.objects.filter(pk=pk).afirst()
+        if mesaj is not None:
+            # Yazar başka veritabanında olabilir; şablon işlenmeden önce yüklenir
+            mesaj.yazar = await User.objects.aget(pk=mesaj.yazar_id)
+    return mesaj
+
+
+def ara(queryset, sorgu):
+    """Arşivde başlık ve içerikte arar; arşivin tam metin indeksi yoktur"""
+    return IcontainsMotoru().filtrele(queryset, sorgu)
+
+
+def yazarlari_ekle(mesajlar):
+    """Arşiv listesindeki mesajlara yazarlarını tek sorguyla ekler (select_related veritabanları arasında çalışmaz)"""
+    yazarlar = User.objects.in_bulk({m.yazar_id for m in mesajlar})
+    for mesaj in mesajlar:
+        if mesaj.yazar_id in yazarlar:
+            mesaj.yazar = yazarlar[mesaj.yazar_id]
+    return mesajlar
@@ -0,0 +1,242 @@
+"""Genel, kategori ve etiket başına RSS, Atom ve JSON Feed beslemeleri.
+
+Her kapsamın ("tum", "kategori:<id>", "etiket:<id>") son BESLEME_BOYUTU
+mesajı üç biçimde de serileştirilmiş olarak önbellekte tek bir kayıtta
+tutulur. Besleme isteği bu kaydı tek okumayla alır; ETag ve Last-Modified
+(en son güncellenen girdinin zamanı) kayıtla birlikte hesaplanmıştır, tablo
+ne kadar büyük olursa olsun veritabanına gidilmez. Listedeki id'ler ve
+sınır ayrı, küçük bir özet anahtarında tutulur; görevler gövdeleri okumadan
+kapsamın etkilenip etkilenmediğine bununla karar verir.
+
+Mesaj kaydedilip silindikçe sinyaller mesajın girebileceği kapsamlar için
+"kapsam@mesaj_id" anahtarlı "besleme" görevleri ekler; önbelleğe ya da
+veritabanına bakmazlar (bkz. gorevler.py). Görev, önbellekte bulunan ve
+mesajın gerçekten girdiği (ya da çıktığı) kapsamları bulur ve her birinin
+son N mesajını tek sorguyla yeniden okuyup kaydı yeniler; hiç istenmemiş
+beslemeler ilk istekte kurulur.
+
+Mutlak bağlantılar istekten değil settings.MESAJ_SITE_ADRESI'nden
+üretilir, çünkü kayıtlar görev işçisinde de kurulur.
+"""
+import hashlib
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+
+from .models import Etiket, Kategori, Mesaj
+from .onbellek import onbellek
+
+TUM = 'tum'
+_ONEK = 'mesajlar'
+
+BESLEME_BOYUTU = getattr(settings, 'MESAJ_BESLEME_BOYUTU', 20)
+# Kayıtlar bu süreden sonra düşer ve ilk istekte yeniden kurulur; kategori ve
+# etiket adları başka kapsamların girdilerinde de geçtiği için üst sınırdır
+BESLEME_SURESI = getattr(settings, 'MESAJ_BESLEME_SURESI', 86400)
+
+ICERIK_TURLERI = {
+    'rss': 'application/rss+xml; charset=utf-8',
+    'atom': 'application/atom+xml; charset=utf-8',
+    'json': 'application/feed+json; charset=utf-8',
+}
+SITE_BASLIGI = 'Motivasyon Mesajları'
+
+
+def kapsam(kategori_id=None, etiket_id=None):
+    if kategori_id:
+        return f'kategori:{kategori_id}'
+    if etiket_id:
+        return f'etiket:{etiket_id}'
+    return TUM
+
+
+def _anahtar(ad):
+    return f'{_ONEK}:besleme:{ad}'
+
+
+def _ozet_anahtari(ad):
+    return f'{_ONEK}:besleme_ozeti:{ad}'
+
+
+def _mutlak(yol):
+    return getattr(settings, 'MESAJ_SITE_ADRESI', 'http://localhost:8000').rstrip('/') + yol
+
+
+# -- Kurma ---------------------------------------------------------------------
+
+def _baslik_ve_sayfa(ad):
+    """(besleme başlığı, HTML sayfasının yolu, besleme URL adı ve argümanları) ya da kapsam yoksa None"""
+    if ad == TUM:
+        return SITE_BASLIGI, reverse('mesaj_listesi'), ('besleme', {})
+    tur, _, pk = ad.partition(':')
+    if tur == 'kategori':
+        isim = Kategori.objects.filter(pk=pk).values_list('isim', flat=True).first()
+        yol, url_adi, argumanlar = reverse('kategori_mesajlari', args=[pk]), 'kategori_beslemesi', {'kategori_id': pk}
+    else:
+        isim = Etiket.objects.filter(pk=pk).values_list('isim', flat=True).first()
+        isim = isim and f'#{isim}'
+        yol, url_adi, argumanlar = reverse('etiket_mesajlari', args=[pk]), 'etiket_beslemesi', {'etiket_id': pk}
+    if isim is None:
+        return None
+    return f'{isim} - {SITE_BASLIGI}', yol, (url_adi, argumanlar)
+
+
+def _son_mesajlar(ad):
+    mesajlar = (
+        Mesaj.objects.select_related('yazar', 'kategori')
+        .prefetch_related('etiketler')
+        .order_by('-tarih', '-id')
+    )
+    tur, _, pk = ad.partition(':')
+    if tur == 'kategori':
+        mesajlar = mesajlar.filter(kategori_id=pk)
+    elif tur == 'etiket':
+        mesajlar = mesajlar.filter(etiketler=pk)
+    return list(mesajlar[:BESLEME_BOYUTU])
+
+
+def _girdi(mesaj):
+    return {
+        'baslik': mesaj.baslik,
+        'icerik': mesaj.icerik,
+        'url': _mutlak(mesaj.get_absolute_url()),
+        'tarih': mesaj.tarih,
+        'guncellenme': mesaj.guncellenme,
+        'yazar': mesaj.yazar.username,
+        'etiketler': ([mesaj.kategori.isim] if mesaj.kategori_id else []) + [e.isim for e in mesaj.etiketler.all()],
+    }
+
+
+def _xml(sinif, baslik, sayfa, besleme_url, girdiler):
+    besleme = sinif(title=baslik, link=sayfa, description=baslik, language='tr', feed_url=besleme_url)
+    for girdi in girdiler:
+        besleme.add_item(
+            title=girdi['baslik'],
+            link=girdi['url'],
+            description=girdi['icerik'],
+            unique_id=girdi['url'],
+            pubdate=girdi['tarih'],
+            updateddate=girdi['guncellenme'],
+            author_name=girdi['yazar'],
+            categories=girdi['etiketler'],
+        )
+    return besleme.writeString('utf-8').encode('utf-8')
+
+
+def _json_feed(baslik, sayfa, besleme_url, girdiler):
+    # https://www.jsonfeed.org/version/1.1/
+    return json.dumps({
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': baslik,
+        'home_page_url': sayfa,
+        'feed_url': besleme_url,
+        'language': 'tr',
+        'items': [
+            {
+                'id': girdi['url'],
+                'url': girdi['url'],
+                'title': girdi['baslik'],
+                'content_text': girdi['icerik'],
+                'date_published': girdi['tarih'].isoformat(),
+                'date_modified': girdi['guncellenme'].isoformat(),
+                'authors': [{'name': girdi['yazar']}],
+                'tags': girdi['etiketler'],
+            }
+            for girdi in girdiler
+        ],
+    }, ensure_ascii=False).encode('utf-8')
+
+
+def kur(ad):
+    """Kapsamın kaydını veritabanından kurup saklar; kapsam yoksa kaydı siler ve None döndürür"""
+    bilgi = _baslik_ve_sayfa(ad)
+    if bilgi is None:
+        beslemeleri_sil([ad])
+        return None
+    baslik, yol, (url_adi, argumanlar) = bilgi
+    mesajlar = _son_mesajlar(ad)
+    girdiler = [_girdi(mesaj) for mesaj in mesajlar]
+    sayfa = _mutlak(yol)
+
+    bicimler = {}
+    for bicim in ICERIK_TURLERI:
+        besleme_url = _mutlak(reverse(url_adi, kwargs={**argumanlar, 'bicim': bicim}))
+        if bicim == 'json':
+            icerik = _json_feed(baslik, sayfa, besleme_url, girdiler)
+        else:
+            icerik = _xml(Rss201rev2Feed if bicim == 'rss' else Atom1Feed, baslik, sayfa, besleme_url, girdiler)
+        bicimler[bicim] = (icerik, f'"{hashlib.md5(icerik).hexdigest()}"')
+
+    ozet = {
+        'idler': frozenset(mesaj.pk for mesaj in mesajlar),
+        # Listedeki en eski girdi; bundan eski bir mesaj dolu beslemeye giremez
+        'sinir': (mesajlar[-1].tarih, mesajlar[-1].pk) if len(mesajlar) >= BESLEME_BOYUTU else None,
+    }
+    kayit = {
+        'son_degisiklik': int(max(m.guncellenme for m in mesajlar).timestamp()) if mesajlar else None,
+        'bicimler': bicimler,
+    }
+    onbellek().set_many({_anahtar(ad): kayit, _ozet_anahtari(ad): ozet}, BESLEME_SURESI)
+    return kayit
+
+
+def kayit_al(ad):
+    """Kapsamın kaydını tek önbellek okumasıyla döndürür; kayıt ya da özeti yoksa kurar"""
+    bulunan = onbellek().get_many([_anahtar(ad), _ozet_anahtari(ad)])
+    if len(bulunan) < 2:
+        # Özeti düşmüş bir kayıt görevlerce güncellenmez
+        return kur(ad)
+    return bulunan[_anahtar(ad)]
+
+
+def beslemeleri_sil(kapsamlar):
+    """Toplu değişikliklerden sonra etkilenen kayıtları düşürür"""
+    onbellek().delete_many([anahtar for ad in kapsamlar for anahtar in (_anahtar(ad), _ozet_anahtari(ad))])
+
+
+# -- Artımlı güncelleme ------------------------------------------------------------
+
+def gorev_anahtarlari(mesaj_id, kategori_idleri=(), etiket_idleri=()):
+    """Mesajın girdiği ya da çıktığı olası kapsamlar için "kapsam@mesaj_id" görev anahtarları"""
+    adlar = [TUM]
+    adlar += [kapsam(kategori_id=pk) for pk in set(kategori_idleri) if pk]
+    adlar += [kapsam(etiket_id=pk) for pk in set(etiket_idleri)]
+    return [f'{ad}@{mesaj_id}' for ad in adlar]
+
+
+def _etkiler(ozet, pk, tarih):
+    if pk is None or pk in ozet['idler']:
+        return True
+    if tarih is None:
+        # Mesaj silinmiş; listede değilse besleme değişmez
+        return False
+    return ozet['sinir'] is None or (tarih, pk) > ozet['sinir']
+
+
+def etkilenen_kapsamlar(anahtarlar):
+    """Görev anahtarlarından yenilenmesi gereken, önbellekte bulunan kapsamlar.
+
+    Gövdeler değil yalnızca özet anahtarları okunur. "kapsam" anahtarı kayıt
+    varsa koşulsuz (ör. ad değişikliği), "kapsam@mesaj_id" ise yalnızca mesaj
+    listedeyse ya da listeye girecek kadar yeniyse kapsamı yeniler.
+    """
+    mesajlar = defaultdict(set)
+    for anahtar in anahtarlar:
+        ad, _, pk = anahtar.partition('@')
+        mesajlar[ad].add(int(pk) if pk else None)
+    bulunan = onbellek().get_many([_ozet_anahtari(ad) for ad in mesajlar])
+    ozetler = {ad: bulunan[_ozet_anahtari(ad)] for ad in mesajlar if _ozet_anahtari(ad) in bulunan}
+    idler = {pk for ad in ozetler for pk in mesajlar[ad] if pk is not None}
+    tarihler = dict(Mesaj.objects.filter(pk__in=idler).values_list('pk', 'tarih')) if idler else {}
+    return [ad for ad, ozet in ozetler.items() if any(_etkiler(ozet, pk, tarihler.get(pk)) for pk in mesajlar[ad])]
+
+
+def tumunu_kur():
+    """Genel, her kategori ve mesajı olan her etiket için kayıt kurar; kurulan sayıyı döndürür"""
+    adlar = [TUM]
+    adlar += [kapsam(kategori_id=pk) for pk in Kategori.objects.values_list('pk', flat=True)]
+    adlar += [kapsam(etiket_id=pk) for pk in Etiket.objects.filter(mesaj_sayisi__gt=0).values_list('pk', flat=True)]
+    return sum(kur(ad) is not None for ad in adlar)
@@ -0,0 +1,137 @@
+"""Etiket otomatik tamamlama dizini ve etiket bulutu.
+
+Dizin her süreçte bellekte tutulan, normalleştirilmiş adlara göre sıralı
+bir dizidir; önek araması ikili arama ile O(log n + k) sürer. Etiket
+eklenip silindikçe sinyallerle yerinde güncellenir. Süreçler arasındaki
+tutarlılık önbellekteki "etiket_dizini" sürümüyle sağlanır: sürüm yerel
+kopyanınkinden farklıysa (başka bir süreç ya da toplu bir işlem etiketleri
+değiştirdiyse) dizin veritabanından yeniden kurulur.
+"""
+import bisect
+import math
+import threading
+
+from . import onbellek
+from .arama import normallestir
+from .models import Etiket
+
+DIZIN_SURUMU = 'etiket_dizini'
+_ONEK = 'mesajlar'
+
+# Bulutta gösterilen en çok etiket ve yazı boyutu kademe sayısı
+BULUT_BOYUTU = 150
+BULUT_KADEMESI = 5
+
+
+class EtiketDizini:
+    """(normalleştirilmiş ad, id, ad) üçlülerinin sıralı listesi; değiştirilmez, güncellemeler kopya üretir"""
+
+    def __init__(self, satirlar, surum):
+        self.surum = surum
+        self._kayitlar = sorted((normallestir(isim), pk, isim) for pk, isim in satirlar)
+        self._anahtarlar = {pk: anahtar for anahtar, pk, _ in self._kayitlar}
+
+    def __len__(self):
+        return len(self._kayitlar)
+
+    def ara(self, onek, limit=10):
+        """Adı önekle başlayan en çok `limit` etiketi ada göre sıralı (id, ad) olarak döndürür"""
+        onek = normallestir(onek).strip()
+        if not onek:
+            return []
+        sonuc = []
+        konum = bisect.bisect_left(self._kayitlar, (onek,))
+        while konum < len(self._kayitlar) and len(sonuc) < limit:
+            anahtar, pk, isim = self._kayitlar[konum]
+            if not anahtar.startswith(onek):
+                break
+            sonuc.append((pk, isim))
+            konum += 1
+        return sonuc
+
+    def degistir(self, pk, isim, surum):
+        """Etiketin yeni adıyla (isim None ise çıkarılmış) yeni bir dizin döndürür"""
+        yeni = object.__new__(EtiketDizini)
+        yeni.surum = surum
+        yeni._kayitlar = list(self._kayitlar)
+        yeni._anahtarlar = dict(self._anahtarlar)
+        eski = yeni._anahtarlar.pop(pk, None)
+        if eski is not None:
+            konum = bisect.bisect_left(yeni._kayitlar, (eski, pk))
+            if konum < len(yeni._kayitlar) and yeni._kayitlar[konum][1] == pk:
+                del yeni._kayitlar[konum]
+        if isim is not None:
+            anahtar = normallestir(isim)
+            bisect.insort(yeni._kayitlar, (anahtar, pk, isim))
+            yeni._anahtarlar[pk] = anahtar
+        return yeni
+
+
+_dizin = None
+_kilit = threading.Lock()
+
+
+def dizin():
+    """Güncel dizini döndürür; önbellekteki sürüm değiştiyse yeniden kurar"""
+    global _dizin
+    surum = onbellek.surumler([DIZIN_SURUMU])[DIZIN_SURUMU]
+    mevcut = _dizin
+    if mevcut is not None and mevcut.surum == surum:
+        return mevcut
+    with _kilit:
+        if _dizin is None or _dizin.surum != surum:
+            satirlar = Etiket.objects.order_by().values_list('pk', 'isim').iterator(chunk_size=5000)
+            _dizin = EtiketDizini(satirlar, surum)
+        return _dizin
+
+
+def etiket_degisti(pk, isim=None):
+    """Etiket eklendi, yeniden adlandırıldı (isim) ya da silindi (None); işlem tamamlandıktan sonra çağrılır"""
+    global _dizin
+    yeni_surum = onbellek.gecersiz_kil(DIZIN_SURUMU)[DIZIN_SURUMU]
+    with _kilit:
+        # Yerel dizin bir önceki sürümdeyse araya başka bir değişiklik girmemiştir;
+        # aksi halde bir sonraki okumada yeniden kurulur
+        if _dizin is not None and _dizin.surum + 1 == yeni_surum:
+            _dizin = _dizin.degistir(pk, isim, yeni_surum)
+
+
+def _agirlik(sayi, en_az, aralik):
+    if not aralik:
+        return (BULUT_KADEMESI + 1) // 2
+    return 1 + round((math.log(sayi) - en_az) / aralik * (BULUT_KADEMESI - 1))
+
+
+def _bulut_hesapla():
+    satirlar = list(
+        Etiket.objects.filter(mesaj_sayisi__gt=0)
+        .order_by('-mesaj_sayisi', 'isim')
+        .values_list('pk', 'isim', 'mesaj_sayisi')[:BULUT_BOYUTU]
+    )
+    if not satirlar:
+        return []
+    # Mesaj sayıları uzun kuyruklu dağıldığı için kademeler logaritmik ölçekte
+    en_az = math.log(satirlar[-1][2])
+    aralik = math.log(satirlar[0][2]) - en_az
+    return sorted(
+        (
+            {'id': pk, 'isim': isim, 'mesaj_sayisi': sayi, 'agirlik': _agirlik(sayi, en_az, aralik)}
+            for pk, isim, sayi in satirlar
+        ),
+        key=lambda etiket: normallestir(etiket['isim']),
+    )
+
+
+def etiket_bulutu():
+    """En çok mesajı olan etiketler ada göre sıralı, 1..BULUT_KADEMESI ağırlıklı.
+
+    Sayılar sık değiştiğinden sonuç süreyle önbelleğe alınır; etiket adları
+    değişince ("adlar" sürümü) hemen yenilenir.
+    """
+    cache = onbellek.onbellek()
+    anahtar = f"{_ONEK}:etiket_bulutu:{onbellek.surum_imzasi(['adlar'])}"
+    bulut = cache.get(anahtar)
+    if bulut is None:
+        bulut = _bulut_hesapla()
+        cache.set(anahtar, bulut, onbellek.ONBELLEK_SURESI)
+    return bulut
@@ -1,6 +1,29 @@
+import copy
+
 from django import forms
+from django.urls import reverse_lazy
 from .models import Mesaj, Kategori, Etiket
 
+class EtiketSecici(forms.SelectMultiple):
+    """Yalnızca seçili etiketleri HTML'e yazar; diğerleri otomatik tamamlama ile aranıp eklenir"""
+    
+    class Media:
+        js = ['mesajlar/etiket_secici.js']
+    
+    def __init__(self, attrs=None):
+        super().__init__({'data-tamamla-url': reverse_lazy('api_etiket_tamamla'), **(attrs or {})})
+    
+    def optgroups(self, name, value, attrs=None):
+        # Tüm etiketler yerine yalnızca seçilenler sorgulanır
+        secenekler = self.choices
+        secili = [pk for pk in value if str(pk).isdigit()]
+        self.choices = copy.copy(secenekler)
+        self.choices.queryset = secenekler.queryset.filter(pk__in=secili)
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = secenekler
+
 class MesajForm(forms.ModelForm):
     class Meta:
         model = Mesaj
@@ -9,7 +32,7 @@ class MesajForm(forms.ModelForm):
             'baslik': forms.TextInput(attrs={'class': 'form-control'}),
             'icerik': forms.Textarea(attrs={'class': 'form-control', 'rows': 5}),
             'kategori': forms.Select(attrs={'class': 'form-select'}),
-            'etiketler': forms.SelectMultiple(attrs={'class': 'form-select'}),
+            'etiketler': EtiketSecici(attrs={'class': 'form-select'}),
         }
 
 class KategoriForm(forms.ModelForm):
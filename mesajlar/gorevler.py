@@ -0,0 +1,116 @@
+"""Mesaj yazmalarından sonra arka planda çalışan görevler.
+
+Sinyaller bu modüldeki yardımcılarla görev ekler. Görevin anahtarı ilgili
+kaydın id'sidir; işleyiciler veritabanının güncel halini okur. Böylece aynı
+mesaj ya da kategori için biriken görevler tek seferde ve doğru sonuçla
+işlenir, yeniden denemeler de zararsızdır.
+"""
+from collections import defaultdict
+from datetime import date
+
+from . import beslemeler, havuz, istatistik, onbellek
+from .arama import arama_motoru
+from .kuyruk import gorev, kuyruga_ekle
+from .sayaclar import EtiketBaglantisi, etiket_sayaclarini_hesapla, kategori_sayaclarini_hesapla
+
+
+def _idler(gorevler):
+    return sorted({int(g.anahtar) for g in gorevler})
+
+
+def mesaj_indekslensin(*mesaj_idleri):
+    kuyruga_ekle('arama_indeksi', mesaj_idleri)
+
+
+# Sayaçlar yazan işlemde F() farkıyla güncellenir; bu görevler yalnızca onarım
+# içindir (manage.py mesaj_sayaclari --kuyruk)
+def kategoriler_sayilsin(*kategori_idleri):
+    kuyruga_ekle('kategori_sayaci', {pk for pk in kategori_idleri if pk})
+
+
+def etiketler_sayilsin(*etiket_idleri):
+    kuyruga_ekle('etiket_sayaci', set(etiket_idleri))
+
+
+def beslemeler_guncellensin(*anahtarlar):
+    kuyruga_ekle('besleme', set(anahtarlar))
+
+
+def etiket_kapsamlari_guncellensin(*mesaj_idleri):
+    kuyruga_ekle('etiket_kapsamlari', mesaj_idleri)
+
+
+def havuza_eklensin(mesaj_id, *kapsamlar):
+    kuyruga_ekle('havuz', {f'{ad}@{mesaj_id}' for ad in kapsamlar})
+
+
+def havuz_kurulsun(*kapsamlar):
+    kuyruga_ekle('havuz_kur', set(kapsamlar))
+
+
+def istatistik_guncellensin(*gunler):
+    kuyruga_ekle('istatistik', {gun.isoformat() for gun in gunler})
+
+
+@gorev('arama_indeksi')
+def arama_indeksini_guncelle(gorevler):
+    arama_motoru().yeniden_indeksle(_idler(gorevler))
+    # Arama sonuçları liste sayfalarında gösterilir
+    onbellek.gecersiz_kil('liste')
+
+
+@gorev('kategori_sayaci')
+def kategori_sayaclarini_guncelle(gorevler):
+    idler = _idler(gorevler)
+    kategori_sayaclarini_hesapla(idler)
+    onbellek.gecersiz_kil('kategoriler', *(f'kategori:{pk}' for pk in idler))
+
+
+@gorev('etiket_sayaci')
+def etiket_sayaclarini_guncelle(gorevler):
+    idler = _idler(gorevler)
+    etiket_sayaclarini_hesapla(idler)
+    onbellek.gecersiz_kil(*(f'etiket:{pk}' for pk in idler))
+
+
+def _beslemeleri_kur(anahtarlar):
+    for ad in sorted(beslemeler.etkilenen_kapsamlar(anahtarlar)):
+        beslemeler.kur(ad)
+
+
+@gorev('besleme')
+def beslemeleri_guncelle(gorevler):
+    # Anahtarlar "kapsam" ya da "kapsam@mesaj_id" biçimindedir ("tum", "kategori:3@12")
+    _beslemeleri_kur(g.anahtar for g in gorevler)
+
+
+@gorev('etiket_kapsamlari')
+def etiket_kapsamlarini_guncelle(gorevler):
+    # Düzenlenen mesajların etiketleri burada okunur; etiket sayfaları ve beslemeleri yenilenir
+    baglantilar = list(
+        EtiketBaglantisi.objects.filter(mesaj_id__in=_idler(gorevler)).values_list('mesaj_id', 'etiket_id')
+    )
+    onbellek.gecersiz_kil(*{f'etiket:{etiket_id}' for _, etiket_id in baglantilar})
+    _beslemeleri_kur(f'{beslemeler.kapsam(etiket_id=etiket_id)}@{mesaj_id}' for mesaj_id, etiket_id in baglantilar)
+
+
+@gorev('havuz')
+def havuzlara_ekle(gorevler):
+    # Anahtarlar "kapsam@mesaj_id" biçimindedir; kapsam başına tek ekleme yapılır
+    eklenecekler = defaultdict(list)
+    for g in gorevler:
+        ad, _, pk = g.anahtar.rpartition('@')
+        eklenecekler[ad].append(int(pk))
+    havuz.ekle(eklenecekler)
+
+
+@gorev('havuz_kur')
+def havuzlari_kur(gorevler):
+    for ad in sorted({g.anahtar for g in gorevler}):
+        havuz.kur(ad)
+
+
+@gorev('istatistik')
+def istatistikleri_guncelle(gorevler):
+    # Anahtarlar ISO biçiminde günlerdir; ardışık günler tek aralıkta hesaplanır
+    istatistik.gunleri_hesapla(date.fromisoformat(g.anahtar) for g in gorevler)
@@ -0,0 +1,289 @@
+"""Günün mesajı ve rastgele mesaj seçimi için önbellekteki id havuzları.
+
+Her kapsamın ("tum" ve her kategori için "kategori:<id>") mesaj id'leri
+önbellekte PARCA_BOYUTU'luk parçalar halinde, ayrı bir uzunluk anahtarıyla
+tutulur. Seçim uzunluktan bir sıra numarası çeker, yalnızca o sırayı içeren
+parçayı okur ve ardından tek bir birincil anahtar sorgusu çalıştırır; ne
+havuzun tamamı aktarılır ne de ORDER BY RANDOM() ya da COUNT + OFFSET gibi
+tabloyu tarayan sorgular kullanılır. Parçalar küçük olduğu için memcached'in
+öğe boyutu sınırına takılmaz.
+
+Havuzlar yalnızca sona eklenerek büyür: yeni mesajlar ve kategorisi
+değişen mesajlar "havuz" göreviyle (bkz. gorevler.py) ilgili havuzların
+sonuna eklenir. Silinen ya da başka kategoriye taşınan mesajların id'leri
+havuzda kalır; seçimde bulunmazlarsa başka bir sıra denenir, bu yüzden
+seçim canlı mesajlar arasında eşit olasılıklıdır. Havuz yoksa ya da
+bozuksa seçim birincil anahtar aralığında rastgele bir noktadan keyset ile
+yapılır; okuma istekleri görev eklemez. Havuzu "havuz_kur" görevi
+veritabanından yeniden kurar: toplu yazmalar düşürdükleri havuzlar için,
+işçi de kapsama eklenecek mesaj geldiğinde havuz kurulmamış ya da son
+parçası düşmüşse bu görevi ekler. Yayına alırken ve bayat id'ler
+çoğaldığında `manage.py mesaj_havuzu` hepsini kurar.
+"""
+import bisect
+import hashlib
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import islice
+
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from . import gorevler
+from .models import Kategori, Mesaj
+from .onbellek import onbellek
+
+TUM = 'tum'
+_ONEK = 'mesajlar'
+
+# Bir önbellek anahtarındaki id sayısı
+PARCA_BOYUTU = 1000
+# Bayat id'ye denk gelen seçimde denenecek en çok sıra
+DENEME = 3
+# Ekleme ve kurma aynı havuzu aynı anda yazmasın diye önbellekte tutulan kilit
+KILIT_SURESI = 600
+KILIT_BEKLEMESI = 5
+
+
+class HavuzMesgul(Exception):
+    """Havuz başka bir işçi tarafından yazılıyor; görev yeniden denenir"""
+
+
+def kapsam(kategori_id=None):
+    return f'kategori:{kategori_id}' if kategori_id else TUM
+
+
+def _boy_anahtari(ad):
+    return f'{_ONEK}:havuz:{ad}:boy'
+
+
+def _kurulum_anahtari(ad):
+    return f'{_ONEK}:havuz:{ad}:kurulum'
+
+
+def _parca_anahtari(ad, parca_no):
+    return f'{_ONEK}:havuz:{ad}:parca:{parca_no}'
+
+
+def _gunun_anahtari(ad, tarih):
+    return f'{_ONEK}:gunun_mesaji:{ad}:{tarih.isoformat()}'
+
+
+@contextmanager
+def _kilit(ad):
+    cache = onbellek()
+    anahtar = f'{_ONEK}:havuz:{ad}:kilit'
+    son = time.monotonic() + KILIT_BEKLEMESI
+    while not cache.add(anahtar, 1, KILIT_SURESI):
+        if time.monotonic() > son:
+            raise HavuzMesgul(ad)
+        time.sleep(0.05)
+    try:
+        yield
+    finally:
+        cache.delete(anahtar)
+
+
+def _kapsamdakiler(ad):
+    mesajlar = Mesaj.objects.order_by('pk')
+    if ad != TUM:
+        mesajlar = mesajlar.filter(kategori_id=int(ad.split(':', 1)[1]))
+    return mesajlar
+
+
+# -- Kurma -----------------------------------------------------------------------
+
+def kur(ad):
+    """Kapsamın havuzunu veritabanından parça parça kurar; id sayısını döndürür"""
+    if ad != TUM and not Kategori.objects.filter(pk=ad.split(':', 1)[1]).exists():
+        havuzlari_sil([int(ad.split(':', 1)[1])], genel=False, yeniden_kur=False)
+        return 0
+    cache = onbellek()
+    idler = _kapsamdakiler(ad).values_list('pk', flat=True).iterator(chunk_size=5000)
+    with _kilit(ad):
+        eski_boy = cache.get(_boy_anahtari(ad)) or 0
+        boy, son_id, parcalar = 0, 0, {}
+        while parca := list(islice(idler, PARCA_BOYUTU)):
+            parcalar[_parca_anahtari(ad, boy // PARCA_BOYUTU)] = parca
+            boy, son_id = boy + len(parca), parca[-1]
+            if len(parcalar) >= 50:
+                cache.set_many(parcalar, None)
+                parcalar = {}
+        cache.set_many(parcalar, None)
+        # Kurulan kısım id sırasındadır; eklemeler zaten kurulumda olan id'leri bununla atlar
+        cache.set_many({_kurulum_anahtari(ad): (boy, son_id), _boy_anahtari(ad): boy}, None)
+        # Küçülen havuzun artık kullanılmayan parçaları
+        cache.delete_many([_parca_anahtari(ad, no) for no in range(_parca_sayisi(boy), _parca_sayisi(eski_boy))])
+    return boy
+
+
+def _parca_sayisi(boy):
+    return -(-boy // PARCA_BOYUTU)
+
+
+def tumunu_kur():
+    """Genel ve her kategorinin havuzunu kurar; kurulan kapsam sayısını döndürür"""
+    adlar = [TUM, *(kapsam(pk) for pk in Kategori.objects.values_list('pk', flat=True))]
+    for ad in adlar:
+        kur(ad)
+    return len(adlar)
+
+
+def havuzlari_sil(kategori_idleri=(), genel=True, yeniden_kur=True):
+    """Toplu değişikliklerden sonra etkilenen havuzları düşürür ve yeniden kurulmalarını kuyruğa ekler"""
+    cache = onbellek()
+    adlar = [TUM] if genel else []
+    adlar += [kapsam(pk) for pk in kategori_idleri]
+    boylar = cache.get_many([_boy_anahtari(ad) for ad in adlar])
+    cache.delete_many([
+        anahtar
+        for ad in adlar
+        for anahtar in [
+            _boy_anahtari(ad), _kurulum_anahtari(ad),
+            *(_parca_anahtari(ad, no) for no in range(_parca_sayisi(boylar.get(_boy_anahtari(ad), 0)))),
+        ]
+    ])
+    if yeniden_kur and adlar:
+        gorevler.havuz_kurulsun(*adlar)
+
+
+# -- Ekleme (görev işçisinde) ----------------------------------------------------
+
+def ekle(eklenecekler):
+    """{kapsam: [mesaj id]}: hâlâ o kapsamda olan mesajları havuzların sonuna ekler"""
+    idler = {pk for pkler in eklenecekler.values() for pk in pkler}
+    kategoriler = dict(Mesaj.objects.filter(pk__in=idler).values_list('pk', 'kategori_id'))
+    for ad, pkler in eklenecekler.items():
+        gecerli = sorted(pk for pk in set(pkler) if pk in kategoriler and ad in (TUM, kapsam(kategoriler[pk])))
+        if gecerli:
+            _sona_ekle(ad, gecerli)
+
+
+def _sona_ekle(ad, idler):
+    cache = onbellek()
+    with _kilit(ad):
+        boy = cache.get(_boy_anahtari(ad))
+        if boy is None:
+            # Kurulmamış havuz kurulurken bu id'leri veritabanından okur
+            gorevler.havuz_kurulsun(ad)
+            return
+        # Kurulumdan önce eklenmiş görevler, kurulumun zaten okuduğu id'leri getirebilir
+        kurulum = cache.get(_kurulum_anahtari(ad), (0, 0))
+        idler = [pk for pk in idler if not _kurulumda(ad, pk, *kurulum)]
+        if not idler:
+            return
+        son_no = boy // PARCA_BOYUTU
+        son = cache.get(_parca_anahtari(ad, son_no), []) if boy % PARCA_BOYUTU else []
+        if len(son) != boy % PARCA_BOYUTU:
+            # Son parça önbellekten düşmüş; sıralar tutmaz. Yeniden kurulan havuz bu id'leri de içerir
+            gorevler.havuz_kurulsun(ad)
+            return
+        parcalar = {_parca_anahtari(ad, son_no): son}
+        for sira, pk in enumerate(idler, start=boy):
+            parcalar.setdefault(_parca_anahtari(ad, sira // PARCA_BOYUTU), []).append(pk)
+        cache.set_many(parcalar, None)
+        cache.set(_boy_anahtari(ad), boy + len(idler), None)
+
+
+def _kurulumda(ad, pk, kurulan, son_id):
+    """pk, havuzun kurulumda okunan (id sırasındaki) ilk `kurulan` sırasında var mı; parçalarda ikili arama"""
+    if pk > son_id:
+        return False
+    cache = onbellek()
+    alt, ust = 0, _parca_sayisi(kurulan) - 1
+    while alt <= ust:
+        orta = (alt + ust) // 2
+        parca = cache.get(_parca_anahtari(ad, orta))
+        if parca is None:
+            return False
+        # Son parçanın kurulumdan sonra eklenen kısmı sırasız olabilir
+        parca = parca[:kurulan - orta * PARCA_BOYUTU]
+        if pk < parca[0]:
+            ust = orta - 1
+        elif pk > parca[-1]:
+            alt = orta + 1
+        else:
+            konum = bisect.bisect_left(parca, pk)
+            return konum < len(parca) and parca[konum] == pk
+    return False
+
+
+# -- Seçim -----------------------------------------------------------------------
+
+def _mesaj(pk, kategori_id):
+    mesaj = Mesaj.objects.select_related('yazar', 'kategori').filter(pk=pk).first()
+    if mesaj is None or (kategori_id and mesaj.kategori_id != kategori_id):
+        return None
+    return mesaj
+
+
+def _aralikta_sec(kategori_id, rastgele):
+    """Havuz yokken: birincil anahtar aralığındaki rastgele bir noktadan sonraki ilk mesaj.
+
+    İki indeks sorgusudur; id boşluklarından dolayı seçim tam eşit olasılıklı değildir.
+    """
+    mesajlar = Mesaj.objects.order_by('pk')
+    if kategori_id:
+        mesajlar = mesajlar.filter(kategori_id=kategori_id)
+    sinirlar = mesajlar.aggregate(en_kucuk=Min('pk'), en_buyuk=Max('pk'))
+    if sinirlar['en_kucuk'] is None:
+        return None
+    pk = sinirlar['en_kucuk'] + rastgele(sinirlar['en_buyuk'] - sinirlar['en_kucuk'] + 1)
+    return mesajlar.select_related('yazar', 'kategori').filter(pk__gte=pk).first()
+
+
+def _sec(ad, kategori_id, rastgele):
+    """Havuzdan rastgele(uzunluk) sırasındaki mesajı seçer; bayat id'lerde başka sıra dener.
+
+    Seçim okuma isteklerinde çalışır, görev eklemez: havuz yoksa ya da
+    bozuksa aralıktan seçilir, havuzu yazma yolu yeniden kurdurur.
+    """
+    cache = onbellek()
+    boy = cache.get(_boy_anahtari(ad))
+    if boy is None:
+        return _aralikta_sec(kategori_id, rastgele)
+    if not boy:
+        return None
+    for _ in range(DENEME):
+        sira = rastgele(boy)
+        parca = cache.get(_parca_anahtari(ad, sira // PARCA_BOYUTU))
+        if parca is None:
+            # Parça önbellekten düşmüş
+            break
+        konum = sira % PARCA_BOYUTU
+        mesaj = _mesaj(parca[konum], kategori_id) if konum < len(parca) else None
+        if mesaj is not None:
+            return mesaj
+    # Havuz bozuk ya da çoğu id bayat
+    return _aralikta_sec(kategori_id, rastgele)
+
+
+def rastgele_mesaj(kategori_id=None):
+    return _sec(kapsam(kategori_id), kategori_id, random.randrange)
+
+
+def gunun_mesaji(kategori_id=None, tarih=None):
+    """Verilen gün (varsayılan: bugün, etkin saat diliminde) ve kapsam için hep aynı mesajı döndürür.
+
+    Seçim gün ve kapsamdan türetilir ve gün boyunca sabitlenir; gün içinde
+    eklenen ya da silinen mesajlar seçimi değiştirmez (seçilen silinmedikçe).
+    """
+    tarih = tarih or timezone.localdate()
+    ad = kapsam(kategori_id)
+    cache = onbellek()
+    anahtar = _gunun_anahtari(ad, tarih)
+
+    pk = cache.get(anahtar)
+    if pk is not None:
+        mesaj = _mesaj(pk, kategori_id)
+        if mesaj is not None:
+            return mesaj
+
+    tohum = int(hashlib.sha256(f'{tarih.isoformat()}:{ad}'.encode()).hexdigest()[:16], 16)
+    mesaj = _sec(ad, kategori_id, random.Random(tohum).randrange)
+    if mesaj is not None:
+        # Saat dilimleri arasında aynı tarih iki güne yayılabilir
+        cache.set(anahtar, mesaj.pk, int(timedelta(days=2).total_seconds()))
+    return mesaj
@@ -0,0 +1,193 @@
+"""İstemci başına hız sınırı (token bucket) ve yük altında hafif arama.
+
+settings.MESAJ_HIZ_SINIRLARI URL adlarına kural atar:
+
+    'mesaj_listesi': {'parametre': 'arama', 'ip': '30/m', 'kullanici': '60/m', 'genel': '20/s'}
+
+- 'kullanici' giriş yapmış kullanıcıların, 'ip' anonim istemcilerin
+  kovasıdır. Oturum çerezi olmayan istemci anonimdir; oturum açılmaz. "30/m" dakikada 30 jeton demektir, kovada en çok 30 jeton
+  birikir. Kova boşsa istek 429 ve Retry-After ile reddedilir.
+- 'genel' tüm istemcilerin paylaştığı kovadır. Boşaldığında istek
+  reddedilmez; request.hafif_mod işaretlenir ve görünüm ucuz bir yola
+  geçer (ör. yalnızca başlıkta arama).
+- 'yontemler' verilirse yalnızca bu HTTP yöntemleri sayılır. 'parametre'
+  verilirse yalnızca bu GET parametresi dolu olan istekler sayılır.
+
+Kovalar paylaşılan önbellekte GCRA ile tutulur. Her kova tek bir sayıdır:
+sıradaki jetonun "teorik varış zamanı" (ms). Bu sayı atomik incr ile
+ilerletildiği için sınırlar tüm işçi süreçlerinde birlikte geçerlidir.
+"""
+import math
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+from django.shortcuts import render
+
+from .onbellek import onbellek
+from .oturum import oturumsuz_yola_al
+
+_ONEK = 'mesajlar'
+_BIRIMLER = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+OLAYLAR = ('reddedildi', 'hafif')
+
+Oran = namedtuple('Oran', 'kapasite aralik_ms')
+
+
+@lru_cache(maxsize=None)
+def oran_coz(metin):
+    """'30/m' gibi bir oranı (kapasite, jetonlar arası ms) olarak döndürür"""
+    sayi, _, birim = metin.partition('/')
+    sayi = int(sayi)
+    return Oran(sayi, max(1, _BIRIMLER[birim] * 1000 // sayi))
+
+
+def _kova_anahtari(ad):
+    return f'{_ONEK}:kova:{ad}'
+
+
+def jeton_al(ad, oran):
+    """Kovadan bir jeton almayı dener; (izin_verildi, bekleme_saniyesi) döndürür"""
+    cache = onbellek()
+    anahtar = _kova_anahtari(ad)
+    simdi = int(time.time() * 1000)
+    tolerans = oran.kapasite * oran.aralik_ms
+    # Anahtar düşerse kova dolu sayılır; tat en çok simdi + tolerans olabilir
+    sure = math.ceil(tolerans / 1000) + 1
+    try:
+        tat = cache.incr(anahtar, oran.aralik_ms)
+    except ValueError:
+        cache.add(anahtar, simdi + oran.aralik_ms, sure)
+        return True, 0
+    if tat - oran.aralik_ms < simdi:
+        # Kova boşta dolmuş; zaman çizgisi şimdiye çekilir
+        cache.set(anahtar, simdi + oran.aralik_ms, sure)
+        return True, 0
+    if tat - simdi > tolerans:
+        # Reddedilen istek jeton harcamaz
+        cache.decr(anahtar, oran.aralik_ms)
+        return False, (tat - tolerans - simdi) / 1000
+    cache.touch(anahtar, sure)
+    return True, 0
+
+
+def _giris_yapmis(request):
+    # Herkese açık sayfalarda anonim istekler için oturum ve kullanıcı yüklenmez
+    return settings.SESSION_COOKIE_NAME in request.COOKIES and request.user.is_authenticated
+
+
+def _istemci(request, kural):
+    """(kova adı, oran) ya da bu istemci türü için kural yoksa None"""
+    if _giris_yapmis(request):
+        if 'kullanici' in kural:
+            return f'kullanici:{request.user.pk}', kural['kullanici']
+        return None
+    if 'ip' in kural:
+        # Vekil arkasında MESAJ_IP_BASLIGI = 'HTTP_X_REAL_IP' gibi ayarlanmalıdır
+        ip = request.META.get(getattr(settings, 'MESAJ_IP_BASLIGI', 'REMOTE_ADDR'), '')
+        return f"ip:{ip.split(',')[0].strip()}", kural['ip']
+    return None
+
+
+def _uygulanir(kural, request):
+    if 'yontemler' in kural and request.method not in kural['yontemler']:
+        return False
+    if 'parametre' in kural and not request.GET.get(kural['parametre']):
+        return False
+    return True
+
+
+# -- Ölçümler --------------------------------------------------------------------
+
+def _olay_anahtari(url_adi, olay):
+    return f'{_ONEK}:hiz_siniri:{url_adi}:{olay}'
+
+
+def _olay_kaydet(url_adi, olay):
+    cache = onbellek()
+    anahtar = _olay_anahtari(url_adi, olay)
+    try:
+        cache.incr(anahtar)
+    except ValueError:
+        cache.add(anahtar, 0, None)
+        cache.incr(anahtar)
+
+
+def istatistikler():
+    """Kural tanımlı URL adları için [(ad, {'reddedildi': .., 'hafif': ..})] döndürür"""
+    adlar = sorted(getattr(settings, 'MESAJ_HIZ_SINIRLARI', {}))
+    degerler = onbellek().get_many([_olay_anahtari(ad, olay) for ad in adlar for olay in OLAYLAR])
+    return [
+        (ad, {olay: degerler.get(_olay_anahtari(ad, olay), 0) for olay in OLAYLAR})
+        for ad in adlar
+    ]
+
+
+def istatistikleri_sifirla():
+    adlar = getattr(settings, 'MESAJ_HIZ_SINIRLARI', {})
+    onbellek().delete_many([_olay_anahtari(ad, olay) for ad in adlar for olay in OLAYLAR])
+
+
+# -- Middleware ----------------------------------------------------------------
+
+def hafif_mod(request):
+    return getattr(request, 'hafif_mod', False)
+
+
+def hafif_yanit(response):
+    """Hafif modda üretilen yanıt hiçbir önbellekte saklanmasın"""
+    response['Cache-Control'] = 'no-store'
+    response['X-Hafif-Mod'] = '1'
+    return response
+
+
+def _reddet(request, view_func, url_adi, bekleme):
+    saniye = max(1, math.ceil(bekleme))
+    # Herkese açık sayfanın 429'u da oturum açmadan işlenir
+    oturumsuz_yola_al(request, view_func)
+    if url_adi.startswith('api_'):
+        response = JsonResponse({'hata': 'Çok fazla istek.', 'bekleme': saniye}, status=429,
+                                json_dumps_params={'ensure_ascii': False})
+    else:
+        response = render(request, 'mesajlar/cok_fazla_istek.html', {'bekleme': saniye}, status=429)
+    response['Retry-After'] = str(saniye)
+    return response
+
+
+class HizSiniriMiddleware:
+    """Kural tanımlı URL adlarında istemci kovalarını uygular, genel kova boşsa hafif modu açar"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        eslesme = request.resolver_match
+        url_adi = eslesme.url_name if eslesme else None
+        kural = getattr(settings, 'MESAJ_HIZ_SINIRLARI', {}).get(url_adi)
+        if kural is None or not _uygulanir(kural, request):
+            return None
+
+        istemci = _istemci(request, kural)
+        if istemci is not None:
+            kova, oran = istemci
+            izin, bekleme = jeton_al(f'{url_adi}:{kova}', oran_coz(oran))
+            if not izin:
+                _olay_kaydet(url_adi, 'reddedildi')
+                return _reddet(request, view_func, url_adi, bekleme)
+
+        if 'genel' in kural:
+            izin, _ = jeton_al(f'{url_adi}:genel', oran_coz(kural['genel']))
+            if not izin:
+                _olay_kaydet(url_adi, 'hafif')
+                request.hafif_mod = True
+        return None
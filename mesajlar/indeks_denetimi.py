@@ -0,0 +1,94 @@
+"""Sık çalışan sorguların EXPLAIN planlarının denetimi.
+
+Testler (tests.py) ve `manage.py mesaj_indeks_denetimi` aynı sorgu
+listesini kullanır: her sorgunun planında bir indeks kullanılmalı, tam
+tablo taraması ve (izin verilmedikçe) indeks dışı sıralama olmamalıdır.
+Yeni bir liste, sayaç ya da arşiv sorgusu eklendiğinde buraya da eklenir.
+"""
+import re
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import ArsivMesaj, Etiket, Gorev, GunlukKategoriIstatistigi, Mesaj
+from .sayaclar import EtiketBaglantisi
+from .sayfalama import VARSAYILAN_SAYFA_BOYUTU
+
+DESTEKLENEN = ('sqlite', 'postgresql')
+
+# SQLite: "SCAN tablo" (USING INDEX olmadan) tam tablo taramasıdır
+_SQLITE_TAM_TARAMA = re.compile(r"\bSCAN (\w+)\b(?! USING)")
+_SQLITE_INDEKS = re.compile(r'USING (COVERING )?INDEX|USING INTEGER PRIMARY KEY')
+
+
+def sicak_sorgular():
+    """(ad, queryset, sıralama_serbest) üçlüleri.
+
+    sıralama_serbest, sonucun indeks sırasıyla okunamadığı ve küçük bir alt
+    kümenin bellekte sıralanmasının kabul edildiği sorgular içindir.
+    """
+    simdi = timezone.now()
+    boyut = VARSAYILAN_SAYFA_BOYUTU + 1
+    sirali = Mesaj.objects.listing().order_by('-tarih', '-id')
+    sonraki = Q(tarih__lt=simdi) | Q(tarih=simdi, pk__lt=1000)
+    arsiv = ArsivMesaj.objects.order_by('-tarih', '-id')
+    return [
+        ('liste', sirali[:boyut], False),
+        ('liste_sonraki_sayfa', sirali.filter(sonraki)[:boyut], False),
+        ('kategori_mesajlari', sirali.filter(kategori_id=1)[:boyut], False),
+        ('kategori_sonraki_sayfa', sirali.filter(sonraki, kategori_id=1)[:boyut], False),
+        ('etiket_mesajlari', sirali.filter(etiketler=1)[:boyut], True),
+        ('yazar_tarih_araligi',
+         Mesaj.objects.filter(yazar_id=1, tarih__gte=simdi - timedelta(days=30)).order_by('-tarih')[:20], False),
+        ('admin_tarih_araligi',
+         Mesaj.objects.filter(tarih__gte=simdi - timedelta(days=1), tarih__lt=simdi).order_by('-tarih', '-id')[:20],
+         False),
+        ('admin_icerik_uzunlugu_sayim', Mesaj.objects.filter(icerik_uzunlugu__gt=300).order_by().values('pk'), False),
+        # Sayaç onarımı (sayaclar.py) kayıt başına bu sayımları yapar
+        ('kategori_sayaci',
+         Mesaj.objects.filter(kategori_id=1).order_by().values('kategori_id').annotate(sayi=Count('*')), False),
+        ('etiket_sayaci',
+         EtiketBaglantisi.objects.filter(etiket_id=1).order_by().values('etiket_id').annotate(sayi=Count('*')),
+         False),
+        ('etiket_bulutu',
+         Etiket.objects.filter(mesaj_sayisi__gt=0).order_by('-mesaj_sayisi', 'isim').values('pk')[:150], False),
+        ('gorev_kuyrugu',
+         Gorev.objects.filter(durum=Gorev.BEKLIYOR, zaman__lte=simdi).order_by('zaman', 'id')[:100], False),
+        # Arşive taşınacak partiler (arsiv.py) ve /arsiv/ listesi
+        ('arsivlenecekler',
+         Mesaj.objects.filter(tarih__lt=simdi - timedelta(days=365)).order_by('tarih', 'id').values('pk')[:1000],
+         False),
+        ('arsiv_listesi', arsiv[:boyut], False),
+        ('arsiv_sonraki_sayfa', arsiv.filter(sonraki)[:boyut], False),
+        ('istatistik_araligi',
+         GunlukKategoriIstatistigi.objects.filter(gun__gte=simdi.date() - timedelta(days=30), gun__lte=simdi.date())
+         .values('gun').annotate(sayi=Count('*')), True),
+    ]
+
+
+def plan(queryset):
+    if connection.vendor == 'postgresql':
+        # Küçük tablolarda planlayıcı zaten tarar; burada indeksin kullanılabilir olması denetlenir
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            return queryset.explain()
+    return queryset.explain()
+
+
+def sorunlar(plan_metni, siralama_serbest):
+    """Plan metnindeki tam taramaları, indeks dışı sıralamaları ve indekssiz planları döndürür"""
+    bulunan = []
+    if connection.vendor == 'sqlite':
+        bulunan += [f'tam tarama: {tablo}' for tablo in _SQLITE_TAM_TARAMA.findall(plan_metni)]
+        if not siralama_serbest and 'USE TEMP B-TREE FOR ORDER BY' in plan_metni:
+            bulunan.append('indeks dışı sıralama')
+        if not _SQLITE_INDEKS.search(plan_metni):
+            bulunan.append('indeks kullanılmıyor')
+    elif connection.vendor == 'postgresql':
+        bulunan += [f'tam tarama: {tablo}' for tablo in re.findall(r'Seq Scan on (\w+)', plan_metni)]
+        if not siralama_serbest and re.search(r'(^|->)\s*(Incremental )?Sort\b', plan_metni, re.MULTILINE):
+            bulunan.append('indeks dışı sıralama')
+    return bulunan
@@ -0,0 +1,256 @@
+"""Mesaj istatistikleri: günlük özet tabloları ve tarih aralığı sorguları.
+
+Dört özet tablosu (models.py) gün başına kategori, yazar, etiket ve içerik
+uzunluğu dilimi sayılarını tutar. Personel paneli (/istatistikler/) ve
+/api/v1/istatistikler/ her tarih aralığını yalnızca bu tablolardan, birkaç
+küçük GROUP BY ile yanıtlar; Mesaj tablosu okunmaz.
+
+Özetler sayaçlar gibi "istatistik" göreviyle güncel tutulur (bkz.
+gorevler.py). Görevin anahtarı gündür: mesaj kaydedildiğinde, silindiğinde
+ya da etiketleri değiştiğinde o günün satırları yalnızca o günün
+mesajlarından (tarih indeksiyle) baştan hesaplanır. Aynı gün için biriken
+görevler tek hesaplamaya iner, yeniden denemeler zararsızdır. Toplu içe
+aktarım etkilenen günleri kuyruğa ekler; `manage.py mesaj_istatistikleri`
+tümünü baştan kurar.
+
+Arşive taşınan mesajlar (bkz. arsiv.py) istatistiklerden çıkmaz: hesaplama
+Mesaj ile ArsivMesaj'ı birlikte sayar, taşıma ve geri yükleme özetleri
+değiştirmez. Günler settings.TIME_ZONE'a göre belirlenir.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (
+    ArsivMesaj, Etiket, GunlukEtiketIstatistigi, GunlukKategoriIstatistigi,
+    GunlukUzunlukIstatistigi, GunlukYazarIstatistigi, Kategori, Mesaj,
+)
+from .sayaclar import EtiketBaglantisi
+
+# İçerik uzunluğu dilimlerinin alt sınırları. Admin'deki IcerikUzunlugu
+# filtresinin sınırları (100, 300) dilim sınırıdır; gruplar dilimlerden toplanır.
+UZUNLUK_DILIMLERI = (0, 51, 101, 201, 301, 501, 1001)
+UZUNLUK_GRUPLARI = (
+    ('Kısa (0-100 karakter)', 0, 100),
+    ('Orta (101-300 karakter)', 101, 300),
+    ('Uzun (300+ karakter)', 301, None),
+)
+
+VARSAYILAN_GUN_SAYISI = 30
+# Yazar ve etiket listelerinde gösterilen en çok satır
+LISTE_BOYUTU = 10
+
+# Özet tablosu: (gruplama alanı, tablodaki alan, toplam uzunluk tutuluyor mu)
+_TABLOLAR = {
+    GunlukKategoriIstatistigi: ('kategori_id', 'kategori_id', True),
+    GunlukYazarIstatistigi: ('yazar_id', 'yazar_id', True),
+    GunlukEtiketIstatistigi: ('etiket_id', 'etiket_id', False),
+    GunlukUzunlukIstatistigi: ('dilim', 'alt_sinir', False),
+}
+
+
+def tarihin_gunu(an):
+    """Anın yerel saat dilimindeki günü"""
+    return timezone.localtime(an).date()
+
+
+def _gun_basi(gun):
+    return timezone.make_aware(datetime.combine(gun, time.min))
+
+
+def _tarih_filtresi(bas, bit, alan='tarih'):
+    filtre = {}
+    if bas is not None:
+        filtre[f'{alan}__gte'] = _gun_basi(bas)
+    if bit is not None:
+        filtre[f'{alan}__lt'] = _gun_basi(bit + timedelta(days=1))
+    return filtre
+
+
+def _dilim():
+    esikler = zip(UZUNLUK_DILIMLERI, UZUNLUK_DILIMLERI[1:])
+    return Case(
+        *(When(icerik_uzunlugu__lt=ust, then=Value(alt)) for alt, ust in esikler),
+        default=Value(UZUNLUK_DILIMLERI[-1]),
+        output_field=IntegerField(),
+    )
+
+
+# -- Hesaplama -------------------------------------------------------------------
+
+def _say(bas, bit):
+    """Aralıktaki sıcak ve arşivdeki mesajları sayar: {tablo: {(gün, anahtar): [sayı, uzunluk]}}"""
+    tz = timezone.get_current_timezone()
+    sayimlar = {model: defaultdict(lambda: [0, 0]) for model in _TABLOLAR}
+    filtre = _tarih_filtresi(bas, bit)
+
+    # Arşiv ayrı veritabanında olabilir; iki kaynak ayrı sorgulanıp toplanır
+    for mesajlar in (Mesaj.objects.filter(**filtre), ArsivMesaj.objects.filter(**filtre)):
+        gunluk = mesajlar.order_by().annotate(gun=TruncDate('tarih', tzinfo=tz))
+        for model in (GunlukKategoriIstatistigi, GunlukYazarIstatistigi, GunlukUzunlukIstatistigi):
+            alan = _TABLOLAR[model][0]
+            sorgu = gunluk.annotate(dilim=_dilim()) if alan == 'dilim' else gunluk
+            for satir in sorgu.values('gun', alan).annotate(sayi=Count('pk'), uzunluk=Sum('icerik_uzunlugu')):
+                toplam = sayimlar[model][satir['gun'], satir[alan]]
+                toplam[0] += satir['sayi']
+                toplam[1] += satir['uzunluk'] or 0
+
+    etiketler = sayimlar[GunlukEtiketIstatistigi]
+    baglantilar = (
+        EtiketBaglantisi.objects.filter(**_tarih_filtresi(bas, bit, 'mesaj__tarih'))
+        .annotate(gun=TruncDate('mesaj__tarih', tzinfo=tz))
+        .values('gun', 'etiket_id').annotate(sayi=Count('pk')).order_by()
+    )
+    for satir in baglantilar:
+        etiketler[satir['gun'], satir['etiket_id']][0] += satir['sayi']
+    # Arşivde etiketler id listesidir
+    for tarih, etiket_idleri in ArsivMesaj.objects.filter(**filtre).values_list('tarih', 'etiket_idleri').iterator(2000):
+        for etiket_id in etiket_idleri:
+            etiketler[tarihin_gunu(tarih), etiket_id][0] += 1
+    return sayimlar
+
+
+def _gecersizleri_ayikla(sayimlar):
+    """Arşivdeki kısıtsız ilişkilerden silinmiş kayıtlara işaret edenleri düzeltir"""
+    for model, ilgili in ((GunlukKategoriIstatistigi, Kategori), (GunlukYazarIstatistigi, User),
+                          (GunlukEtiketIstatistigi, Etiket)):
+        sayim = sayimlar[model]
+        idler = {anahtar for _, anahtar in sayim if anahtar is not None}
+        gecersiz = idler - set(ilgili.objects.filter(pk__in=idler).values_list('pk', flat=True))
+        for gun, anahtar in [k for k in sayim if k[1] in gecersiz]:
+            sayi, uzunluk = sayim.pop((gun, anahtar))
+            # Silinmiş kategorinin mesajları kategorisizlere sayılır (SET_NULL gibi)
+            if model is GunlukKategoriIstatistigi:
+                toplam = sayim[gun, None]
+                toplam[0] += sayi
+                toplam[1] += uzunluk
+
+
+def araligi_hesapla(bas=None, bit=None):
+    """[bas, bit] günlerinin özetlerini baştan hesaplar; sınır verilmezse tüm geçmişi"""
+    sayimlar = _say(bas, bit)
+    _gecersizleri_ayikla(sayimlar)
+    gun_filtresi = {}
+    if bas is not None:
+        gun_filtresi['gun__gte'] = bas
+    if bit is not None:
+        gun_filtresi['gun__lte'] = bit
+    with transaction.atomic():
+        for model, (_, alan, uzunluklu) in _TABLOLAR.items():
+            model.objects.filter(**gun_filtresi).delete()
+            satirlar = []
+            for (gun, anahtar), (sayi, uzunluk) in sayimlar[model].items():
+                degerler = {'gun': gun, alan: anahtar, 'mesaj_sayisi': sayi}
+                if uzunluklu:
+                    degerler['toplam_uzunluk'] = uzunluk
+                satirlar.append(model(**degerler))
+            model.objects.bulk_create(satirlar, batch_size=1000)
+
+
+def _araliklar(gunler):
+    """Günleri ardışık (başlangıç, bitiş) aralıklarına böler"""
+    aralik = None
+    for g in sorted(set(gunler)):
+        if aralik and g - aralik[1] == timedelta(days=1):
+            aralik[1] = g
+            continue
+        if aralik:
+            yield tuple(aralik)
+        aralik = [g, g]
+    if aralik:
+        yield tuple(aralik)
+
+
+def gunleri_hesapla(gunler):
+    """Verilen günleri yeniden hesaplar; ardışık günler tek aralıkta sorgulanır"""
+    for bas, bit in _araliklar(gunler):
+        araligi_hesapla(bas, bit)
+
+
+# -- Sorgulama -------------------------------------------------------------------
+
+def aralik_al(parametreler):
+    """?baslangic=YYYY-MM-DD&bitis=YYYY-MM-DD; varsayılan son VARSAYILAN_GUN_SAYISI gün.
+
+    Geçersiz tarihlerde ValueError verir.
+    """
+    try:
+        bit = date.fromisoformat(parametreler['bitis']) if parametreler.get('bitis') else timezone.localdate()
+        bas = (date.fromisoformat(parametreler['baslangic']) if parametreler.get('baslangic')
+               else bit - timedelta(days=VARSAYILAN_GUN_SAYISI - 1))
+    except ValueError:
+        raise ValueError('Tarihler YYYY-AA-GG biçiminde olmalı.')
+    if bas > bit:
+        raise ValueError('Başlangıç bitişten sonra olamaz.')
+    return bas, bit
+
+
+def _ortalama(uzunluk, sayi):
+    return round(uzunluk / sayi, 1) if sayi else None
+
+
+def ozet(bas, bit, liste_boyutu=LISTE_BOYUTU):
+    """[bas, bit] aralığının istatistikleri; yalnızca özet tablolarını okur"""
+    aralik = {'gun__gte': bas, 'gun__lte': bit}
+
+    gunluk = list(
+        GunlukKategoriIstatistigi.objects.filter(**aralik)
+        .values('gun').annotate(sayi=Sum('mesaj_sayisi')).order_by('gun')
+    )
+    kategori_satirlari = list(
+        GunlukKategoriIstatistigi.objects.filter(**aralik)
+        .values('kategori_id', 'kategori__isim')
+        .annotate(sayi=Sum('mesaj_sayisi'), uzunluk=Sum('toplam_uzunluk'))
+        .order_by('-sayi', 'kategori__isim')
+    )
+    kategoriler = [
+        {'id': s['kategori_id'], 'isim': s['kategori__isim'], 'sayi': s['sayi'],
+         'ortalama_uzunluk': _ortalama(s['uzunluk'], s['sayi'])}
+        for s in kategori_satirlari
+    ]
+    yazarlar = [
+        {'id': s['yazar_id'], 'kullanici_adi': s['yazar__username'], 'sayi': s['sayi'],
+         'ortalama_uzunluk': _ortalama(s['uzunluk'], s['sayi'])}
+        for s in GunlukYazarIstatistigi.objects.filter(**aralik)
+        .values('yazar_id', 'yazar__username')
+        .annotate(sayi=Sum('mesaj_sayisi'), uzunluk=Sum('toplam_uzunluk'))
+        .order_by('-sayi', 'yazar__username')[:liste_boyutu]
+    ]
+    etiketler = [
+        {'id': s['etiket_id'], 'isim': s['etiket__isim'], 'sayi': s['sayi']}
+        for s in GunlukEtiketIstatistigi.objects.filter(**aralik)
+        .values('etiket_id', 'etiket__isim').annotate(sayi=Sum('mesaj_sayisi'))
+        .order_by('-sayi', 'etiket__isim')[:liste_boyutu]
+    ]
+    dilim_sayilari = dict(
+        GunlukUzunlukIstatistigi.objects.filter(**aralik)
+        .values('alt_sinir').annotate(sayi=Sum('mesaj_sayisi')).values_list('alt_sinir', 'sayi')
+    )
+    ust_sinirlar = [alt - 1 for alt in UZUNLUK_DILIMLERI[1:]] + [None]
+    uzunluk = [
+        {'alt': alt, 'ust': ust, 'sayi': dilim_sayilari.get(alt, 0)}
+        for alt, ust in zip(UZUNLUK_DILIMLERI, ust_sinirlar)
+    ]
+    gruplar = [
+        {'ad': ad, 'sayi': sum(d['sayi'] for d in uzunluk if d['alt'] >= alt and (ust is None or d['alt'] <= ust))}
+        for ad, alt, ust in UZUNLUK_GRUPLARI
+    ]
+
+    toplam = sum(g['sayi'] for g in gunluk)
+    return {
+        'baslangic': bas,
+        'bitis': bit,
+        'toplam': toplam,
+        'ortalama_uzunluk': _ortalama(sum(s['uzunluk'] for s in kategori_satirlari), toplam),
+        'gunluk': gunluk,
+        'kategoriler': kategoriler,
+        'yazarlar': yazarlar,
+        'etiketler': etiketler,
+        'uzunluk': uzunluk,
+        'uzunluk_gruplari': gruplar,
+    }
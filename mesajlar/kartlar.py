@@ -0,0 +1,194 @@
+"""Liste sayfalarındaki mesaj kartları.
+
+Kartlar tek bir parçadan (mesajlar/_mesaj_karti.html) işlenir. Parçaya
+yalnızca hazır değerler verilir: URL'ler her kartta reverse() çağırmak
+yerine ad başına bir kez çözülen kalıptan üretilir, özet ve tarih Python'da
+biçimlendirilir; parçada filtre ya da {% url %} kalmaz.
+
+En az settings.MESAJ_AKIS_ESIGI kart isteyen liste sayfaları sayfa
+önbelleğine girmez, StreamingHttpResponse ile gönderilir: sayfanın başı sayfa
+sorgusundan önce işlenip hemen gönderilir, sorgu ilk kart parçası
+istendiğinde iterator() ile okunur ve kartlar MESAJ_AKIS_PARCA_BOYUTU'luk
+parçalar halinde, ardından sayfalama ve sayfanın sonu gönderilir.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.shortcuts import render
+from django.template import Context
+from django.template.loader import get_template, render_to_string
+from django.urls import get_script_prefix, get_urlconf, reverse
+from django.utils import timezone
+from django.utils.safestring import SafeString
+from django.utils.text import Truncator
+
+from .onbellek import akart_anahtarlarini_ekle, kart_anahtarlarini_ekle, parca
+from .replika import akista_surdur
+from .sayfalama import KeysetSorgusu, sayfa_boyutu_al
+
+KART_SABLONU = 'mesajlar/_mesaj_karti.html'
+OZET_KELIME_SAYISI = 20
+
+# Sayfa en az bu kadar kart isterse (?boyut=) önbelleğe girmez, akışla gönderilir
+AKIS_ESIGI = getattr(settings, 'MESAJ_AKIS_ESIGI', 30)
+AKIS_PARCA_BOYUTU = getattr(settings, 'MESAJ_AKIS_PARCA_BOYUTU', 10)
+
+# Sayfa şablonunda kart listesinin yerine konan ve akışta bölünen işaret
+_ISARET = '<!--mesajlar:kartlar-->'
+
+_YER_TUTUCU = 2 ** 31 - 1
+
+KART_URLLERI = ('mesaj_detay', 'kategori_mesajlari', 'etiket_mesajlari')
+
+
+@lru_cache(maxsize=16)
+def _url_kaliplari(onek, urlconf):
+    kaliplar = {}
+    for ad in KART_URLLERI:
+        on, _, son = reverse(ad, urlconf, args=[_YER_TUTUCU]).partition(str(_YER_TUTUCU))
+        kaliplar[ad] = (on, son)
+    return kaliplar
+
+
+def kart_hazirligi():
+    """(parça şablonu, {url adı: (önek, sonek)}); reverse() her kartta değil, sayfa başına bir kez"""
+    # Motor sarmalayıcısı yerine derlenmiş Template: her kartta bağlam işlemcileri çalışmaz
+    return get_template(KART_SABLONU).template, _url_kaliplari(get_script_prefix(), get_urlconf())
+
+
+def _url(kaliplar, ad, pk):
+    on, son = kaliplar[ad]
+    return f'{on}{pk}{son}'
+
+
+def kart_baglami(mesaj, kaliplar):
+    kategori = mesaj.kategori
+    return {
+        'baslik': mesaj.baslik,
+        'ozet': Truncator(mesaj.kisaltilmis_icerik()).words(OZET_KELIME_SAYISI, truncate=' …'),
+        'kategori': kategori and {'isim': kategori.isim, 'url': _url(kaliplar, 'kategori_mesajlari', kategori.pk)},
+        'etiketler': [
+            {'isim': etiket.isim, 'url': _url(kaliplar, 'etiket_mesajlari', etiket.pk)}
+            for etiket in mesaj.etiketler.all()
+        ],
+        'yazar': mesaj.yazar.username,
+        # |date:"d.m.Y" ile aynı sonuç
+        'tarih': timezone.localtime(mesaj.tarih).strftime('%d.%m.%Y'),
+        'detay_url': _url(kaliplar, 'mesaj_detay', mesaj.pk),
+    }
+
+
+def kart_html(mesaj, sablon, kaliplar):
+    """Mesaj kartını işler; görünüm kart_anahtari eklediyse parça önbelleğini kullanır"""
+    uret = lambda: sablon.render(Context(kart_baglami(mesaj, kaliplar)))
+    anahtar = getattr(mesaj, 'kart_anahtari', None)
+    if anahtar is None:
+        return uret()
+    return parca('mesaj_karti', [anahtar], uret)
+
+
+def kartlari_isle(mesajlar):
+    """Kartları sırayla işleyip birleştirilmiş HTML olarak döndürür"""
+    sablon, kaliplar = kart_hazirligi()
+    return ''.join(kart_html(mesaj, sablon, kaliplar) for mesaj in mesajlar)
+
+
+# -- Akış ------------------------------------------------------------------------
+
+def akis_kullanilsin(request):
+    """Sayfa akışla gönderilecek kadar büyük mü; bu sayfalar sayfa önbelleğine girmez"""
+    return sayfa_boyutu_al(request) >= AKIS_ESIGI
+
+
+class _KartAkisi:
+    """Akışta okunan satırları kart gruplarına ayırır, sonunda sayfalamayı kurar"""
+
+    def __init__(self, sorgu):
+        self.sorgu = sorgu
+        self.hazirlik = kart_hazirligi()
+        self.okunan = []
+        self.grup = []
+        self.acik = False
+
+    def ekle(self, mesaj):
+        """Gönderilmeye hazır bir grup olduysa onu döndürür"""
+        self.okunan.append(mesaj)
+        # Sayfa boyutunu aşan satır yalnızca sonraki sayfanın varlığını gösterir;
+        # geri yönde satırlar ters sırada geldiği için sayfa tamamlanınca gönderilir
+        if self.sorgu.geri_yonde or len(self.okunan) > self.sorgu.boyut:
+            return None
+        self.grup.append(mesaj)
+        if len(self.grup) < AKIS_PARCA_BOYUTU:
+            return None
+        grup, self.grup = self.grup, []
+        return grup
+
+    def kalan(self):
+        if self.sorgu.geri_yonde:
+            return self.okunan[:self.sorgu.boyut][::-1]
+        return self.grup
+
+    def html(self, grup):
+        if not grup:
+            return ''
+        onek = '' if self.acik else '<div class="row">'
+        self.acik = True
+        return onek + ''.join(kart_html(mesaj, *self.hazirlik) for mesaj in grup)
+
+    def son(self):
+        if not self.acik:
+            return render_to_string('mesajlar/_bos_liste.html')
+        sayfa = self.sorgu.sayfa(self.okunan)
+        return '</div>' + render_to_string('mesajlar/_sayfalama.html', {'sayfa': sayfa})
+
+
+def _bas_ve_son(request, sablon, context, parcalar):
+    # Şablon kartlar olmadan işlenir; baş ve son CSRF, flash mesajları gibi yan
+    # etkileriyle birlikte sayfa sorgusundan önce hazırdır
+    sayfa = render(request, sablon, {**context, 'kart_akisi': SafeString(_ISARET)})
+    bas, _, son = sayfa.content.decode(sayfa.charset).partition(_ISARET)
+    response = StreamingHttpResponse(akista_surdur(parcalar(bas, son)), content_type=sayfa['Content-Type'])
+    for baslik, deger in sayfa.items():
+        if baslik.lower() not in ('content-type', 'content-length'):
+            response[baslik] = deger
+    response.cookies = sayfa.cookies
+    return response
+
+
+def akis_yaniti(request, sablon, context, queryset):
+    """Liste sayfasını akışla gönderir; queryset keyset ile sayfalanıp iterator() ile okunur"""
+    sorgu = KeysetSorgusu(queryset, request)
+
+    def parcalar(bas, son):
+        yield bas
+        akis = _KartAkisi(sorgu)
+        for mesaj in sorgu.queryset.iterator(chunk_size=AKIS_PARCA_BOYUTU):
+            grup = akis.ekle(mesaj)
+            if grup:
+                kart_anahtarlarini_ekle(grup)
+                yield akis.html(grup)
+        grup = akis.kalan()
+        kart_anahtarlarini_ekle(grup)
+        yield akis.html(grup) + akis.son() + son
+
+    return _bas_ve_son(request, sablon, context, parcalar)
+
+
+async def aakis_yaniti(request, sablon, context, queryset):
+    sorgu = KeysetSorgusu(queryset, request)
+
+    # ASGI altında eşzamanlı yineleyiciler tamponlanır; satırlar aiterator() ile okunur
+    async def parcalar(bas, son):
+        yield bas
+        akis = _KartAkisi(sorgu)
+        async for mesaj in sorgu.queryset.aiterator(chunk_size=AKIS_PARCA_BOYUTU):
+            grup = akis.ekle(mesaj)
+            if grup:
+                await akart_anahtarlarini_ekle(grup)
+                yield akis.html(grup)
+        grup = akis.kalan()
+        await akart_anahtarlarini_ekle(grup)
+        yield akis.html(grup) + akis.son() + son
+
+    return _bas_ve_son(request, sablon, context, parcalar)
@@ -0,0 +1,112 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import Mesaj
+from .onbellek import abekleyen_mesaj_var, ason_degisiklik, asurum_imzasi, bekleyen_mesaj_var, son_degisiklik
+from .onbellek import surum_imzasi
+
+
+def _kullanici_parcasi(user):
+    # Giriş yapmış kullanıcı navbar'da ve düzenleme butonlarında farklı HTML görür
+    return str(user.pk) if user is not None and user.is_authenticated else '-'
+
+
+def _etag(*parcalar):
+    return hashlib.md5(':'.join(map(str, parcalar)).encode()).hexdigest()
+
+
+def _kosullu_get(hesapla, ahesapla):
+    """Django'nun condition() dekoratörünün senkron ve asenkron görünümlerle çalışan hali.
+
+    hesapla(request, **kwargs) / ahesapla(request, **kwargs) (etag, son_degisiklik)
+    döndürür; ikisi de None ise koşullu işlem yapılmaz. condition() doğrulayıcıları
+    asenkron görünümlerde de senkron çağırdığı için oturum ve ORM erişimi olan
+    doğrulayıcılarda kullanılamaz.
+    """
+    def _on_isle(request, etag, son_degisiklik):
+        etag = quote_etag(etag) if etag else None
+        son_degisiklik = int(son_degisiklik.timestamp()) if son_degisiklik else None
+        return get_conditional_response(request, etag=etag, last_modified=son_degisiklik), etag, son_degisiklik
+
+    def _son_isle(request, response, etag, son_degisiklik):
+        if request.method in ('GET', 'HEAD'):
+            if son_degisiklik and not response.has_header('Last-Modified'):
+                response.headers['Last-Modified'] = http_date(son_degisiklik)
+            if etag:
+                response.headers.setdefault('ETag', etag)
+        return response
+
+    def dekorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def asarmalayici(request, *args, **kwargs):
+                yanit, etag, son = _on_isle(request, *await ahesapla(request, **kwargs))
+                if yanit is None:
+                    yanit = await view(request, *args, **kwargs)
+                return _son_isle(request, yanit, etag, son)
+            return asarmalayici
+
+        @wraps(view)
+        def sarmalayici(request, *args, **kwargs):
+            yanit, etag, son = _on_isle(request, *hesapla(request, **kwargs))
+            if yanit is None:
+                yanit = view(request, *args, **kwargs)
+            return _son_isle(request, yanit, etag, son)
+        return sarmalayici
+    return dekorator
+
+
+def _guncellenme_sorgusu(pk):
+    return Mesaj.objects.filter(pk=pk).values_list('guncellenme', flat=True)
+
+
+def _mesaj_dogrulayicilari(pk, guncellenme, user):
+    if guncellenme is None:
+        return None, None
+    return _etag('mesaj', pk, guncellenme.timestamp(), _kullanici_parcasi(user)), guncellenme
+
+
+def _mesaj_hesapla(request, pk, **kwargs):
+    if bekleyen_mesaj_var(request):
+        return None, None
+    return _mesaj_dogrulayicilari(pk, _guncellenme_sorgusu(pk).first(), request.user)
+
+
+async def _amesaj_hesapla(request, pk, **kwargs):
+    if await abekleyen_mesaj_var(request):
+        return None, None
+    return _mesaj_dogrulayicilari(pk, await _guncellenme_sorgusu(pk).afirst(), await request.auser())
+
+
+# Tek mesaj sayfası için guncellenme alanından ETag ve Last-Modified üretir.
+# Değişmemiş bir sayfa, şablon işlenmeden ve mesaj satırı yüklenmeden 304 döner.
+mesaj_kosullu_get = _kosullu_get(_mesaj_hesapla, _amesaj_hesapla)
+
+
+def liste_kosullu_get(*bagimliliklar):
+    """Liste sayfaları için önbellek sürümlerinden ETag ve Last-Modified üretir.
+
+    Sürümler onbellek modülünde her kayıt, silme ve etiket değişikliğinde
+    artırıldığı için, filtrelenmiş küme üzerinde MAX/COUNT çalıştırmadan
+    silinen satırları da kapsayan kesin bir doğrulayıcı elde edilir.
+    Last-Modified, ad alanlarının en son geçersiz kılındığı andır.
+    """
+    def hesapla(request, **kwargs):
+        if bekleyen_mesaj_var(request):
+            return None, None
+        adlar = [bagimlilik.format(**kwargs) for bagimlilik in bagimliliklar]
+        etag = _etag(request.get_full_path(), _kullanici_parcasi(request.user), surum_imzasi(adlar))
+        return etag, son_degisiklik(adlar)
+
+    async def ahesapla(request, **kwargs):
+        if await abekleyen_mesaj_var(request):
+            return None, None
+        adlar = [bagimlilik.format(**kwargs) for bagimlilik in bagimliliklar]
+        kullanici = _kullanici_parcasi(await request.auser())
+        return _etag(request.get_full_path(), kullanici, await asurum_imzasi(adlar)), await ason_degisiklik(adlar)
+
+    return _kosullu_get(hesapla, ahesapla)
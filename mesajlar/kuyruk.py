@@ -0,0 +1,165 @@
+"""Mesaj yazmalarının yan etkileri için veritabanı tabanlı görev kuyruğu.
+
+Sinyaller ağır işleri doğrudan yapmak yerine kuyruga_ekle() ile Gorev
+tablosuna yazar. Yazma görünümleri kaydı transaction.atomic() ve toplu()
+içinde yapar: bir isteğin bütün görevleri blok sonunda tek bir INSERT ile,
+kaydın kendisiyle aynı işlemde yazılır; geri alınan bir kayıt arkasında
+görev bırakmaz. Bir işlem dışında eklenen görevler (ör. kabukta, toplu
+bloğu olmadan) hemen kendi INSERT'leriyle yazılır. Görevleri `manage.py
+mesaj_worker` türlerine göre partiler halinde alır ve işler.
+
+- Tekillik: aynı (tür, anahtar) için bekleyen tek görev olur, sonraki
+  eklemeler yok sayılır. İşleyiciler bu yüzden veriyi görevden değil
+  veritabanının güncel halinden okumalı ve tekrar çalıştırılabilir olmalıdır.
+- Yeniden deneme: hata veren parti üstel artan beklemeyle ertelenir.
+  AZAMI_DENEME denemeden sonra başarısız olarak bırakılır ve admin'de görülür.
+- Kilit: alınan görevler KILIT_SURESI içinde bitmezse (işçi öldüyse)
+  yeniden denenmek üzere kuyruğa döner.
+
+settings.MESAJ_GOREV_KUYRUGU kapalıysa görevler, işlem tamamlandığında
+aynı süreçte çalıştırılır.
+"""
+import logging
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Gorev
+
+logger = logging.getLogger(__name__)
+
+AZAMI_DENEME = 5
+# n. denemeden sonra yaklaşık TABAN_BEKLEME * 2**n saniye beklenir
+TABAN_BEKLEME = 2
+TAVAN_BEKLEME = 600
+KILIT_SURESI = timedelta(minutes=5)
+
+_isleyiciler = {}
+# toplu() bloğunda biriken görevler: {(tür, anahtar): Gorev}
+_toplanan = ContextVar('mesaj_gorevleri', default=None)
+
+
+def gorev(tur):
+    """İşleyiciyi türe kaydeder; işleyici aynı türden Gorev nesnelerinin listesini alır"""
+    def dekorator(isleyici):
+        _isleyiciler[tur] = isleyici
+        return isleyici
+    return dekorator
+
+
+def kuyruga_ekle(tur, anahtarlar, veri=None):
+    """Her anahtar için bir görev ekler; bekleyen aynısı varsa atlanır"""
+    gorevler = [Gorev(tur=tur, anahtar=str(anahtar), veri=veri or {}) for anahtar in anahtarlar]
+    if not gorevler:
+        return
+    if not getattr(settings, 'MESAJ_GOREV_KUYRUGU', True):
+        transaction.on_commit(lambda: _isleyiciler[tur](gorevler))
+        return
+    toplanan = _toplanan.get()
+    if toplanan is not None:
+        for g in gorevler:
+            toplanan.setdefault((g.tur, g.anahtar), g)
+        return
+    Gorev.objects.bulk_create(gorevler, ignore_conflicts=True)
+
+
+@contextmanager
+def toplu():
+    """Blokta eklenen görevleri biriktirir ve blok sonunda tek bulk_create ile yazar.
+
+    Bloğun bir işlem içinde olması gerekir (görevler kayıtla birlikte
+    yazılsın diye); blok hata ile biterse görevler yazılmaz. İç içe
+    bloklar en dıştakine ekler. Dekoratör olarak da kullanılabilir.
+    """
+    if _toplanan.get() is not None:
+        yield
+        return
+    toplanan = {}
+    jeton = _toplanan.set(toplanan)
+    try:
+        yield
+    finally:
+        _toplanan.reset(jeton)
+    if toplanan:
+        Gorev.objects.bulk_create(list(toplanan.values()), ignore_conflicts=True)
+
+
+def bekleme_suresi(deneme):
+    # Aynı anda düşen görevler aynı anda yeniden denenmesin
+    return min(TABAN_BEKLEME * 2 ** deneme, TAVAN_BEKLEME) * random.uniform(0.5, 1.0)
+
+
+@transaction.atomic
+def _ertele(gorevler, hata):
+    simdi = timezone.now()
+    # Bu arada aynı anahtarla yeni bir görev eklendiyse iş onunla yapılacak
+    ikizler = set(
+        Gorev.objects.filter(
+            durum=Gorev.BEKLIYOR,
+            tur__in={g.tur for g in gorevler},
+            anahtar__in={g.anahtar for g in gorevler},
+        ).values_list('tur', 'anahtar')
+    )
+    silinecek, guncellenecek = [], []
+    for g in gorevler:
+        if (g.tur, g.anahtar) in ikizler:
+            silinecek.append(g.pk)
+            continue
+        g.deneme += 1
+        g.hata = hata
+        g.kilit = None
+        if g.deneme >= AZAMI_DENEME:
+            g.durum = Gorev.BASARISIZ
+        else:
+            g.durum = Gorev.BEKLIYOR
+            g.zaman = simdi + timedelta(seconds=bekleme_suresi(g.deneme))
+        guncellenecek.append(g)
+    Gorev.objects.filter(pk__in=silinecek).delete()
+    Gorev.objects.bulk_update(guncellenecek, ['durum', 'deneme', 'zaman', 'hata', 'kilit'])
+
+
+def _al(parti, turler=None):
+    """Sırası gelmiş, aynı türden en çok `parti` görevi kilitleyip döndürür"""
+    with transaction.atomic():
+        simdi = timezone.now()
+        suresi_dolan = list(Gorev.objects.filter(durum=Gorev.CALISIYOR, kilit__lt=simdi))
+        if suresi_dolan:
+            _ertele(suresi_dolan, 'Kilit süresi doldu')
+
+        # SQLite'ta FOR UPDATE yoktur; IMMEDIATE işlem kipi aynı işi görür
+        bekleyen = Gorev.objects.select_for_update(skip_locked=True).filter(
+            durum=Gorev.BEKLIYOR, zaman__lte=simdi,
+        ).order_by('zaman', 'id')
+        if turler:
+            bekleyen = bekleyen.filter(tur__in=turler)
+        tur = bekleyen.values_list('tur', flat=True).first()
+        if tur is None:
+            return []
+        gorevler = list(bekleyen.filter(tur=tur)[:parti])
+        Gorev.objects.filter(pk__in=[g.pk for g in gorevler]).update(
+            durum=Gorev.CALISIYOR, kilit=simdi + KILIT_SURESI,
+        )
+        return gorevler
+
+
+def bir_parti_isle(parti=100, turler=None):
+    """Bir parti görevi işler; alınan görev sayısını döndürür (0: kuyruk boş)"""
+    gorevler = _al(parti, turler)
+    if not gorevler:
+        return 0
+    tur = gorevler[0].tur
+    try:
+        if tur not in _isleyiciler:
+            raise LookupError(f'{tur} türü için işleyici yok')
+        _isleyiciler[tur](gorevler)
+    except Exception as hata:
+        logger.exception('%s görevleri başarısız oldu (%d görev)', tur, len(gorevler))
+        _ertele(gorevler, f'{type(hata).__name__}: {hata}')
+    else:
+        Gorev.objects.filter(pk__in=[g.pk for g in gorevler]).delete()
+    return len(gorevler)
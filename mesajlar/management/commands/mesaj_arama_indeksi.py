@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from mesajlar.arama import arama_motoru
+
+
+class Command(BaseCommand):
+    help = 'Mesaj arama indeksini baştan oluşturur'
+
+    def handle(self, *args, **options):
+        motor = arama_motoru()
+        motor.yeniden_olustur()
+        self.stdout.write(self.style.SUCCESS(f'{type(motor).__name__} indeksi yeniden oluşturuldu.'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from mesajlar.arsiv import ARSIV_YASI, PARTI_BOYUTU, arsivle, arsivlenecekler
+
+
+class Command(BaseCommand):
+    help = 'Eski mesajları etiket bağlantılarıyla birlikte partiler halinde arşive taşır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--gun', type=int, default=ARSIV_YASI, help='Bu kadar günden eski mesajlar taşınır')
+        parser.add_argument('--parti', type=int, default=PARTI_BOYUTU, help='Bir işlemde taşınacak mesaj sayısı')
+        parser.add_argument('--dry-run', action='store_true', help='Yalnızca taşınacak mesajları say')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            sayi = arsivlenecekler(options['gun']).count()
+            self.stdout.write(self.style.SUCCESS(f'Kuru çalışma: {sayi} mesaj arşive taşınacak.'))
+            return
+
+        def ilerleme(tasinan):
+            self.stderr.write(f'{tasinan} mesaj taşındı')
+
+        sayi = arsivle(options['gun'], options['parti'], ilerleme)
+        self.stdout.write(self.style.SUCCESS(f'{sayi} mesaj arşive taşındı.'))
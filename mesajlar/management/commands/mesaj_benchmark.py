@@ -0,0 +1,313 @@
+import json
+import math
+import platform
+import time
+import tracemalloc
+from collections import namedtuple
+
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.template import engines
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+
+from mesajlar import kartlar
+from mesajlar.admin import IcerikUzunlugu, TarihAraligi
+from mesajlar.models import Mesaj
+from mesajlar.onbellek import onbellek
+from mesajlar.sentetik import sentetik_veri_olustur
+
+# Paylaşılan kart parçasından önce liste şablonlarındaki satır içi kart; karşılaştırma için
+SATIR_ICI_KART = '''{% for mesaj in mesajlar %}
+<div class="col-md-4 mb-4">
+    <div class="card h-100">
+        <div class="card-body">
+            <h5 class="card-title">{{ mesaj.baslik }}</h5>
+            <p class="card-text">{{ mesaj.kisaltilmis_icerik|truncatewords:20 }}</p>
+            {% if mesaj.kategori %}
+                <a href="{% url 'kategori_mesajlari' mesaj.kategori_id %}" class="badge bg-secondary text-decoration-none">{{ mesaj.kategori.isim }}</a>
+            {% endif %}
+            {% for etiket in mesaj.etiketler.all %}
+                <a href="{% url 'etiket_mesajlari' etiket.pk %}" class="badge bg-light text-dark text-decoration-none">#{{ etiket.isim }}</a>
+            {% endfor %}
+        </div>
+        <div class="card-footer">
+            <small class="text-muted">
+                {{ mesaj.yazar.username }} - {{ mesaj.tarih|date:"d.m.Y" }}
+            </small>
+            <a href="{% url 'mesaj_detay' mesaj.pk %}" class="btn btn-sm btn-primary float-end">Detay</a>
+        </div>
+    </div>
+</div>
+{% endfor %}'''
+KART_OLCUM_SAYISI = 1000
+
+# hazirla() her tekrardan önce (süreye katılmadan) çağrılır ve (yöntem, url, veri) döndürür
+Senaryo = namedtuple('Senaryo', 'ad kullanici hazirla')
+
+
+def _yuzdelik(sirali, oran):
+    return sirali[max(0, math.ceil(len(sirali) * oran) - 1)]
+
+
+def _get(url):
+    return lambda: ('get', url, None)
+
+
+def senaryolar(veri):
+    """Çalıştırılacak senaryoları üretilen verinin id'leriyle oluşturur"""
+    mesaj_id = veri['mesajlar'][len(veri['mesajlar']) // 2]
+    kategori_id = veri['kategoriler'][0]
+    etiket_id = veri['etiketler'][0]
+    uye = User.objects.get(pk=veri['kullanicilar'][0])
+    uyenin_mesaji = Mesaj.objects.filter(yazar=uye).values_list('pk', flat=True).first()
+    sonraki_sayfa = Client().get('/').context['sayfa'].sonraki_link
+
+    liste = [
+        Senaryo('liste', None, _get('/')),
+        Senaryo('liste_sonraki_sayfa', None, _get('/' + sonraki_sayfa)),
+        Senaryo('liste_kategori', None, _get(f'/?kategori={kategori_id}')),
+        Senaryo('arama', None, _get('/?arama=başarı')),
+        Senaryo('arama_ilgi', None, _get('/?arama=başarı+umut&sirala=ilgi')),
+        Senaryo('mesaj_detay', None, _get(f'/mesaj/{mesaj_id}/')),
+        Senaryo('kategori_listesi', None, _get('/kategoriler/')),
+        Senaryo('kategori_mesajlari', None, _get(f'/kategoriler/{kategori_id}/mesajlar/')),
+        Senaryo('etiket_mesajlari', None, _get(f'/etiket/{etiket_id}/mesajlar/')),
+        Senaryo('liste_uye', 'uye', _get('/')),
+        # Akışla gönderilir; ilk_bayt_p50_ms sayfa sorgusundan önce gelen başı ölçer
+        Senaryo('liste_uye_akis', 'uye', _get('/?boyut=50')),
+        Senaryo('kategori_mesajlari_uye_akis', 'uye', _get(f'/kategoriler/{kategori_id}/mesajlar/?boyut=50')),
+        Senaryo('api_mesajlar', None, _get('/api/v1/mesajlar/')),
+        Senaryo('api_mesajlar_icerik', None, _get('/api/v1/mesajlar/?fields=id,icerik,etiketler')),
+        Senaryo('api_kategoriler', None, _get('/api/v1/kategoriler/')),
+        Senaryo('api_etiketler', None, _get('/api/v1/etiketler/')),
+        Senaryo('api_disa_aktar', None, _get(f'/api/v1/mesajlar/export.ndjson?kategori={kategori_id}')),
+        Senaryo('admin_liste', 'personel', _get('/admin/mesajlar/mesaj/')),
+        Senaryo('admin_arama', 'personel', _get('/admin/mesajlar/mesaj/?q=umut')),
+    ]
+    for filtre in (TarihAraligi, IcerikUzunlugu):
+        # lookups() istek ya da admin nesnesi kullanmaz
+        for deger, _ in filtre.lookups(None, None, None):
+            liste.append(Senaryo(
+                f'admin_{filtre.parameter_name}_{deger}', 'personel',
+                _get(f'/admin/mesajlar/mesaj/?{filtre.parameter_name}={deger}'),
+            ))
+
+    form = {
+        'baslik': 'Kıyaslama mesajı',
+        'icerik': 'Her gün küçük bir adım at.',
+        'kategori': kategori_id,
+        'etiketler': veri['etiketler'][:3],
+    }
+
+    def sil():
+        mesaj = Mesaj.objects.create(baslik='Silinecek', icerik='Silinecek', yazar=uye)
+        return 'post', f'/mesaj/{mesaj.pk}/sil/', {}
+
+    liste += [
+        Senaryo('mesaj_ekle', 'uye', lambda: ('post', '/ekle/', form)),
+        Senaryo('mesaj_duzenle', 'uye', lambda: ('post', f'/mesaj/{uyenin_mesaji}/duzenle/', form)),
+        Senaryo('mesaj_sil', 'uye', sil),
+    ]
+    return liste
+
+
+class Command(BaseCommand):
+    help = ('Sentetik veriyle ayrı bir test veritabanında görünümleri ölçer; '
+            'sonucu JSON olarak yazar ve isteğe bağlı olarak bir taban çizgisiyle karşılaştırır')
+
+    def add_arguments(self, parser):
+        olcek = parser.add_argument_group('veri ölçeği')
+        olcek.add_argument('--kullanici', type=int, default=20)
+        olcek.add_argument('--kategori', type=int, default=15)
+        olcek.add_argument('--etiket', type=int, default=100)
+        olcek.add_argument('--mesaj', type=int, default=5000)
+        olcek.add_argument('--tohum', type=int, default=42, help='Rastgele üretecin tohumu')
+
+        parser.add_argument('--tekrar', type=int, default=20, help='Senaryo başına ölçülen istek sayısı')
+        parser.add_argument('--isinma', type=int, default=2, help='Ölçülmeden önce atılan istek sayısı')
+        parser.add_argument('--senaryo', action='append', default=[],
+                            help='Yalnızca adı bu metni içeren senaryoları çalıştır (tekrarlanabilir)')
+        parser.add_argument('--onbellekli', action='store_true',
+                            help='İstekler arasında önbelleği temizleme (varsayılan: her istek soğuk)')
+        parser.add_argument('--cikti', help='Sonuç JSON dosyası (varsayılan: standart çıktı)')
+        parser.add_argument('--taban', help='Karşılaştırılacak taban çizgisi JSON dosyası')
+        parser.add_argument('--taban-yaz', action='store_true', help='Sonucu --taban dosyasına yaz')
+        parser.add_argument('--tolerans', type=float, default=0.25,
+                            help='p95 için izin verilen göreli yavaşlama (varsayılan 0.25)')
+        parser.add_argument('--esik-ms', type=float, default=2.0,
+                            help='Bu kadar milisaniyeden küçük farklar gerileme sayılmaz')
+
+    def handle(self, *args, **options):
+        if options['taban_yaz'] and not options['taban']:
+            raise CommandError('--taban-yaz için --taban dosyası verilmeli.')
+
+        setup_test_environment()
+        eski_ad = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # Aynı istemciden art arda gelen ölçüm istekleri hız sınırına takılmasın
+            with override_settings(MESAJ_HIZ_SINIRLARI={}):
+                sonuc = self.olc(options)
+        finally:
+            connection.creation.destroy_test_db(eski_ad, verbosity=0)
+            teardown_test_environment()
+
+        metin = json.dumps(sonuc, indent=2, ensure_ascii=False)
+        if options['cikti']:
+            with open(options['cikti'], 'w', encoding='utf-8') as dosya:
+                dosya.write(metin + '\n')
+        else:
+            self.stdout.write(metin)
+
+        if options['taban_yaz']:
+            with open(options['taban'], 'w', encoding='utf-8') as dosya:
+                dosya.write(metin + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Taban çizgisi yazıldı: {options['taban']}"))
+        elif options['taban']:
+            self.karsilastir(sonuc, options)
+
+    def olc(self, options):
+        olcek = {ad: options[ad] for ad in ('kullanici', 'kategori', 'etiket', 'mesaj', 'tohum')}
+        self.stderr.write(f'Veri üretiliyor: {olcek}')
+        baslangic = time.perf_counter()
+        veri = sentetik_veri_olustur(
+            **olcek, ilerleme=lambda sayi: self.stderr.write(f'  {sayi} mesaj', ending='\r'),
+        )
+        self.stderr.write(f'\nVeri {time.perf_counter() - baslangic:.1f} sn içinde üretildi.')
+
+        personel = User.objects.create_superuser('bench_admin', 'bench@example.com', 'benchmark')
+        uye = User.objects.get(pk=veri['kullanicilar'][0])
+        istemciler = {None: Client(), 'uye': Client(), 'personel': Client()}
+        istemciler['uye'].force_login(uye)
+        istemciler['personel'].force_login(personel)
+
+        sonuclar = {}
+        for senaryo in senaryolar(veri):
+            if options['senaryo'] and not any(parca in senaryo.ad for parca in options['senaryo']):
+                continue
+            sonuclar[senaryo.ad] = self.senaryoyu_olc(senaryo, istemciler[senaryo.kullanici], options)
+            olcum = sonuclar[senaryo.ad]
+            self.stderr.write(
+                f"{senaryo.ad:<40} p50 {olcum['p50_ms']:7.1f}  p95 {olcum['p95_ms']:7.1f}  "
+                f"p99 {olcum['p99_ms']:7.1f} ms  ilk bayt {olcum['ilk_bayt_p50_ms']:7.1f}  "
+                f"{olcum['sorgu_en_cok']:3d} sorgu  "
+                f"{olcum['bellek_tepe_kb']:8.0f} KB"
+            )
+
+        kart_isleme = None
+        if not options['senaryo'] or any(parca in 'kart_isleme' for parca in options['senaryo']):
+            kart_isleme = self.kartlari_olc(options)
+
+        return {
+            'ortam': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'veritabani': connection.vendor,
+                'onbellekli': options['onbellekli'],
+                'tekrar': options['tekrar'],
+            },
+            'olcek': olcek,
+            'senaryolar': sonuclar,
+            'kart_isleme': kart_isleme,
+        }
+
+    def kartlari_olc(self, options):
+        """1000 kartın parça önbelleği olmadan işlenme süresi: satır içi şablon ve paylaşılan parça"""
+        mesajlar = list(Mesaj.objects.listing().order_by('-tarih', '-id')[:KART_OLCUM_SAYISI])
+        satir_ici = engines['django'].from_string(SATIR_ICI_KART)
+        yontemler = {
+            'satir_ici': lambda: satir_ici.render({'mesajlar': mesajlar}),
+            'parca': lambda: kartlar.kartlari_isle(mesajlar),
+        }
+        sonuc = {'kart_sayisi': len(mesajlar)}
+        for ad, isle in yontemler.items():
+            isle()
+            sureler = []
+            for _ in range(max(3, options['tekrar'] // 4)):
+                baslangic = time.perf_counter()
+                isle()
+                sureler.append((time.perf_counter() - baslangic) * 1000)
+            sureler.sort()
+            sonuc[f'{ad}_ms'] = round(_yuzdelik(sureler, 0.50), 2)
+        self.stderr.write(
+            f"{'kart_isleme (1000 kart)':<40} satır içi {sonuc['satir_ici_ms']:7.1f}  "
+            f"parça {sonuc['parca_ms']:7.1f} ms"
+        )
+        return sonuc
+
+    def istek(self, istemci, senaryo, options):
+        yontem, url, veri = senaryo.hazirla()
+        if not options['onbellekli']:
+            onbellek().clear()
+        with CaptureQueriesContext(connection) as sorgular:
+            baslangic = time.perf_counter()
+            response = getattr(istemci, yontem)(url, veri)
+            # Akışlı yanıtta ilk parça (sayfanın başı) kartlardan önce gelir
+            ilk_bayt = None
+            if response.streaming:
+                for _ in response.streaming_content:
+                    if ilk_bayt is None:
+                        ilk_bayt = (time.perf_counter() - baslangic) * 1000
+            sure = (time.perf_counter() - baslangic) * 1000
+        if response.status_code not in (200, 302):
+            raise CommandError(f'{senaryo.ad}: {url} {response.status_code} döndürdü')
+        return sure, sure if ilk_bayt is None else ilk_bayt, len(sorgular)
+
+    def senaryoyu_olc(self, senaryo, istemci, options):
+        for _ in range(options['isinma']):
+            self.istek(istemci, senaryo, options)
+
+        sureler, ilk_baytlar, sorgu_sayilari = [], [], []
+        for _ in range(options['tekrar']):
+            sure, ilk_bayt, sorgu_sayisi = self.istek(istemci, senaryo, options)
+            sureler.append(sure)
+            ilk_baytlar.append(ilk_bayt)
+            sorgu_sayilari.append(sorgu_sayisi)
+
+        # tracemalloc süreleri bozduğu için bellek ayrı bir istekte ölçülür
+        tracemalloc.start()
+        try:
+            self.istek(istemci, senaryo, options)
+            _, tepe = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        sureler.sort()
+        ilk_baytlar.sort()
+        return {
+            'p50_ms': round(_yuzdelik(sureler, 0.50), 2),
+            'ilk_bayt_p50_ms': round(_yuzdelik(ilk_baytlar, 0.50), 2),
+            'p95_ms': round(_yuzdelik(sureler, 0.95), 2),
+            'p99_ms': round(_yuzdelik(sureler, 0.99), 2),
+            'sorgu_ortalama': round(sum(sorgu_sayilari) / len(sorgu_sayilari), 2),
+            'sorgu_en_cok': max(sorgu_sayilari),
+            'bellek_tepe_kb': round(tepe / 1024, 1),
+        }
+
+    def karsilastir(self, sonuc, options):
+        with open(options['taban'], encoding='utf-8') as dosya:
+            taban = json.load(dosya)
+        if taban.get('olcek') != sonuc['olcek']:
+            self.stderr.write(self.style.WARNING(
+                f"Taban çizgisi farklı bir ölçekle alınmış: {taban.get('olcek')}"
+            ))
+
+        gerilemeler = []
+        for ad, olcum in sonuc['senaryolar'].items():
+            eski = taban.get('senaryolar', {}).get(ad)
+            if eski is None:
+                continue
+            sinir = eski['p95_ms'] * (1 + options['tolerans'])
+            if olcum['p95_ms'] > sinir and olcum['p95_ms'] - eski['p95_ms'] > options['esik_ms']:
+                gerilemeler.append(f"{ad}: p95 {eski['p95_ms']:.1f} → {olcum['p95_ms']:.1f} ms")
+            # Sorgu sayısı veriden bağımsız ve kesin olduğu için toleranssız karşılaştırılır
+            if olcum['sorgu_en_cok'] > eski['sorgu_en_cok']:
+                gerilemeler.append(f"{ad}: sorgu sayısı {eski['sorgu_en_cok']} → {olcum['sorgu_en_cok']}")
+
+        if gerilemeler:
+            raise CommandError('Performans gerilemesi:\n  ' + '\n  '.join(gerilemeler))
+        self.stderr.write(self.style.SUCCESS('Taban çizgisine göre gerileme yok.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from mesajlar.beslemeler import tumunu_kur
+
+
+class Command(BaseCommand):
+    help = 'Genel, kategori ve etiket beslemelerini önbellekte önceden kurar'
+
+    def handle(self, *args, **options):
+        sayi = tumunu_kur()
+        self.stdout.write(self.style.SUCCESS(f'{sayi} besleme kuruldu.'))
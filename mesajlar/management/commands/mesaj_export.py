@@ -0,0 +1,31 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mesajlar.aktarim import BICIMLER, disa_aktar
+
+
+class Command(BaseCommand):
+    help = 'Tüm mesajları CSV, JSON Lines ya da JSON olarak dışa aktarır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dosya', nargs='?', default='-', help="Çıktı dosyası (varsayılan '-' standart çıktı)")
+        parser.add_argument('--format', choices=BICIMLER, help='Çıktı biçimi (varsayılan: dosya uzantısı)')
+        parser.add_argument('--parca', type=int, default=2000, help='Veritabanından tek seferde okunacak satır')
+
+    def handle(self, *args, **options):
+        hedef = options['dosya']
+        bicim = options['format'] or (hedef.rsplit('.', 1)[-1].lower() if hedef != '-' else 'jsonl')
+        if bicim not in BICIMLER:
+            raise CommandError(f"Biçim belirlenemedi, --format ile {', '.join(BICIMLER)} seçin.")
+
+        def ilerleme(sayi):
+            self.stderr.write(f'{sayi} mesaj yazıldı')
+
+        dosya = sys.stdout if hedef == '-' else open(hedef, 'w', encoding='utf-8', newline='')
+        try:
+            sayi = disa_aktar(dosya, bicim, parca_boyutu=options['parca'], ilerleme=ilerleme)
+        finally:
+            if dosya is not sys.stdout:
+                dosya.close()
+        self.stderr.write(self.style.SUCCESS(f'{sayi} mesaj dışa aktarıldı.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from mesajlar.havuz import tumunu_kur
+
+
+class Command(BaseCommand):
+    help = 'Günün mesajı ve rastgele mesaj için id havuzlarını önbellekte önceden kurar'
+
+    def handle(self, *args, **options):
+        sayi = tumunu_kur()
+        self.stdout.write(self.style.SUCCESS(f'{sayi} havuz kuruldu.'))
@@ -0,0 +1,54 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mesajlar.aktarim import BICIMLER, AktarimHatasi, IceAktarici, satirlari_oku
+
+
+class Command(BaseCommand):
+    help = 'CSV, JSON Lines ya da JSON dosyasından mesajları toplu olarak içe aktarır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dosya', help="Girdi dosyası ('-' standart girdi)")
+        parser.add_argument('--format', choices=BICIMLER, help='Girdi biçimi (varsayılan: dosya uzantısı)')
+        parser.add_argument('--parti', type=int, default=1000, help='Bir işlemde yazılacak satır sayısı')
+        parser.add_argument('--yazar', help='Satırda yazar yoksa kullanılacak kullanıcı adı')
+        parser.add_argument('--dry-run', action='store_true', help='Yalnızca doğrula, veritabanına yazma')
+
+    def handle(self, *args, **options):
+        bicim = options['format'] or options['dosya'].rsplit('.', 1)[-1].lower()
+        if bicim not in BICIMLER:
+            raise CommandError(f"Biçim belirlenemedi, --format ile {', '.join(BICIMLER)} seçin.")
+
+        def ilerleme(aktarici):
+            self.stderr.write(
+                f'{aktarici.okunan} satır okundu, {aktarici.yazilan} yazıldı '
+                f'({aktarici.hiz:.0f} satır/sn)'
+            )
+
+        aktarici = IceAktarici(
+            parti_boyutu=options['parti'],
+            varsayilan_yazar=options['yazar'],
+            kuru_calisma=options['dry_run'],
+            ilerleme=ilerleme,
+        )
+        dosya = sys.stdin if options['dosya'] == '-' else open(options['dosya'], encoding='utf-8', newline='')
+        try:
+            aktarici.calistir(satirlari_oku(dosya, bicim))
+        except AktarimHatasi as hata:
+            raise CommandError(str(hata))
+        finally:
+            if dosya is not sys.stdin:
+                dosya.close()
+
+        for satir_no, hata in aktarici.hatalar[:50]:
+            self.stderr.write(self.style.WARNING(f'satır {satir_no}: {hata}'))
+        if len(aktarici.hatalar) > 50:
+            self.stderr.write(self.style.WARNING(f'... ve {len(aktarici.hatalar) - 50} hata daha'))
+
+        ozet = (f'{aktarici.okunan} satır okundu, {len(aktarici.hatalar)} hatalı, '
+                f'{aktarici.hiz:.0f} satır/sn.')
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Kuru çalışma: {ozet} Hiçbir şey yazılmadı.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{aktarici.yazilan} mesaj içe aktarıldı. {ozet}'))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from mesajlar.indeks_denetimi import DESTEKLENEN, plan, sicak_sorgular, sorunlar
+from mesajlar.veritabani import SQLITE_PRAGMALARI
+
+
+class Command(BaseCommand):
+    help = 'Sık çalışan sorguların EXPLAIN planlarında indeks kullanıldığını canlı veritabanında denetler'
+
+    def handle(self, *args, **options):
+        if connection.vendor not in DESTEKLENEN:
+            raise CommandError(f'{connection.vendor} için plan denetimi tanımlı değil.')
+
+        if connection.vendor == 'sqlite' and options['verbosity'] >= 1:
+            with connection.cursor() as cursor:
+                for ad in SQLITE_PRAGMALARI:
+                    cursor.execute(f'PRAGMA {ad}')
+                    self.stdout.write(f'PRAGMA {ad} = {cursor.fetchone()[0]}')
+
+        hatali = []
+        for ad, queryset, siralama_serbest in sicak_sorgular():
+            plan_metni = plan(queryset)
+            bulunan = sorunlar(plan_metni, siralama_serbest)
+            if bulunan:
+                hatali.append(ad)
+                self.stdout.write(self.style.ERROR(f"{ad}: {', '.join(bulunan)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{ad}: indeks kullanılıyor'))
+            if bulunan or options['verbosity'] >= 2:
+                self.stdout.write('    ' + plan_metni.replace('\n', '\n    '))
+
+        if hatali:
+            raise CommandError(f"İndeks kullanmayan sorgular: {', '.join(hatali)}")
@@ -0,0 +1,17 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from mesajlar.istatistik import araligi_hesapla
+
+
+class Command(BaseCommand):
+    help = 'Günlük istatistik özetlerini (kategori, yazar, etiket, uzunluk) baştan hesaplar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--baslangic', type=date.fromisoformat, help='İlk gün (YYYY-AA-GG); verilmezse en baştan')
+        parser.add_argument('--bitis', type=date.fromisoformat, help='Son gün (YYYY-AA-GG); verilmezse sona kadar')
+
+    def handle(self, *args, **options):
+        araligi_hesapla(options['baslangic'], options['bitis'])
+        self.stdout.write(self.style.SUCCESS('İstatistik özetleri yeniden hesaplandı.'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from mesajlar.onbellek import istatistikler, istatistikleri_sifirla
+
+
+class Command(BaseCommand):
+    help = 'Mesaj önbelleğinin isabet/ıskalama istatistiklerini gösterir'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sifirla', action='store_true', help='İstatistikleri sıfırla')
+
+    def handle(self, *args, **options):
+        for tur, degerler in istatistikler().items():
+            self.stdout.write(
+                f"{tur}: {degerler['isabet']} isabet, {degerler['iskalama']} ıskalama "
+                f"(%{degerler['oran'] * 100:.1f})"
+            )
+        if options['sifirla']:
+            istatistikleri_sifirla()
+            self.stdout.write(self.style.SUCCESS('İstatistikler sıfırlandı.'))
@@ -0,0 +1,30 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = ('Yerel denemeler için birincil SQLite veritabanını MESAJ_REPLIKALAR '
+            'dosyalarına kopyalar (gerçek replikasyonun yerine)')
+
+    def handle(self, *args, **options):
+        replikalar = getattr(settings, 'MESAJ_REPLIKALAR', {})
+        if not replikalar:
+            raise CommandError('MESAJ_REPLIKALAR tanımlı değil.')
+        birincil = connections[DEFAULT_DB_ALIAS]
+        if birincil.vendor != 'sqlite':
+            raise CommandError('Yalnızca SQLite veritabanları kopyalanabilir.')
+
+        birincil.ensure_connection()
+        for alias in replikalar:
+            hedef_yolu = connections[alias].settings_dict['NAME']
+            connections[alias].close()
+            # backup() yazma sürerken de tutarlı bir anlık görüntü alır
+            hedef = sqlite3.connect(hedef_yolu)
+            try:
+                birincil.connection.backup(hedef)
+            finally:
+                hedef.close()
+            self.stdout.write(self.style.SUCCESS(f'{alias}: {hedef_yolu}'))
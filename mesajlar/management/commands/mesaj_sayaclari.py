@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from mesajlar import gorevler
+from mesajlar.models import Etiket, Kategori
+from mesajlar.sayaclar import sayaclari_yeniden_hesapla
+
+
+class Command(BaseCommand):
+    help = 'Kategori ve etiket mesaj sayaçlarını baştan hesaplar'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kuyruk', action='store_true',
+            help='Tek bir UPDATE yerine kayıt başına yeniden sayım görevleri ekler',
+        )
+
+    def handle(self, *args, **options):
+        if options['kuyruk']:
+            with transaction.atomic():
+                kategori_idleri = list(Kategori.objects.values_list('pk', flat=True))
+                etiket_idleri = list(Etiket.objects.values_list('pk', flat=True))
+                gorevler.kategoriler_sayilsin(*kategori_idleri)
+                gorevler.etiketler_sayilsin(*etiket_idleri)
+            self.stdout.write(self.style.SUCCESS(
+                f'{len(kategori_idleri)} kategori ve {len(etiket_idleri)} etiket sayacı için görev eklendi.'
+            ))
+            return
+        with transaction.atomic():
+            kategori, etiket = sayaclari_yeniden_hesapla()
+        self.stdout.write(self.style.SUCCESS(
+            f'{kategori} kategori ve {etiket} etiket sayacı yeniden hesaplandı.'
+        ))
@@ -0,0 +1,87 @@
+import multiprocessing
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+
+from mesajlar.kuyruk import bir_parti_isle
+
+
+def calistir(parti, bekleme, bir_kez, turler, durduruldu):
+    """Kuyruk boşalana (bir_kez) ya da durdurulana kadar partileri işler; işlenen görev sayısını döndürür"""
+    toplam = 0
+    while not durduruldu():
+        close_old_connections()
+        islenen = bir_parti_isle(parti, turler)
+        toplam += islenen
+        if not islenen:
+            if bir_kez:
+                break
+            time.sleep(bekleme)
+    return toplam
+
+
+def _isci(secenekler):
+    durdur = []
+    # Yarıda kalan parti bitirilir, sonra çıkılır
+    signal.signal(signal.SIGTERM, lambda *_: durdur.append(True))
+    signal.signal(signal.SIGINT, lambda *_: durdur.append(True))
+    return calistir(durduruldu=lambda: bool(durdur), **secenekler)
+
+
+class Command(BaseCommand):
+    help = 'Arka plan görev kuyruğunu (arama indeksi, sayaçlar) işleyen işçi süreçlerini çalıştırır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--surec', type=int, default=2, help='İşçi süreç sayısı')
+        parser.add_argument('--parti', type=int, default=100,
+                            help='Bir seferde alınan aynı türden en çok görev sayısı')
+        parser.add_argument('--bekleme', type=float, default=1.0,
+                            help='Kuyruk boşken yoklamalar arası saniye')
+        parser.add_argument('--tur', action='append', default=[], help='Yalnızca bu türdeki görevler')
+        parser.add_argument('--bir-kez', action='store_true',
+                            help='Kuyruk boşalınca çık (tek süreçte çalışır)')
+
+    def handle(self, *args, **options):
+        secenekler = {
+            'parti': options['parti'],
+            'bekleme': options['bekleme'],
+            'bir_kez': options['bir_kez'],
+            'turler': options['tur'],
+        }
+        if options['bir_kez']:
+            toplam = calistir(durduruldu=lambda: False, **secenekler)
+            self.stdout.write(self.style.SUCCESS(f'{toplam} görev işlendi.'))
+            return
+        if options['surec'] <= 1:
+            toplam = _isci(secenekler)
+            self.stdout.write(self.style.SUCCESS(f'{toplam} görev işlendi.'))
+            return
+
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise CommandError('Birden çok süreç için fork gerekir; --surec 1 kullanın.')
+        # Açık bağlantılar alt süreçlere kopyalanmasın
+        connections.close_all()
+        baglam = multiprocessing.get_context('fork')
+        surecler = [
+            baglam.Process(target=_isci, args=(secenekler,), name=f'mesaj_worker-{sira}')
+            for sira in range(options['surec'])
+        ]
+        for surec in surecler:
+            surec.start()
+        self.stdout.write(f"{options['surec']} işçi süreci başlatıldı.")
+
+        def durdur(*_):
+            for surec in surecler:
+                if surec.is_alive():
+                    surec.terminate()
+
+        signal.signal(signal.SIGTERM, durdur)
+        try:
+            for surec in surecler:
+                surec.join()
+        except KeyboardInterrupt:
+            # SIGINT süreç grubundaki işçilere de gider; bitirmelerini bekle
+            for surec in surecler:
+                surec.join()
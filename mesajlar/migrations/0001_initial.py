@@ -0,0 +1,61 @@
+# Generated by Django 5.1 on 2026-10-18 15:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Etiket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('isim', models.CharField(max_length=50, unique=True, verbose_name='Etiket Adı')),
+            ],
+            options={
+                'verbose_name': 'Etiket',
+                'verbose_name_plural': 'Etiketler',
+                'ordering': ['isim'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Kategori',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('isim', models.CharField(max_length=100, unique=True, verbose_name='Kategori Adı')),
+                ('aciklama', models.TextField(blank=True, verbose_name='Açıklama')),
+            ],
+            options={
+                'verbose_name': 'Kategori',
+                'verbose_name_plural': 'Kategoriler',
+                'ordering': ['isim'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Mesaj',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('baslik', models.CharField(max_length=200, verbose_name='Başlık')),
+                ('icerik', models.TextField(verbose_name='İçerik')),
+                ('tarih', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Tarih')),
+                ('etiketler', models.ManyToManyField(blank=True, related_name='mesajlar', to='mesajlar.etiket', verbose_name='Etiketler')),
+                ('kategori', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='mesajlar', to='mesajlar.kategori', verbose_name='Kategori')),
+                ('yazar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mesajlar', to=settings.AUTH_USER_MODEL, verbose_name='Yazar')),
+            ],
+            options={
+                'verbose_name': 'Motivasyon Mesajı',
+                'verbose_name_plural': 'Motivasyon Mesajları',
+                'ordering': ['-tarih'],
+                'indexes': [models.Index(fields=['tarih'], name='mesajlar_me_tarih_2a355e_idx'), models.Index(fields=['-tarih', '-id'], name='mesajlar_me_tarih_24c54f_idx'), models.Index(fields=['yazar'], name='mesajlar_me_yazar_i_4df14d_idx')],
+            },
+        ),
+    ]
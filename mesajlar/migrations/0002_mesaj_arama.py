@@ -0,0 +1,54 @@
+from django.db import migrations
+
+# mesajlar.arama'dan kopyalandı: migrasyon, modüldeki sonraki değişikliklerden
+# etkilenmeden o günkü indeksi kurmalı
+FTS_TABLOSU = 'mesajlar_mesaj_fts'
+PG_ARAMA_IFADESI = (
+    "setweight(to_tsvector('turkish', coalesce(baslik, '')), 'A') || "
+    "setweight(to_tsvector('turkish', coalesce(icerik, '')), 'B')"
+)
+_TR_KUCUK_HARF = str.maketrans({'İ': 'i', 'I': 'ı'})
+_TR_KATLAMA = str.maketrans('çğıöşüâîû', 'cgiosuaiu')
+
+
+def normallestir(metin):
+    return (metin or '').translate(_TR_KUCUK_HARF).lower().translate(_TR_KATLAMA)
+
+
+def arama_indeksi_olustur(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLOSU} USING fts5("
+            f"baslik, icerik, tokenize='unicode61 remove_diacritics 2')"
+        )
+        Mesaj = apps.get_model('mesajlar', 'Mesaj')
+        with schema_editor.connection.cursor() as cursor:
+            for pk, baslik, icerik in Mesaj.objects.values_list('pk', 'baslik', 'icerik').iterator():
+                cursor.execute(
+                    f'INSERT INTO {FTS_TABLOSU} (rowid, baslik, icerik) VALUES (%s, %s, %s)',
+                    [pk, normallestir(baslik), normallestir(icerik)],
+                )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS mesaj_arama_gin ON mesajlar_mesaj USING GIN (({PG_ARAMA_IFADESI}))'
+        )
+
+
+def arama_indeksi_kaldir(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLOSU}')
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS mesaj_arama_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mesajlar', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(arama_indeksi_olustur, arama_indeksi_kaldir),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1 on 2026-10-18 15:50
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def sayaclari_doldur(apps, schema_editor):
+    Mesaj = apps.get_model('mesajlar', 'Mesaj')
+    Kategori = apps.get_model('mesajlar', 'Kategori')
+    Etiket = apps.get_model('mesajlar', 'Etiket')
+    for model, queryset, alan in (
+        (Kategori, Mesaj.objects.all(), 'kategori_id'),
+        (Etiket, Mesaj.etiketler.through.objects.all(), 'etiket_id'),
+    ):
+        sayim = Subquery(
+            queryset.filter(**{alan: OuterRef('pk')}).order_by().values(alan)
+            .annotate(sayi=Count('*')).values('sayi'),
+            output_field=IntegerField(),
+        )
+        model.objects.update(mesaj_sayisi=Coalesce(sayim, Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mesajlar', '0002_mesaj_arama'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='etiket',
+            name='mesaj_sayisi',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Mesaj Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='kategori',
+            name='mesaj_sayisi',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Mesaj Sayısı'),
+        ),
+        migrations.RunPython(sayaclari_doldur, migrations.RunPython.noop),
+    ]
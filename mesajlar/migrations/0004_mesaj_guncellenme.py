@@ -0,0 +1,25 @@
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def guncellenmeyi_doldur(apps, schema_editor):
+    Mesaj = apps.get_model('mesajlar', 'Mesaj')
+    Mesaj.objects.update(guncellenme=F('tarih'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mesajlar', '0003_kategori_etiket_mesaj_sayisi'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mesaj',
+            name='guncellenme',
+            field=models.DateTimeField(auto_now=True, verbose_name='Güncellenme'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(guncellenmeyi_doldur, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+from django.db.models.functions import Length
+
+
+def uzunluklari_doldur(apps, schema_editor):
+    Mesaj = apps.get_model('mesajlar', 'Mesaj')
+    Mesaj.objects.update(icerik_uzunlugu=Length('icerik'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mesajlar', '0004_mesaj_guncellenme'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mesaj',
+            name='icerik_uzunlugu',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='İçerik Uzunluğu'),
+        ),
+        migrations.RunPython(uzunluklari_doldur, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1 on 2026-10-18 16:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mesajlar', '0005_mesaj_icerik_uzunlugu'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='mesaj',
+            name='mesajlar_me_yazar_i_4df14d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='mesaj',
+            index=models.Index(fields=['kategori', '-tarih', '-id'], name='mesaj_kategori_tarih_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mesaj',
+            index=models.Index(fields=['yazar', '-tarih'], name='mesaj_yazar_tarih_idx'),
+        ),
+        # Otomatik ara tabloda yalnızca (mesaj_id, etiket_id) ve etiket_id indeksleri var.
+        # Etiket sayfası etiket_id ile arayıp mesaj_id okur; bu indeks ara tabloya hiç gitmeden yanıtlar.
+        migrations.RunSQL(
+            'CREATE INDEX mesaj_etiketler_etiket_mesaj_idx ON mesajlar_mesaj_etiketler (etiket_id, mesaj_id)',
+            'DROP INDEX mesaj_etiketler_etiket_mesaj_idx',
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1 on 2026-10-18 16:13
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mesajlar', '0006_mesaj_bilesik_indeksler'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Gorev',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tur', models.CharField(max_length=50, verbose_name='Tür')),
+                ('anahtar', models.CharField(max_length=200, verbose_name='Anahtar')),
+                ('veri', models.JSONField(blank=True, default=dict, verbose_name='Veri')),
+                ('durum', models.CharField(choices=[('bekliyor', 'Bekliyor'), ('calisiyor', 'Çalışıyor'), ('basarisiz', 'Başarısız')], default='bekliyor', max_length=10, verbose_name='Durum')),
+                ('zaman', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Çalışma Zamanı')),
+                ('deneme', models.PositiveSmallIntegerField(default=0, verbose_name='Deneme')),
+                ('kilit', models.DateTimeField(blank=True, null=True, verbose_name='Kilit Bitişi')),
+                ('hata', models.TextField(blank=True, verbose_name='Son Hata')),
+                ('olusturma', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturma')),
+            ],
+            options={
+                'verbose_name': 'Arka Plan Görevi',
+                'verbose_name_plural': 'Arka Plan Görevleri',
+                'ordering': ['zaman', 'id'],
+                'indexes': [models.Index(fields=['durum', 'zaman', 'id'], name='gorev_sira_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('durum', 'bekliyor')), fields=('tur', 'anahtar'), name='gorev_bekleyen_tekil')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1 on 2026-10-18 16:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mesajlar', '0007_gorev'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='etiket',
+            index=models.Index(fields=['-mesaj_sayisi', 'isim'], name='etiket_sayi_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1 on 2026-10-18 16:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mesajlar', '0008_etiket_sayi_indeksi'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArsivMesaj',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('baslik', models.CharField(max_length=200, verbose_name='Başlık')),
+                ('icerik', models.TextField(verbose_name='İçerik')),
+                ('tarih', models.DateTimeField(verbose_name='Tarih')),
+                ('guncellenme', models.DateTimeField(verbose_name='Güncellenme')),
+                ('icerik_uzunlugu', models.PositiveIntegerField(db_index=True, default=0, verbose_name='İçerik Uzunluğu')),
+                ('etiket_idleri', models.JSONField(blank=True, default=list, verbose_name='Etiketler')),
+                ('arsivlenme', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Arşivlenme')),
+                ('kategori', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='mesajlar.kategori', verbose_name='Kategori')),
+                ('yazar', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Yazar')),
+            ],
+            options={
+                'verbose_name': 'Arşivlenmiş Mesaj',
+                'verbose_name_plural': 'Arşivlenmiş Mesajlar',
+                'ordering': ['-tarih'],
+                'indexes': [models.Index(fields=['-tarih', '-id'], name='arsiv_tarih_idx'), models.Index(fields=['yazar', '-tarih'], name='arsiv_yazar_tarih_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.1 on 2026-10-18 16:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mesajlar', '0009_arsivmesaj'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GunlukUzunlukIstatistigi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gun', models.DateField(verbose_name='Gün')),
+                ('alt_sinir', models.PositiveIntegerField(verbose_name='Dilim Alt Sınırı')),
+                ('mesaj_sayisi', models.PositiveIntegerField(default=0, verbose_name='Mesaj Sayısı')),
+            ],
+            options={
+                'verbose_name': 'Günlük Uzunluk İstatistiği',
+                'verbose_name_plural': 'Günlük Uzunluk İstatistikleri',
+                'constraints': [models.UniqueConstraint(fields=('gun', 'alt_sinir'), name='istatistik_gun_dilim_tekil')],
+            },
+        ),
+        migrations.CreateModel(
+            name='GunlukEtiketIstatistigi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gun', models.DateField(verbose_name='Gün')),
+                ('mesaj_sayisi', models.PositiveIntegerField(default=0, verbose_name='Mesaj Sayısı')),
+                ('etiket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='mesajlar.etiket', verbose_name='Etiket')),
+            ],
+            options={
+                'verbose_name': 'Günlük Etiket İstatistiği',
+                'verbose_name_plural': 'Günlük Etiket İstatistikleri',
+                'constraints': [models.UniqueConstraint(fields=('gun', 'etiket'), name='istatistik_gun_etiket_tekil')],
+            },
+        ),
+        migrations.CreateModel(
+            name='GunlukKategoriIstatistigi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gun', models.DateField(verbose_name='Gün')),
+                ('mesaj_sayisi', models.PositiveIntegerField(default=0, verbose_name='Mesaj Sayısı')),
+                ('toplam_uzunluk', models.PositiveBigIntegerField(default=0, verbose_name='Toplam Uzunluk')),
+                ('kategori', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='mesajlar.kategori', verbose_name='Kategori')),
+            ],
+            options={
+                'verbose_name': 'Günlük Kategori İstatistiği',
+                'verbose_name_plural': 'Günlük Kategori İstatistikleri',
+                'constraints': [models.UniqueConstraint(fields=('gun', 'kategori'), name='istatistik_gun_kategori_tekil')],
+            },
+        ),
+        migrations.CreateModel(
+            name='GunlukYazarIstatistigi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gun', models.DateField(verbose_name='Gün')),
+                ('mesaj_sayisi', models.PositiveIntegerField(default=0, verbose_name='Mesaj Sayısı')),
+                ('toplam_uzunluk', models.PositiveBigIntegerField(default=0, verbose_name='Toplam Uzunluk')),
+                ('yazar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Yazar')),
+            ],
+            options={
+                'verbose_name': 'Günlük Yazar İstatistiği',
+                'verbose_name_plural': 'Günlük Yazar İstatistikleri',
+                'constraints': [models.UniqueConstraint(fields=('gun', 'yazar'), name='istatistik_gun_yazar_tekil')],
+            },
+        ),
+    ]
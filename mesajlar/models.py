@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Substr
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils import timezone
@@ -6,6 +7,8 @@ from django.utils import timezone
 class Kategori(models.Model):
     isim = models.CharField(max_length=100, unique=True, verbose_name='Kategori Adı')
     aciklama = models.TextField(blank=True, verbose_name='Açıklama')
+    # Sinyallerle güncel tutulur, onarım için: manage.py mesaj_sayaclari
+    mesaj_sayisi = models.IntegerField(default=0, editable=False, verbose_name='Mesaj Sayısı')
     
     class Meta:
         verbose_name = "Kategori"
@@ -20,42 +23,232 @@ class Kategori(models.Model):
 
 class Etiket(models.Model):
     isim = models.CharField(max_length=50, unique=True, verbose_name='Etiket Adı')
+    mesaj_sayisi = models.IntegerField(default=0, editable=False, verbose_name='Mesaj Sayısı')
     
     class Meta:
         verbose_name = "Etiket"
         verbose_name_plural = "Etiketler"
         ordering = ['isim']
+        indexes = [
+            # Etiket bulutu: en çok mesajı olan ilk N etiket, tabloyu sıralamadan
+            models.Index(fields=['-mesaj_sayisi', 'isim'], name='etiket_sayi_idx'),
+        ]
     
     def __str__(self):
         return self.isim
 
+# Liste görünümlerinde tam içerik yerine okunan özetin uzunluğu
+OZET_UZUNLUGU = 100
+
+
+class MesajQuerySet(models.QuerySet):
+    def listing(self):
+        """Liste sayfaları için: ilişkiler tek seferde yüklenir, tam içerik yerine özet okunur"""
+        return (
+            self.select_related('yazar', 'kategori')
+            .prefetch_related('etiketler')
+            .defer('icerik')
+            .annotate(ozet=Substr('icerik', 1, OZET_UZUNLUGU + 1))
+        )
+
+
 class Mesaj(models.Model):
     baslik = models.CharField(max_length=200, verbose_name='Başlık')
     icerik = models.TextField(verbose_name='İçerik')
     tarih = models.DateTimeField(default=timezone.now, verbose_name='Tarih')
+    guncellenme = models.DateTimeField(auto_now=True, verbose_name='Güncellenme')
+    # Admin'deki uzunluk filtresi her satırda LENGTH(icerik) hesaplamasın diye save() ile tutulur
+    icerik_uzunlugu = models.PositiveIntegerField(default=0, editable=False, db_index=True,
+                                                  verbose_name='İçerik Uzunluğu')
     yazar = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mesajlar', verbose_name='Yazar')
     kategori = models.ForeignKey(Kategori, on_delete=models.SET_NULL, null=True, blank=True, 
                                related_name='mesajlar', verbose_name='Kategori')
     etiketler = models.ManyToManyField(Etiket, blank=True, related_name='mesajlar', verbose_name='Etiketler')
     
+    objects = MesajQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Motivasyon Mesajı"
         verbose_name_plural = "Motivasyon Mesajları"
         ordering = ['-tarih']
         indexes = [
             models.Index(fields=['tarih']),
-            models.Index(fields=['yazar']),
+            # Keyset sayfalama (-tarih, -id) sırasıyla okur
+            models.Index(fields=['-tarih', '-id']),
+            # Kategori sayfası ve ?kategori= filtresi: eşitlik + aynı sıralama
+            models.Index(fields=['kategori', '-tarih', '-id'], name='mesaj_kategori_tarih_idx'),
+            # Yazara ve tarih aralığına göre filtre (admin, yazar sayfaları)
+            models.Index(fields=['yazar', '-tarih'], name='mesaj_yazar_tarih_idx'),
         ]
     
     def __str__(self):
         return self.baslik
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Kategori değişikliklerinde sayaçları düzeltebilmek için yüklenen değer saklanır
+        if 'kategori_id' in instance.__dict__:
+            instance._kayitli_kategori_id = instance.kategori_id
+        # Tarih değişirse eski günün istatistikleri de yeniden hesaplanır
+        if 'tarih' in instance.__dict__:
+            instance._kayitli_tarih = instance.tarih
+        return instance
+    
+    def save(self, *args, **kwargs):
+        if 'icerik' not in self.get_deferred_fields():
+            self.icerik_uzunlugu = len(self.icerik)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'icerik' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'icerik_uzunlugu'}
+        super().save(*args, **kwargs)
+    
     def get_absolute_url(self):
         return reverse('mesaj_detay', args=[str(self.id)])
     
     def kisaltilmis_icerik(self):
         """İçeriğin kısaltılmış versiyonunu döndürür"""
-        max_length = 100
-        if len(self.icerik) > max_length:
-            return self.icerik[:max_length] + '...'
-        return self.icerik
\ No newline at end of file
+        max_length = OZET_UZUNLUGU
+        # listing() ile gelen nesnelerde ertelenmiş içerik yerine özet kullanılır
+        icerik = getattr(self, 'ozet', None)
+        if icerik is None:
+            icerik = self.icerik
+        if len(icerik) > max_length:
+            return icerik[:max_length] + '...'
+        return icerik
+
+class ArsivMesaj(models.Model):
+    """mesaj_arsivle ile sıcak tablodan taşınmış mesaj (bkz. mesajlar/arsiv.py).
+
+    Ayrı bir veritabanında tutulabildiği için ilişkiler kısıtsızdır ve
+    etiketler bağlantı tablosu yerine id listesi olarak saklanır.
+    """
+    # Mesaj'daki birincil anahtar korunur; eski bağlantılar arşivde de çalışır
+    id = models.BigIntegerField(primary_key=True)
+    baslik = models.CharField(max_length=200, verbose_name='Başlık')
+    icerik = models.TextField(verbose_name='İçerik')
+    tarih = models.DateTimeField(verbose_name='Tarih')
+    guncellenme = models.DateTimeField(verbose_name='Güncellenme')
+    icerik_uzunlugu = models.PositiveIntegerField(default=0, db_index=True, verbose_name='İçerik Uzunluğu')
+    yazar = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False,
+                              related_name='+', verbose_name='Yazar')
+    kategori = models.ForeignKey(Kategori, on_delete=models.DO_NOTHING, db_constraint=False,
+                                 null=True, blank=True, related_name='+', verbose_name='Kategori')
+    etiket_idleri = models.JSONField(default=list, blank=True, verbose_name='Etiketler')
+    arsivlenme = models.DateTimeField(default=timezone.now, verbose_name='Arşivlenme')
+
+    # Şablonlar arşivden gelen mesajı bununla ayırt eder
+    arsivde = True
+
+    class Meta:
+        verbose_name = "Arşivlenmiş Mesaj"
+        verbose_name_plural = "Arşivlenmiş Mesajlar"
+        ordering = ['-tarih']
+        indexes = [
+            models.Index(fields=['-tarih', '-id'], name='arsiv_tarih_idx'),
+            models.Index(fields=['yazar', '-tarih'], name='arsiv_yazar_tarih_idx'),
+        ]
+
+    def __str__(self):
+        return self.baslik
+
+    def get_absolute_url(self):
+        return reverse('mesaj_detay', args=[str(self.id)])
+
+class GunlukKategoriIstatistigi(models.Model):
+    """Gün ve kategori başına mesaj sayısı ve toplam içerik uzunluğu (bkz. mesajlar/istatistik.py)"""
+    gun = models.DateField(verbose_name='Gün')
+    # Kategori silinince mesajlar gibi özet satırı da kategorisizlere geçer
+    kategori = models.ForeignKey(Kategori, on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='+', verbose_name='Kategori')
+    mesaj_sayisi = models.PositiveIntegerField(default=0, verbose_name='Mesaj Sayısı')
+    toplam_uzunluk = models.PositiveBigIntegerField(default=0, verbose_name='Toplam Uzunluk')
+
+    class Meta:
+        verbose_name = "Günlük Kategori İstatistiği"
+        verbose_name_plural = "Günlük Kategori İstatistikleri"
+        constraints = [
+            models.UniqueConstraint(fields=['gun', 'kategori'], name='istatistik_gun_kategori_tekil'),
+        ]
+
+class GunlukYazarIstatistigi(models.Model):
+    """Gün ve yazar başına mesaj sayısı ve toplam içerik uzunluğu"""
+    gun = models.DateField(verbose_name='Gün')
+    yazar = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', verbose_name='Yazar')
+    mesaj_sayisi = models.PositiveIntegerField(default=0, verbose_name='Mesaj Sayısı')
+    toplam_uzunluk = models.PositiveBigIntegerField(default=0, verbose_name='Toplam Uzunluk')
+
+    class Meta:
+        verbose_name = "Günlük Yazar İstatistiği"
+        verbose_name_plural = "Günlük Yazar İstatistikleri"
+        constraints = [
+            models.UniqueConstraint(fields=['gun', 'yazar'], name='istatistik_gun_yazar_tekil'),
+        ]
+
+class GunlukEtiketIstatistigi(models.Model):
+    """Gün ve etiket başına mesaj sayısı"""
+    gun = models.DateField(verbose_name='Gün')
+    etiket = models.ForeignKey(Etiket, on_delete=models.CASCADE, related_name='+', verbose_name='Etiket')
+    mesaj_sayisi = models.PositiveIntegerField(default=0, verbose_name='Mesaj Sayısı')
+
+    class Meta:
+        verbose_name = "Günlük Etiket İstatistiği"
+        verbose_name_plural = "Günlük Etiket İstatistikleri"
+        constraints = [
+            models.UniqueConstraint(fields=['gun', 'etiket'], name='istatistik_gun_etiket_tekil'),
+        ]
+
+class GunlukUzunlukIstatistigi(models.Model):
+    """Gün ve içerik uzunluğu dilimi başına mesaj sayısı; dilim alt sınırıyla tutulur"""
+    gun = models.DateField(verbose_name='Gün')
+    alt_sinir = models.PositiveIntegerField(verbose_name='Dilim Alt Sınırı')
+    mesaj_sayisi = models.PositiveIntegerField(default=0, verbose_name='Mesaj Sayısı')
+
+    class Meta:
+        verbose_name = "Günlük Uzunluk İstatistiği"
+        verbose_name_plural = "Günlük Uzunluk İstatistikleri"
+        constraints = [
+            models.UniqueConstraint(fields=['gun', 'alt_sinir'], name='istatistik_gun_dilim_tekil'),
+        ]
+
+class Gorev(models.Model):
+    """mesaj_worker'ın işlediği arka plan görevi (bkz. mesajlar/kuyruk.py)"""
+    BEKLIYOR = 'bekliyor'
+    CALISIYOR = 'calisiyor'
+    BASARISIZ = 'basarisiz'
+    DURUMLAR = [
+        (BEKLIYOR, 'Bekliyor'),
+        (CALISIYOR, 'Çalışıyor'),
+        (BASARISIZ, 'Başarısız'),
+    ]
+
+    tur = models.CharField(max_length=50, verbose_name='Tür')
+    # Aynı tür ve anahtarla bekleyen tek görev olur; tekrar eklemeler yok sayılır
+    anahtar = models.CharField(max_length=200, verbose_name='Anahtar')
+    veri = models.JSONField(default=dict, blank=True, verbose_name='Veri')
+    durum = models.CharField(max_length=10, choices=DURUMLAR, default=BEKLIYOR, verbose_name='Durum')
+    zaman = models.DateTimeField(default=timezone.now, verbose_name='Çalışma Zamanı')
+    deneme = models.PositiveSmallIntegerField(default=0, verbose_name='Deneme')
+    # Çalışan görev bu ana kadar bitmezse işçinin öldüğü varsayılır
+    kilit = models.DateTimeField(null=True, blank=True, verbose_name='Kilit Bitişi')
+    hata = models.TextField(blank=True, verbose_name='Son Hata')
+    olusturma = models.DateTimeField(auto_now_add=True, verbose_name='Oluşturma')
+
+    class Meta:
+        verbose_name = "Arka Plan Görevi"
+        verbose_name_plural = "Arka Plan Görevleri"
+        ordering = ['zaman', 'id']
+        indexes = [
+            # İşçinin sorgusu: durum = bekliyor AND zaman <= şimdi ORDER BY zaman, id
+            models.Index(fields=['durum', 'zaman', 'id'], name='gorev_sira_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tur', 'anahtar'],
+                condition=models.Q(durum='bekliyor'),
+                name='gorev_bekleyen_tekil',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.tur}:{self.anahtar}'
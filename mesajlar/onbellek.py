@@ -0,0 +1,355 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+# settings.CACHES içindeki hangi takma adın kullanılacağı ve varsayılan süre (saniye)
+ONBELLEK_ADI = getattr(settings, 'MESAJ_ONBELLEK', 'default')
+ONBELLEK_SURESI = getattr(settings, 'MESAJ_ONBELLEK_SURESI', 300)
+
+_ONEK = 'mesajlar'
+ISTATISTIK_TURLERI = ('sayfa', 'parca')
+
+
+def onbellek():
+    return caches[ONBELLEK_ADI]
+
+
+# -- Sürümler --------------------------------------------------------------
+#
+# Her önbellek anahtarı bağlı olduğu ad alanlarının (ör. "liste",
+# "kategori:3", "mesaj:42") sürüm numaralarını içerir. Bir nesne değişince
+# yalnızca ilgili ad alanlarının sürümü artırılır; eski anahtarlar bir daha
+# okunmaz ve süreleri dolunca kendiliğinden düşer. Sürümün yanında ad alanının
+# son değiştiği an da tutulur; liste sayfalarının Last-Modified başlığı budur.
+
+def _surum_anahtari(ad):
+    return f'{_ONEK}:surum:{ad}'
+
+
+def _zaman_anahtari(ad):
+    return f'{_ONEK}:zaman:{ad}'
+
+
+def _yeni_surum():
+    # Sürüm anahtarı önbellekten düşerse eski bir sürüme geri dönülmesin diye zamandan türetilir
+    return int(time.time() * 1000)
+
+
+def surumler(adlar):
+    """Verilen ad alanlarının sürümlerini tek istekte okur, eksikleri oluşturur"""
+    cache = onbellek()
+    anahtarlar = {ad: _surum_anahtari(ad) for ad in adlar}
+    mevcut = cache.get_many(anahtarlar.values())
+    sonuc = {}
+    for ad, anahtar in anahtarlar.items():
+        if anahtar not in mevcut:
+            cache.add(anahtar, _yeni_surum(), None)
+            cache.add(_zaman_anahtari(ad), time.time(), None)
+            mevcut[anahtar] = cache.get(anahtar)
+        sonuc[ad] = mevcut[anahtar]
+    return sonuc
+
+
+async def asurumler(adlar):
+    cache = onbellek()
+    anahtarlar = {ad: _surum_anahtari(ad) for ad in adlar}
+    mevcut = await cache.aget_many(anahtarlar.values())
+    sonuc = {}
+    for ad, anahtar in anahtarlar.items():
+        if anahtar not in mevcut:
+            await cache.aadd(anahtar, _yeni_surum(), None)
+            await cache.aadd(_zaman_anahtari(ad), time.time(), None)
+            mevcut[anahtar] = await cache.aget(anahtar)
+        sonuc[ad] = mevcut[anahtar]
+    return sonuc
+
+
+def _imza(degerler, adlar):
+    return '.'.join(str(degerler[ad]) for ad in adlar)
+
+
+def surum_imzasi(adlar):
+    """Ad alanlarının sürümlerinden kısa bir anahtar parçası üretir"""
+    return _imza(surumler(adlar), adlar)
+
+
+async def asurum_imzasi(adlar):
+    return _imza(await asurumler(adlar), adlar)
+
+
+def _en_son(zamanlar, adlar):
+    if len(zamanlar) < len(adlar):
+        return None
+    return datetime.fromtimestamp(max(zamanlar.values()), tz=timezone.utc)
+
+
+def son_degisiklik(adlar):
+    """Ad alanlarından birinin en son değiştiği an; biri bilinmiyorsa None"""
+    return _en_son(onbellek().get_many([_zaman_anahtari(ad) for ad in adlar]), adlar)
+
+
+async def ason_degisiklik(adlar):
+    return _en_son(await onbellek().aget_many([_zaman_anahtari(ad) for ad in adlar]), adlar)
+
+
+def gecersiz_kil(*adlar):
+    """Ad alanlarının sürümünü artırarak onlara bağlı tüm anahtarları geçersiz kılar; yeni sürümleri döndürür"""
+    cache = onbellek()
+    yeni = {}
+    for ad in set(adlar):
+        anahtar = _surum_anahtari(ad)
+        try:
+            yeni[ad] = cache.incr(anahtar)
+        except ValueError:
+            yeni[ad] = _yeni_surum()
+            cache.set(anahtar, yeni[ad], None)
+    cache.set_many({_zaman_anahtari(ad): time.time() for ad in yeni}, None)
+    return yeni
+
+
+# -- İstatistikler -----------------------------------------------------------
+
+def _istatistik_anahtari(tur, sonuc):
+    return f'{_ONEK}:istatistik:{tur}:{sonuc}'
+
+
+def istatistik_kaydet(tur, isabet):
+    cache = onbellek()
+    anahtar = _istatistik_anahtari(tur, 'isabet' if isabet else 'iskalama')
+    try:
+        cache.incr(anahtar)
+    except ValueError:
+        cache.add(anahtar, 0, None)
+        cache.incr(anahtar)
+
+
+async def aistatistik_kaydet(tur, isabet):
+    cache = onbellek()
+    anahtar = _istatistik_anahtari(tur, 'isabet' if isabet else 'iskalama')
+    try:
+        await cache.aincr(anahtar)
+    except ValueError:
+        await cache.aadd(anahtar, 0, None)
+        await cache.aincr(anahtar)
+
+
+def istatistikler():
+    """{'sayfa': {'isabet': .., 'iskalama': .., 'oran': ..}, 'parca': {...}} döndürür"""
+    cache = onbellek()
+    sonuc = {}
+    for tur in ISTATISTIK_TURLERI:
+        isabet = cache.get(_istatistik_anahtari(tur, 'isabet'), 0)
+        iskalama = cache.get(_istatistik_anahtari(tur, 'iskalama'), 0)
+        toplam = isabet + iskalama
+        sonuc[tur] = {
+            'isabet': isabet,
+            'iskalama': iskalama,
+            'oran': isabet / toplam if toplam else 0.0,
+        }
+    return sonuc
+
+
+def istatistikleri_sifirla():
+    onbellek().delete_many([
+        _istatistik_anahtari(tur, sonuc)
+        for tur in ISTATISTIK_TURLERI
+        for sonuc in ('isabet', 'iskalama')
+    ])
+
+
+# -- Sayfa önbelleği -----------------------------------------------------------
+
+def bekleyen_mesaj_var(request):
+    """Kullanıcının gösterilmeyi bekleyen bir flash mesajı var mı"""
+    # Herkese açık yol yalnızca mesaj çerezi yokken seçilir; oturum okunmaz
+    if getattr(request, 'herkese_acik', False):
+        return False
+    if 'messages' in request.COOKIES:
+        return True
+    return (settings.SESSION_COOKIE_NAME in request.COOKIES
+            and bool(request.session.get('_messages')))
+
+
+async def abekleyen_mesaj_var(request):
+    if getattr(request, 'herkese_acik', False):
+        return False
+    if 'messages' in request.COOKIES:
+        return True
+    return (settings.SESSION_COOKIE_NAME in request.COOKIES
+            and bool(await request.session.aget('_messages')))
+
+
+def sayfa_onbelleklenebilir(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    # Bekleyen bir flash mesajı varsa sayfa bu kullanıcıya özeldir
+    if bekleyen_mesaj_var(request):
+        return False
+    if settings.SESSION_COOKIE_NAME in request.COOKIES and request.user.is_authenticated:
+        return False
+    return True
+
+
+async def asayfa_onbelleklenebilir(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if await abekleyen_mesaj_var(request):
+        return False
+    if settings.SESSION_COOKIE_NAME in request.COOKIES and (await request.auser()).is_authenticated:
+        return False
+    return True
+
+
+def _sayfa_anahtari(view, request, imza):
+    yol = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'{_ONEK}:sayfa:{view.__name__}:{yol}:{imza}'
+
+
+def _kayittan_yanit(kayit):
+    durum, icerik, icerik_turu = kayit
+    response = HttpResponse(icerik, status=durum, content_type=icerik_turu)
+    response['X-Onbellek'] = 'HIT'
+    return response
+
+
+def _kaydedilebilir(response):
+    return (response.status_code == 200 and not response.streaming
+            and not response.cookies and not response.has_header('Set-Cookie')
+            and 'no-store' not in response.get('Cache-Control', ''))
+
+
+def _kayit(response):
+    return (response.status_code, response.content, response['Content-Type'])
+
+
+def anonim_sayfa_onbellegi(*bagimliliklar, sure=None, haric=None):
+    """Anonim kullanıcılar için görünümün tüm yanıtını önbelleğe alır.
+
+    bagimliliklar, görünümün URL argümanlarıyla biçimlendirilen ad alanlarıdır:
+
+        @anonim_sayfa_onbellegi('kategori:{kategori_id}', 'adlar')
+        def kategori_mesajlari(request, kategori_id): ...
+
+    haric(request) doğru dönen istekler önbelleğe hiç bakılmadan görünüme gider.
+
+    Asenkron görünümlerde önbellek ve oturum asenkron API'lerle okunur.
+    """
+    def dekorator(view):
+        zaman_asimi = ONBELLEK_SURESI if sure is None else sure
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def asarmalayici(request, *args, **kwargs):
+                if (haric and haric(request)) or not await asayfa_onbelleklenebilir(request):
+                    return await view(request, *args, **kwargs)
+
+                adlar = [bagimlilik.format(**kwargs) for bagimlilik in bagimliliklar]
+                anahtar = _sayfa_anahtari(view, request, await asurum_imzasi(adlar))
+                cache = onbellek()
+                kayit = await cache.aget(anahtar)
+                if kayit is not None:
+                    await aistatistik_kaydet('sayfa', True)
+                    return _kayittan_yanit(kayit)
+
+                await aistatistik_kaydet('sayfa', False)
+                response = await view(request, *args, **kwargs)
+                if _kaydedilebilir(response):
+                    await cache.aset(anahtar, _kayit(response), zaman_asimi)
+                    response['X-Onbellek'] = 'MISS'
+                return response
+            return asarmalayici
+
+        @wraps(view)
+        def sarmalayici(request, *args, **kwargs):
+            if (haric and haric(request)) or not sayfa_onbelleklenebilir(request):
+                return view(request, *args, **kwargs)
+
+            adlar = [bagimlilik.format(**kwargs) for bagimlilik in bagimliliklar]
+            anahtar = _sayfa_anahtari(view, request, surum_imzasi(adlar))
+            cache = onbellek()
+            kayit = cache.get(anahtar)
+            if kayit is not None:
+                istatistik_kaydet('sayfa', True)
+                return _kayittan_yanit(kayit)
+
+            istatistik_kaydet('sayfa', False)
+            response = view(request, *args, **kwargs)
+            if _kaydedilebilir(response):
+                cache.set(anahtar, _kayit(response), zaman_asimi)
+                response['X-Onbellek'] = 'MISS'
+            return response
+        return sarmalayici
+    return dekorator
+
+
+# -- Parça anahtarları ---------------------------------------------------------
+
+def _kart_adlari(mesaj):
+    adlar = [f'mesaj:{mesaj.pk}']
+    if mesaj.kategori_id:
+        adlar.append(f'kategori:{mesaj.kategori_id}')
+    adlar.extend(f'etiket:{etiket.pk}' for etiket in mesaj.etiketler.all())
+    return adlar
+
+
+def _kart_anahtarlarini_yaz(mesajlar, degerler):
+    for mesaj in mesajlar:
+        mesaj.kart_anahtari = f'{mesaj.pk}:' + _imza(degerler, _kart_adlari(mesaj))
+
+
+def kart_anahtarlarini_ekle(mesajlar):
+    """Her mesaja, kart parçası için sürümlü bir `kart_anahtari` ekler.
+
+    Kart; mesajın kendisi, kategorisinin adı ve etiketlerinin adlarını
+    gösterdiği için bu üç kaynağın sürümleri tek get_many ile okunur.
+    """
+    mesajlar = list(mesajlar)
+    adlar = {ad for mesaj in mesajlar for ad in _kart_adlari(mesaj)}
+    _kart_anahtarlarini_yaz(mesajlar, surumler(sorted(adlar)))
+
+
+async def akart_anahtarlarini_ekle(mesajlar):
+    mesajlar = list(mesajlar)
+    adlar = {ad for mesaj in mesajlar for ad in _kart_adlari(mesaj)}
+    _kart_anahtarlarini_yaz(mesajlar, await asurumler(sorted(adlar)))
+
+
+def parca(ad, anahtarlar, uret):
+    """Şablon parçasını ad ve sürümlü anahtarlarla önbellekten getirir; yoksa uret() ile üretip saklar"""
+    ozet = hashlib.md5(':'.join(str(anahtar) for anahtar in anahtarlar).encode()).hexdigest()
+    anahtar = f'{_ONEK}:parca:{ad}:{ozet}'
+    cache = onbellek()
+    icerik = cache.get(anahtar)
+    if icerik is not None:
+        istatistik_kaydet('parca', True)
+        return icerik
+    istatistik_kaydet('parca', False)
+    icerik = uret()
+    cache.set(anahtar, icerik, ONBELLEK_SURESI)
+    return icerik
+
+
+# -- Geçersiz kılma kuralları ----------------------------------------------------
+
+def mesaj_degisti(mesaj, etiket_idleri=(), kategori_idleri=()):
+    # Mesaj sayıları değiştiğinde 'kategoriler' sayaçla aynı işlemde sinyalden geçersiz kılınır
+    adlar = [f'mesaj:{mesaj.pk}', 'liste']
+    adlar += [f'kategori:{pk}' for pk in {mesaj.kategori_id, *kategori_idleri} if pk]
+    adlar += [f'etiket:{pk}' for pk in etiket_idleri]
+    gecersiz_kil(*adlar)
+
+
+def kategori_degisti(kategori):
+    # Kategori adı kartlarda ve tüm liste sayfalarında görünür
+    gecersiz_kil(f'kategori:{kategori.pk}', 'kategoriler', 'adlar')
+
+
+def etiket_degisti(etiket):
+    gecersiz_kil(f'etiket:{etiket.pk}', 'adlar')
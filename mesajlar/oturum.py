@@ -0,0 +1,125 @@
+"""Anonim okuyucular için oturumsuz istek yolu ve giriş durumuna bağlı menü.
+
+@herkese_acik ile işaretlenen görünümler herkese aynı içeriği döndürür.
+HerkeseAcikMiddleware bu görünümlere gelen GET isteklerinde oturumu ve flash
+mesajlarını hiç okumaz; request.user anonim kullanıcıyla değiştirilir. Oturuma
+dokunulmadığı için yanıta "Vary: Cookie" eklenmez ve sayfa paylaşılan
+önbelleklerde (vekil, CDN) saklanabilir.
+
+Bu sayfalardaki gezinme çubuğu her zaman anonim sürümüyle gelir. Giriş
+yapmış tarayıcılarda JavaScript'in okuyabildiği "giris" ipucu çerezi (değeri
+kullanıcı id'si) bulunur; oturum.js bu çerez varsa kullanıcı menüsünü
+/oturum/menu/ adresinden ayrıca yükler ve data-oturum ile işaretli düğmeleri
+gösterir. Çerez yalnızca görünümü belirler; yetki kontrolleri sunucudadır.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.template.loader import render_to_string
+from django.utils.functional import SimpleLazyObject, empty
+
+from .onbellek import parca
+
+IPUCU_CEREZI = 'giris'
+MENU_SABLONU = 'mesajlar/_oturum_menusu.html'
+
+_GUVENLI_YONTEMLER = ('GET', 'HEAD')
+
+
+def herkese_acik(view):
+    """Görünümün içeriğinin kullanıcıya göre değişmediğini işaretler"""
+    view.herkese_acik = True
+    return view
+
+
+def herkese_acik_mi(request):
+    return getattr(request, 'herkese_acik', False)
+
+
+def oturumsuz_yola_al(request, view_func):
+    """Herkese açık görünüme gelen güvenli isteği oturumsuz yola alır"""
+    # Bekleyen bir flash mesajı (CookieStorage) varsa normal yoldan gösterilir
+    if (not getattr(view_func, 'herkese_acik', False) or request.method not in _GUVENLI_YONTEMLER
+            or request.COOKIES.get('messages')):
+        return
+    request.herkese_acik = True
+    request.user = AnonymousUser()
+    request.auser = _aanonim_kullanici
+
+
+def menu_html(user):
+    """Gezinme çubuğunun giriş durumuna bağlı kısmı; kullanıcı başına önbellekten gelir"""
+    anahtarlar = [user.pk, user.get_username()] if user.is_authenticated else ['anonim']
+    return parca('oturum_menusu', anahtarlar, lambda: render_to_string(MENU_SABLONU, {'user': user}))
+
+
+# -- Giriş ipucu ---------------------------------------------------------------
+
+def ipucu_degistir(request, user):
+    """Giriş/çıkış sinyallerinden çağrılır; çerez yanıtta güncellenir"""
+    request._giris_ipucu = str(user.pk) if user is not None and user.is_authenticated else ''
+
+
+def _yuklu_kullanici(request):
+    # Kullanıcı istek sırasında okunmadıysa yalnızca ipucu için oturum açılmaz
+    user = request.__dict__.get('user')
+    if isinstance(user, SimpleLazyObject):
+        # Asenkron görünümlerde kullanıcı request.auser() ile okunmuş olabilir
+        return getattr(request, '_acached_user', None) if user._wrapped is empty else user._wrapped
+    return user
+
+
+def _ipucu_degeri(request):
+    """Yanıtta çereze yazılacak değer ('' silinir), değişiklik yoksa None"""
+    if hasattr(request, '_giris_ipucu'):
+        return request._giris_ipucu
+    mevcut = request.COOKIES.get(IPUCU_CEREZI, '')
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return '' if mevcut else None
+    user = None if herkese_acik_mi(request) else _yuklu_kullanici(request)
+    if user is None:
+        return None
+    deger = str(user.pk) if user.is_authenticated else ''
+    return None if deger == mevcut else deger
+
+
+async def _aanonim_kullanici():
+    return AnonymousUser()
+
+
+class HerkeseAcikMiddleware:
+    """@herkese_acik görünümlerde oturumu atlar ve giriş ipucu çerezini güncel tutar.
+
+    Hız sınırı kullanıcı kovasını görebilsin diye HizSiniriMiddleware'den sonra gelir;
+    HizSiniriMiddleware oturum çerezi olmayan istekte request.user'a dokunmaz, 429
+    sayfasını da oturumsuz_yola_al ile işler.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self._ipucu_cerezi(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self._ipucu_cerezi(request, await self.get_response(request))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        oturumsuz_yola_al(request, view_func)
+        return None
+
+    def _ipucu_cerezi(self, request, response):
+        deger = _ipucu_degeri(request)
+        if deger == '':
+            response.delete_cookie(IPUCU_CEREZI, samesite='Lax')
+        elif deger is not None:
+            response.set_cookie(IPUCU_CEREZI, deger, max_age=settings.SESSION_COOKIE_AGE,
+                                secure=settings.SESSION_COOKIE_SECURE, samesite='Lax')
+        return response
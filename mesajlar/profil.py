@@ -0,0 +1,232 @@
+"""İstek başına SQL ve şablon ölçümü.
+
+ProfilMiddleware örneklenen her istek için sorgu sayısını, toplam
+veritabanı süresini, tekrarlanan sorguları, şablon işleme süresini ve
+yanıt boyutunu ölçer; sonuçları URL adına göre bellekteki halka
+tamponlarda tutar ve Server-Timing başlığıyla tarayıcıya da gönderir.
+Özet, personel için /profil/ sayfasında gösterilir.
+
+settings.MESAJ_PROFIL_ORANI 0 ise (varsayılan) middleware hiç yüklenmez.
+Ölçümler süreç içindedir; birden fazla işçi sürecinde her süreç kendi
+örneklerini görür.
+"""
+import random
+import threading
+import time
+from collections import Counter, deque, namedtuple
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.base import Template
+
+# İsteklerin ne kadarının ölçüleceği (0 kapalı, 1 hepsi) ve görünüm başına saklanan örnek sayısı
+PROFIL_ORANI = getattr(settings, 'MESAJ_PROFIL_ORANI', 0.0)
+TAMPON_BOYUTU = getattr(settings, 'MESAJ_PROFIL_TAMPON_BOYUTU', 500)
+
+# Süre histogramının kova üst sınırları (ms); son kova bunların üzerini toplar
+HISTOGRAM_SINIRLARI = (5, 10, 25, 50, 100, 250, 500, 1000)
+
+Ornek = namedtuple('Ornek', 'sure sorgu_sayisi db_suresi tekrarlanan benzer sablon_suresi boyut durum')
+
+_etkin_profil = ContextVar('mesaj_profili', default=None)
+_tamponlar = {}
+_kilit = threading.Lock()
+_kurulu = False
+
+
+class IstekProfili:
+    __slots__ = ('baslangic', 'sorgular', 'db_suresi', 'sablon_suresi', 'sablon_derinligi')
+
+    def __init__(self):
+        self.baslangic = time.perf_counter()
+        self.sorgular = []
+        self.db_suresi = 0.0
+        self.sablon_suresi = 0.0
+        self.sablon_derinligi = 0
+
+
+# -- Ölçüm noktaları -----------------------------------------------------------
+
+def _sorgu_olc(execute, sql, params, many, context):
+    profil = _etkin_profil.get()
+    if profil is None:
+        return execute(sql, params, many, context)
+    baslangic = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profil.db_suresi += time.perf_counter() - baslangic
+        profil.sorgular.append((sql, repr(params)))
+
+
+def _baglantiya_ekle(connection, **kwargs):
+    if _sorgu_olc not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_sorgu_olc)
+
+
+_asil_render = Template.render
+
+
+def _olculen_render(self, context):
+    profil = _etkin_profil.get()
+    if profil is None:
+        return _asil_render(self, context)
+    # {% include %} iç içe render çağırır; yalnızca en dıştaki süre sayılır
+    profil.sablon_derinligi += 1
+    baslangic = time.perf_counter()
+    try:
+        return _asil_render(self, context)
+    finally:
+        profil.sablon_derinligi -= 1
+        if not profil.sablon_derinligi:
+            profil.sablon_suresi += time.perf_counter() - baslangic
+
+
+def _olcumleri_kur():
+    global _kurulu
+    with _kilit:
+        if _kurulu:
+            return
+        connection_created.connect(_baglantiya_ekle, dispatch_uid='mesaj_profil')
+        for connection in connections.all(initialized_only=True):
+            _baglantiya_ekle(connection)
+        Template.render = _olculen_render
+        _kurulu = True
+
+
+# -- Kayıt ---------------------------------------------------------------------
+
+def _tampon(ad):
+    tampon = _tamponlar.get(ad)
+    if tampon is None:
+        with _kilit:
+            tampon = _tamponlar.setdefault(ad, deque(maxlen=TAMPON_BOYUTU))
+    return tampon
+
+
+def _kaydet(request, response, profil):
+    sure = time.perf_counter() - profil.baslangic
+    tam = Counter(profil.sorgular)
+    benzer = Counter(sql for sql, _ in profil.sorgular)
+    ornek = Ornek(
+        sure=sure * 1000,
+        sorgu_sayisi=len(profil.sorgular),
+        db_suresi=profil.db_suresi * 1000,
+        tekrarlanan=sum(sayi - 1 for sayi in tam.values()),
+        benzer=sum(sayi - 1 for sayi in benzer.values()),
+        sablon_suresi=profil.sablon_suresi * 1000,
+        boyut=None if response.streaming else len(response.content),
+        durum=response.status_code,
+    )
+    eslesme = request.resolver_match
+    _tampon(eslesme.view_name if eslesme else '-').append(ornek)
+
+    response.headers['Server-Timing'] = ', '.join([
+        f'db;dur={ornek.db_suresi:.1f};desc="{ornek.sorgu_sayisi} sorgu"',
+        f'sablon;dur={ornek.sablon_suresi:.1f}',
+        f'toplam;dur={ornek.sure:.1f}',
+    ])
+    return response
+
+
+def _orneklensin_mi():
+    return PROFIL_ORANI >= 1 or random.random() < PROFIL_ORANI
+
+
+class ProfilMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not PROFIL_ORANI:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        _olcumleri_kur()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not _orneklensin_mi():
+            return self.get_response(request)
+        profil = IstekProfili()
+        belirtec = _etkin_profil.set(profil)
+        try:
+            response = self.get_response(request)
+        finally:
+            _etkin_profil.reset(belirtec)
+        return _kaydet(request, response, profil)
+
+    async def __acall__(self, request):
+        if not _orneklensin_mi():
+            return await self.get_response(request)
+        profil = IstekProfili()
+        # sync_to_async bağlamı kopyaladığı için ORM iş parçacığındaki sorgular da bu profile yazılır
+        belirtec = _etkin_profil.set(profil)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _etkin_profil.reset(belirtec)
+        return _kaydet(request, response, profil)
+
+
+# -- Özet ----------------------------------------------------------------------
+
+def _yuzdelik(sirali, oran):
+    return sirali[min(len(sirali) - 1, int(len(sirali) * oran))]
+
+
+def _histogram(degerler):
+    """[(kova etiketi, örnek sayısı), ...] döndürür"""
+    kovalar = [0] * (len(HISTOGRAM_SINIRLARI) + 1)
+    for deger in degerler:
+        for i, sinir in enumerate(HISTOGRAM_SINIRLARI):
+            if deger <= sinir:
+                kovalar[i] += 1
+                break
+        else:
+            kovalar[-1] += 1
+    etiketler = [f'≤{sinir}' for sinir in HISTOGRAM_SINIRLARI] + [f'>{HISTOGRAM_SINIRLARI[-1]}']
+    return list(zip(etiketler, kovalar))
+
+
+def _ortalama(degerler):
+    degerler = [deger for deger in degerler if deger is not None]
+    return sum(degerler) / len(degerler) if degerler else None
+
+
+def ozet():
+    """Görünüm başına istatistikleri en yavaş p95'ten başlayarak döndürür"""
+    satirlar = []
+    for ad, tampon in list(_tamponlar.items()):
+        ornekler = list(tampon)
+        if not ornekler:
+            continue
+        sureler = sorted(ornek.sure for ornek in ornekler)
+        satirlar.append({
+            'ad': ad,
+            'ornek_sayisi': len(ornekler),
+            'p50': _yuzdelik(sureler, 0.5),
+            'p95': _yuzdelik(sureler, 0.95),
+            'en_cok': sureler[-1],
+            'sorgu_sayisi': _ortalama(ornek.sorgu_sayisi for ornek in ornekler),
+            'en_cok_sorgu': max(ornek.sorgu_sayisi for ornek in ornekler),
+            'db_suresi': _ortalama(ornek.db_suresi for ornek in ornekler),
+            'tekrarlanan': _ortalama(ornek.tekrarlanan for ornek in ornekler),
+            'benzer': _ortalama(ornek.benzer for ornek in ornekler),
+            'sablon_suresi': _ortalama(ornek.sablon_suresi for ornek in ornekler),
+            'boyut': _ortalama(ornek.boyut for ornek in ornekler),
+            'histogram': _histogram(sureler),
+        })
+    return sorted(satirlar, key=lambda satir: satir['p95'], reverse=True)
+
+
+def sifirla():
+    with _kilit:
+        _tamponlar.clear()
@@ -0,0 +1,149 @@
+"""Okuma replikalarına yönlendirme.
+
+settings.MESAJ_REPLIKALAR ({takma ad: ağırlık}) boş değilse, yalnızca
+@replikadan_okunabilir ile işaretlenmiş görünümlerin ve admin liste
+sayfalarının GET/HEAD isteklerindeki okumalar ağırlıklı olarak seçilen bir
+replikaya gider. Diğer her şey (yazma görünümleri, yönetim komutları,
+sinyaller) birincil veritabanını kullanır.
+
+Bir kullanıcı yazma isteği yaptıktan sonra YAZMA_SURESI boyunca bir çerez
+ile birinciye yönlendirilir; böylece replikalardaki gecikme yüzünden kendi
+değişikliğini görmeme durumu yaşanmaz.
+"""
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLIKALAR = getattr(settings, 'MESAJ_REPLIKALAR', {})
+# Yazmadan sonra birincide kalınacak süre (saniye); replikasyon gecikmesinden uzun olmalı
+YAZMA_SURESI = getattr(settings, 'MESAJ_REPLIKA_YAZMA_SURESI', 10)
+YAZMA_CEREZI = 'mesaj_yazdi'
+
+_GUVENLI_YONTEMLER = ('GET', 'HEAD', 'OPTIONS')
+
+# Oturum ve kullanıcı tek satırlık birincil anahtar okumalarıdır; girişten hemen
+# sonra replikada henüz olmayabilecekleri için her zaman birinciden okunur
+BIRINCIL_UYGULAMALAR = {'sessions', 'auth'}
+
+_istek_durumu = ContextVar('mesaj_replika_durumu', default=None)
+
+
+def replikadan_okunabilir(view):
+    """Görünümün okumalarının replikadan yapılabileceğini işaretler"""
+    view.replikadan_okunabilir = True
+    return view
+
+
+def replika_sec():
+    return random.choices(list(REPLIKALAR), weights=list(REPLIKALAR.values()))[0]
+
+
+class IstekDurumu:
+    __slots__ = ('replika',)
+
+    def __init__(self):
+        self.replika = None
+
+
+class ReplikaYonlendirici:
+    def db_for_read(self, model, **hints):
+        durum = _istek_durumu.get()
+        if durum is not None and durum.replika and model._meta.app_label not in BIRINCIL_UYGULAMALAR:
+            return durum.replika
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        havuz = {DEFAULT_DB_ALIAS, *REPLIKALAR}
+        if obj1._state.db in havuz and obj2._state.db in havuz:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replikalar şemayı birincinin kopyasından alır
+        if db in REPLIKALAR:
+            return False
+        return None
+
+
+def _admin_listesi_mi(request):
+    eslesme = request.resolver_match
+    return eslesme is not None and eslesme.namespace == 'admin' and eslesme.url_name.endswith('_changelist')
+
+
+class ReplikaMiddleware:
+    """İsteğin okumalarının nereye gideceğine karar verir ve yazmalardan sonra çerezi koyar"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        belirtec = _istek_durumu.set(IstekDurumu())
+        try:
+            response = self.get_response(request)
+        finally:
+            _istek_durumu.reset(belirtec)
+        return self._yazma_cerezi(request, response)
+
+    async def __acall__(self, request):
+        belirtec = _istek_durumu.set(IstekDurumu())
+        try:
+            response = await self.get_response(request)
+        finally:
+            _istek_durumu.reset(belirtec)
+        return self._yazma_cerezi(request, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # ASGI altında bu metot ayrı bir iş parçacığında, bağlamın kopyasıyla çalışır;
+        # değişken yeniden atanmaz, aynı durum nesnesi güncellenir.
+        durum = _istek_durumu.get()
+        if (durum is None or not REPLIKALAR or request.method not in _GUVENLI_YONTEMLER
+                or YAZMA_CEREZI in request.COOKIES):
+            return None
+        if getattr(view_func, 'replikadan_okunabilir', False) or _admin_listesi_mi(request):
+            durum.replika = replika_sec()
+        return None
+
+    def _yazma_cerezi(self, request, response):
+        if REPLIKALAR and request.method not in _GUVENLI_YONTEMLER:
+            response.set_cookie(YAZMA_CEREZI, '1', max_age=YAZMA_SURESI, httponly=True, samesite='Lax')
+        return response
+
+
+def akista_surdur(parcalar):
+    """Yanıt döndükten sonra tüketilen akış üretecinde isteğin replika seçimini sürdürür.
+
+    Middleware durumu görünüm dönünce sıfırlar; akışın sorguları ise
+    StreamingHttpResponse okunurken çalışır.
+    """
+    durum = _istek_durumu.get()
+
+    if hasattr(parcalar, '__aiter__'):
+        async def auretec():
+            belirtec = _istek_durumu.set(durum)
+            try:
+                async for parca in parcalar:
+                    yield parca
+            finally:
+                _istek_durumu.reset(belirtec)
+        return auretec()
+
+    def uretec():
+        belirtec = _istek_durumu.set(durum)
+        try:
+            yield from parcalar
+        finally:
+            _istek_durumu.reset(belirtec)
+    return uretec()
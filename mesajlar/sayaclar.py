@@ -0,0 +1,59 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Etiket, Kategori, Mesaj
+
+EtiketBaglantisi = Mesaj.etiketler.through
+
+
+def kategori_sayacini_degistir(kategori_id, fark):
+    if kategori_id and fark:
+        Kategori.objects.filter(pk=kategori_id).update(mesaj_sayisi=F('mesaj_sayisi') + fark)
+
+
+def etiket_sayaclarini_degistir(etiket_idleri, fark):
+    if etiket_idleri and fark:
+        Etiket.objects.filter(pk__in=etiket_idleri).update(mesaj_sayisi=F('mesaj_sayisi') + fark)
+
+
+def bagli_etiket_idleri(mesaj_id, etiket_idleri=None):
+    """Mesaja gerçekten bağlı olan etiket id'lerini döndürür (isteğe bağlı süzgeçle)"""
+    baglantilar = EtiketBaglantisi.objects.filter(mesaj_id=mesaj_id)
+    if etiket_idleri is not None:
+        baglantilar = baglantilar.filter(etiket_id__in=etiket_idleri)
+    return list(baglantilar.values_list('etiket_id', flat=True))
+
+
+def _sayim(queryset, alan):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{alan: OuterRef('pk')})
+            .order_by()
+            .values(alan)
+            .annotate(sayi=Count('*'))
+            .values('sayi'),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def kategori_sayaclarini_hesapla(kategori_idleri):
+    """Verilen kategorilerin sayaçlarını baştan hesaplar (onarım); tekrar çalıştırmak zararsızdır"""
+    return Kategori.objects.filter(pk__in=kategori_idleri).update(
+        mesaj_sayisi=_sayim(Mesaj.objects.all(), 'kategori_id'),
+    )
+
+
+def etiket_sayaclarini_hesapla(etiket_idleri):
+    """Verilen etiketlerin sayaçlarını baştan hesaplar (onarım); tekrar çalıştırmak zararsızdır"""
+    return Etiket.objects.filter(pk__in=etiket_idleri).update(
+        mesaj_sayisi=_sayim(EtiketBaglantisi.objects.all(), 'etiket_id'),
+    )
+
+
+def sayaclari_yeniden_hesapla():
+    """Tüm kategori ve etiket sayaçlarını tek UPDATE ile baştan hesaplar"""
+    kategori = Kategori.objects.update(mesaj_sayisi=_sayim(Mesaj.objects.all(), 'kategori_id'))
+    etiket = Etiket.objects.update(mesaj_sayisi=_sayim(EtiketBaglantisi.objects.all(), 'etiket_id'))
+    return kategori, etiket
@@ -0,0 +1,220 @@
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+# Varsayılan ve en büyük sayfa boyutları (settings ile değiştirilebilir)
+VARSAYILAN_SAYFA_BOYUTU = getattr(settings, 'MESAJ_SAYFA_BOYUTU', 12)
+EN_BUYUK_SAYFA_BOYUTU = getattr(settings, 'MESAJ_EN_BUYUK_SAYFA_BOYUTU', 50)
+
+# Toplam sayı bu değerin üzerindeyse tam olarak sayılmaz, "1000+" gösterilir
+SAYIM_SINIRI = getattr(settings, 'MESAJ_SAYIM_SINIRI', 1000)
+
+
+class GecersizImlec(ValueError):
+    """Çözümlenemeyen sayfalama imleci"""
+
+
+def imlec_olustur(mesaj):
+    """(tarih, id) ikilisini URL'de taşınabilir bir imlece çevirir"""
+    ham = f'{mesaj.tarih.isoformat()}|{mesaj.pk}'
+    return base64.urlsafe_b64encode(ham.encode()).decode().rstrip('=')
+
+
+def imlec_coz(imlec):
+    """imlec_olustur ile üretilen imleci (tarih, id) ikilisine geri çevirir"""
+    try:
+        dolgu = '=' * (-len(imlec) % 4)
+        ham = base64.urlsafe_b64decode(imlec + dolgu).decode()
+        tarih, pk = ham.rsplit('|', 1)
+        return datetime.fromisoformat(tarih), int(pk)
+    except (ValueError, UnicodeDecodeError) as hata:
+        raise GecersizImlec(imlec) from hata
+
+
+def sayfa_boyutu_al(request):
+    """?boyut= parametresini sınırlar içinde okur"""
+    boyut = request.GET.get('boyut', '')
+    if boyut.isdigit() and int(boyut) > 0:
+        return min(int(boyut), EN_BUYUK_SAYFA_BOYUTU)
+    return VARSAYILAN_SAYFA_BOYUTU
+
+
+def yaklasik_sayi(queryset, sinir=SAYIM_SINIRI):
+    """Toplam sayıyı en fazla `sinir` satır okuyarak hesaplar.
+
+    (sayi, tam_mi) döndürür; sınır aşılırsa sayi=sinir ve tam_mi=False olur.
+    """
+    return _sayi_sonucu(queryset.order_by()[:sinir + 1].count(), sinir)
+
+
+async def ayaklasik_sayi(queryset, sinir=SAYIM_SINIRI):
+    return _sayi_sonucu(await queryset.order_by()[:sinir + 1].acount(), sinir)
+
+
+def _sayi_sonucu(sayi, sinir):
+    if sayi > sinir:
+        return sinir, False
+    return sayi, True
+
+
+class KeysetSayfasi:
+    """Bir keyset sayfasının mesajlarını ve komşu sayfa imleçlerini tutar"""
+
+    def __init__(self, mesajlar, sonraki_imlec, onceki_imlec, boyut):
+        self.mesajlar = mesajlar
+        self.sonraki_imlec = sonraki_imlec
+        self.onceki_imlec = onceki_imlec
+        self.boyut = boyut
+        self.sonraki_link = ''
+        self.onceki_link = ''
+
+    def __iter__(self):
+        return iter(self.mesajlar)
+
+    def __len__(self):
+        return len(self.mesajlar)
+
+    def __bool__(self):
+        return bool(self.mesajlar)
+
+    @property
+    def has_other_pages(self):
+        return bool(self.sonraki_imlec or self.onceki_imlec)
+
+
+def _keyset_sorgusu(queryset, request, sonra_param, once_param):
+    """İmleçleri çözer; (sıralı ve sınırlı queryset, geri_yonde, sonra, boyut) döndürür"""
+    boyut = sayfa_boyutu_al(request)
+    sonra = request.GET.get(sonra_param, '')
+    once = request.GET.get(once_param, '')
+
+    geri_yonde = False
+    try:
+        if sonra:
+            tarih, pk = imlec_coz(sonra)
+            queryset = queryset.filter(Q(tarih__lt=tarih) | Q(tarih=tarih, pk__lt=pk))
+        elif once:
+            tarih, pk = imlec_coz(once)
+            queryset = queryset.filter(Q(tarih__gt=tarih) | Q(tarih=tarih, pk__gt=pk))
+            geri_yonde = True
+    except GecersizImlec:
+        sonra = ''
+
+    if geri_yonde:
+        queryset = queryset.order_by('tarih', 'id')[:boyut + 1]
+    else:
+        queryset = queryset.order_by('-tarih', '-id')[:boyut + 1]
+    return queryset, geri_yonde, sonra, boyut
+
+
+def _keyset_sayfasi(satirlar, request, geri_yonde, sonra, boyut, sonra_param, once_param):
+    fazlasi_var = len(satirlar) > boyut
+    satirlar = satirlar[:boyut]
+    if geri_yonde:
+        satirlar = satirlar[::-1]
+
+    sonraki_imlec = onceki_imlec = None
+    if satirlar:
+        # Geri yönde gelindiyse çıkış noktası daha eski bir sayfa demektir
+        if fazlasi_var or geri_yonde:
+            sonraki_imlec = imlec_olustur(satirlar[-1])
+        if (geri_yonde and fazlasi_var) or (sonra and not geri_yonde):
+            onceki_imlec = imlec_olustur(satirlar[0])
+
+    sayfa = KeysetSayfasi(satirlar, sonraki_imlec, onceki_imlec, boyut)
+    imlec_paramlari = (sonra_param, once_param)
+    sayfa.sonraki_link = sayfa_linki(request, sonra_param, sonraki_imlec, imlec_paramlari) if sonraki_imlec else ''
+    sayfa.onceki_link = sayfa_linki(request, once_param, onceki_imlec, imlec_paramlari) if onceki_imlec else ''
+    return sayfa
+
+
+class KeysetSorgusu:
+    """Bir keyset sayfasının sorgusu ve okunan satırlardan sayfanın kurulması.
+
+    `queryset` sıralı ve boyut + 1 ile sınırlıdır; satırlar liste olarak ya
+    da (akışta) iterator() ile okunup sayfa() ile KeysetSayfasi'na çevrilir.
+    """
+
+    def __init__(self, queryset, request, sonra_param='sonra', once_param='once'):
+        self.request = request
+        self.sonra_param = sonra_param
+        self.once_param = once_param
+        self.queryset, self.geri_yonde, self.sonra, self.boyut = _keyset_sorgusu(
+            queryset, request, sonra_param, once_param)
+
+    def sayfa(self, satirlar):
+        return _keyset_sayfasi(list(satirlar), self.request, self.geri_yonde, self.sonra, self.boyut,
+                               self.sonra_param, self.once_param)
+
+
+def keyset_sayfala(queryset, request, sonra_param='sonra', once_param='once'):
+    """Queryset'i (-tarih, -id) sırasıyla keyset yöntemiyle sayfalar.
+
+    OFFSET kullanılmadığı için her sayfa, akışın ne kadar derininde olursa
+    olsun (tarih, id) indeksi üzerinde aynı maliyetle okunur.
+    ?sonra=<imlec> daha eski, ?once=<imlec> daha yeni mesajları getirir.
+    Geçersiz bir imleç ilk sayfaya düşer.
+    """
+    sorgu = KeysetSorgusu(queryset, request, sonra_param, once_param)
+    return sorgu.sayfa(sorgu.queryset)
+
+
+async def akeyset_sayfala(queryset, request, sonra_param='sonra', once_param='once'):
+    """keyset_sayfala'nın asenkron ORM ile çalışan karşılığı"""
+    sorgu = KeysetSorgusu(queryset, request, sonra_param, once_param)
+    return sorgu.sayfa([satir async for satir in sorgu.queryset])
+
+
+def sayfa_linki(request, imlec_param, imlec, imlec_paramlari=('sonra', 'once')):
+    """Mevcut filtreleri koruyarak komşu sayfanın sorgu dizesini üretir; eski imleçler atılır"""
+    parametreler = request.GET.copy()
+    for anahtar in imlec_paramlari:
+        parametreler.pop(anahtar, None)
+    parametreler[imlec_param] = imlec
+    return '?' + parametreler.urlencode()
+
+
+def tablo_tahmini(model, using='default'):
+    """Tablonun satır sayısını veritabanı istatistiklerinden okur; bilinmiyorsa None.
+
+    PostgreSQL'de pg_class.reltuples, SQLite'ta ANALYZE ile dolan sqlite_stat1
+    kullanılır. İkisi de tabloyu taramaz, ama son ANALYZE kadar günceldir.
+    """
+    connection = connections[using]
+    tablo = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [tablo])
+            elif connection.vendor == 'sqlite':
+                cursor.execute("SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [tablo])
+            else:
+                return None
+            satir = cursor.fetchone()
+    except DatabaseError:
+        # sqlite_stat1 henüz hiç ANALYZE çalışmadıysa yoktur
+        return None
+    if satir is None or satir[0] is None or satir[0] < 0:
+        return None
+    return satir[0]
+
+
+class TahminiSayfalayici(Paginator):
+    """Filtresiz büyük tablolarda COUNT(*) yerine istatistik tahminini kullanan sayfalayıcı.
+
+    Filtre ya da arama varsa veya tahmin SAYIM_SINIRI'nın altındaysa tam sayım yapılır.
+    """
+
+    @cached_property
+    def count(self):
+        sorgu = self.object_list
+        if isinstance(sorgu, QuerySet) and not sorgu.query.where:
+            tahmin = tablo_tahmini(sorgu.model, sorgu.db)
+            if tahmin is not None and tahmin > SAYIM_SINIRI:
+                return tahmin
+        return super().count
@@ -0,0 +1,118 @@
+"""Kıyaslama ve yük denemeleri için tekrarlanabilir sentetik veri üretimi.
+
+Aynı tohum ve ölçekle her çalıştırmada aynı kullanıcılar, kategoriler,
+etiketler ve mesajlar üretilir. Tarihler çalıştırıldığı günün gece
+yarısına göre geriye doğru dağıtılır; böylece "bugün", "bu ay" gibi
+göreli filtreler her gün benzer miktarda satır döndürür.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from . import beslemeler, havuz, istatistik, onbellek
+from .arama import arama_motoru
+from .etiket_servisi import DIZIN_SURUMU
+from .models import Etiket, Kategori, Mesaj
+from .sayaclar import sayaclari_yeniden_hesapla
+
+KELIMELER = (
+    'başarı', 'hedef', 'umut', 'cesaret', 'sabır', 'emek', 'azim', 'güç', 'yol', 'adım',
+    'bugün', 'yarın', 'hayal', 'inanç', 'değişim', 'öğrenmek', 'denemek', 'kazanmak',
+    'düşmek', 'kalkmak', 'zaman', 'fırsat', 'çalışmak', 'gülümsemek', 'teşekkür', 'sevgi',
+    'odak', 'disiplin', 'ilham', 'yolculuk', 'başlangıç', 'küçük', 'büyük', 'her', 'gün',
+    'asla', 'vazgeçme', 'devam', 'et', 'kendine', 'güven', 'işte', 'şimdi', 'birlikte',
+)
+
+# Mesaj başına etiket sayısının dağılımı: (etiket sayısı, ağırlık)
+ETIKET_DAGILIMI = ((0, 10), (1, 25), (2, 30), (3, 20), (4, 10), (5, 5))
+
+# Mesajların dağıtıldığı gün sayısı
+GUN_ARALIGI = 400
+
+
+def _metin(rastgele, en_az, en_cok):
+    kelimeler = rastgele.choices(KELIMELER, k=rastgele.randint(en_az, en_cok))
+    return ' '.join(kelimeler).capitalize()
+
+
+def _zipf_agirliklari(sayi):
+    # Az sayıda popüler etiket/kategori ve uzun bir kuyruk
+    return [1 / (sira + 1) for sira in range(sayi)]
+
+
+def sentetik_veri_olustur(kullanici=20, kategori=15, etiket=100, mesaj=5000, tohum=42,
+                          parti_boyutu=2000, ilerleme=None):
+    """Verilen ölçekte veri üretir ve türetilmiş verileri (sayaçlar, arama indeksi) yeniler.
+
+    Üretilen nesnelerin id listelerini içeren bir sözlük döndürür.
+    """
+    rastgele = random.Random(tohum)
+    ilerleme = ilerleme or (lambda sayi: None)
+    parola = make_password('benchmark')
+
+    kullanicilar = User.objects.bulk_create([
+        User(username=f'bench{i}', password=parola) for i in range(kullanici)
+    ])
+    kategoriler = Kategori.objects.bulk_create([
+        Kategori(isim=f'Kategori {i}', aciklama=_metin(rastgele, 5, 15)) for i in range(kategori)
+    ])
+    etiketler = Etiket.objects.bulk_create([Etiket(isim=f'etiket{i}') for i in range(etiket)])
+
+    kategori_agirliklari = _zipf_agirliklari(len(kategoriler))
+    etiket_agirliklari = _zipf_agirliklari(len(etiketler))
+    etiket_sayilari, etiket_sayisi_agirliklari = zip(*ETIKET_DAGILIMI)
+    gece_yarisi = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    Baglanti = Mesaj.etiketler.through
+
+    mesaj_idleri = []
+    for baslangic in range(0, mesaj, parti_boyutu):
+        parti, parti_etiketleri = [], []
+        for _ in range(min(parti_boyutu, mesaj - baslangic)):
+            icerik = _metin(rastgele, 5, 80)
+            secili_kategori = None
+            if kategoriler and rastgele.random() >= 0.1:
+                secili_kategori = rastgele.choices(kategoriler, kategori_agirliklari)[0]
+            parti.append(Mesaj(
+                baslik=_metin(rastgele, 2, 8),
+                icerik=icerik,
+                icerik_uzunlugu=len(icerik),
+                tarih=gece_yarisi + timedelta(days=1) - timedelta(seconds=rastgele.randrange(GUN_ARALIGI * 86400)),
+                yazar=rastgele.choice(kullanicilar),
+                kategori=secili_kategori,
+            ))
+            adet = rastgele.choices(etiket_sayilari, etiket_sayisi_agirliklari)[0] if etiketler else 0
+            secili = set()
+            while len(secili) < min(adet, len(etiketler)):
+                secili.add(rastgele.choices(etiketler, etiket_agirliklari)[0].pk)
+            parti_etiketleri.append(sorted(secili))
+
+        Mesaj.objects.bulk_create(parti)
+        Baglanti.objects.bulk_create([
+            Baglanti(mesaj_id=m.pk, etiket_id=etiket_id)
+            for m, etiket_idleri in zip(parti, parti_etiketleri)
+            for etiket_id in etiket_idleri
+        ])
+        mesaj_idleri.extend(m.pk for m in parti)
+        ilerleme(len(mesaj_idleri))
+
+    # bulk_create sinyal göndermez
+    sayaclari_yeniden_hesapla()
+    istatistik.araligi_hesapla()
+    arama_motoru().yeniden_olustur()
+    onbellek.gecersiz_kil('liste', 'kategoriler', 'adlar', DIZIN_SURUMU)
+    havuz.havuzlari_sil([k.pk for k in kategoriler])
+    beslemeler.beslemeleri_sil([
+        beslemeler.TUM,
+        *(beslemeler.kapsam(kategori_id=k.pk) for k in kategoriler),
+        *(beslemeler.kapsam(etiket_id=e.pk) for e in etiketler),
+    ])
+
+    return {
+        'kullanicilar': [k.pk for k in kullanicilar],
+        'kategoriler': [k.pk for k in kategoriler],
+        'etiketler': [e.pk for e in etiketler],
+        'mesajlar': mesaj_idleri,
+    }
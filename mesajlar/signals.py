@@ -0,0 +1,202 @@
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import beslemeler, etiket_servisi, gorevler, havuz, istatistik, kuyruk, onbellek, oturum, sayaclar
+from .models import ArsivMesaj, Etiket, Kategori, Mesaj
+
+_BOS = object()
+
+# İstatistik özetlerini etkileyen alanlar (etiketler m2m_changed ile izlenir)
+_ISTATISTIK_ALANLARI = {'tarih', 'icerik', 'icerik_uzunlugu', 'yazar', 'kategori'}
+
+
+@receiver(post_save, sender=Mesaj)
+@kuyruk.toplu()
+def mesaj_kaydedildi(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Fixture yüklemesinde (raw) indeks ve sayaçlar, yeniden oluşturma komutlarıyla güncellenir
+    if raw:
+        return
+    # Sayaçlar yazan işlemin içinde F() farkıyla güncellenir; arama indeksi, id
+    # havuzları ve beslemeler arka plan görevleriyle (bkz. gorevler.py). Burada
+    # veritabanı ve önbellek okunmaz, görevler eklenir ve önbellek sürümleri artırılır
+    kategori_farkli, eski_kategori_id = kategori_degisimi(instance, created)
+    if created or kategori_farkli:
+        sayaclar.kategori_sayacini_degistir(eski_kategori_id, -1)
+        sayaclar.kategori_sayacini_degistir(instance.kategori_id, 1)
+        onbellek.gecersiz_kil('kategoriler')
+        # Eski kapsamın havuzundaki id seçimde atlanır
+        gorevler.havuza_eklensin(instance.pk, *([havuz.TUM] if created else []), havuz.kapsam(instance.kategori_id))
+    onbellek.mesaj_degisti(instance, kategori_idleri=[eski_kategori_id])
+    gorevler.beslemeler_guncellensin(
+        *beslemeler.gorev_anahtarlari(instance.pk, [instance.kategori_id, eski_kategori_id])
+    )
+    if not created:
+        # Yeni mesajın etiketleri m2m_changed ile gelir
+        gorevler.etiket_kapsamlari_guncellensin(instance.pk)
+    if update_fields is None or _ISTATISTIK_ALANLARI & set(update_fields):
+        gorevler.istatistik_guncellensin(*istatistik_gunleri(instance))
+    if update_fields is not None and not {'baslik', 'icerik'} & set(update_fields):
+        return
+    gorevler.mesaj_indekslensin(instance.pk)
+
+
+def kategori_degisimi(mesaj, created):
+    """Mesajın kategorisinin değişip değişmediğini bulur, (değişti_mi, eski_kategori_id) döndürür"""
+    if 'kategori_id' not in mesaj.__dict__:
+        return False, None
+    yeni = mesaj.kategori_id
+    eski = None if created else getattr(mesaj, '_kayitli_kategori_id', _BOS)
+    if eski is _BOS:
+        # Veritabanından yüklenmemiş bir nesne güncellendi; önceki değer bilinmiyor
+        return False, None
+    mesaj._kayitli_kategori_id = yeni
+    if eski == yeni:
+        return False, None
+    return True, eski
+
+
+def istatistik_gunleri(mesaj):
+    """Mesajın sayıldığı gün; tarihi değiştiyse önceki gün de"""
+    gunler = {istatistik.tarihin_gunu(mesaj.tarih)}
+    eski = mesaj.__dict__.get('_kayitli_tarih')
+    if eski is not None and eski != mesaj.tarih:
+        gunler.add(istatistik.tarihin_gunu(eski))
+    mesaj._kayitli_tarih = mesaj.tarih
+    return gunler
+
+
+@receiver(pre_delete, sender=Mesaj)
+def mesaj_silinecek(sender, instance, **kwargs):
+    # Bağlantı tablosu satırları m2m_changed göndermeden silinir, önceden alınır
+    instance._silinen_etiket_idleri = sayaclar.bagli_etiket_idleri(instance.pk)
+
+
+@receiver(post_delete, sender=Mesaj)
+@kuyruk.toplu()
+def mesaj_silindi(sender, instance, **kwargs):
+    etiket_idleri = getattr(instance, '_silinen_etiket_idleri', [])
+    kategori_id = getattr(instance, '_kayitli_kategori_id', instance.kategori_id)
+    # Silinen mesajın indeks kaydı yeniden indekslemede çıkarılır
+    gorevler.mesaj_indekslensin(instance.pk)
+    sayaclar.kategori_sayacini_degistir(kategori_id, -1)
+    sayaclar.etiket_sayaclarini_degistir(etiket_idleri, -1)
+    onbellek.gecersiz_kil('kategoriler')
+    onbellek.mesaj_degisti(instance, etiket_idleri=etiket_idleri)
+    gorevler.istatistik_guncellensin(istatistik.tarihin_gunu(getattr(instance, '_kayitli_tarih', instance.tarih)))
+    gorevler.beslemeler_guncellensin(*beslemeler.gorev_anahtarlari(instance.pk, [kategori_id], etiket_idleri))
+
+
+@receiver(m2m_changed, sender=Mesaj.etiketler.through)
+@kuyruk.toplu()
+def etiketler_degisti(sender, instance, action, reverse, pk_set, **kwargs):
+    """Etiket sayaçlarını yalnızca gerçekten eklenen/çıkarılan bağlantılar kadar değiştirir.
+
+    post_add'de pk_set zaten yalnızca yeni bağlantıları içerir; remove ve
+    clear için mevcut bağlantılar işlemden önce okunur.
+    """
+    if action in ('pre_remove', 'pre_clear'):
+        instance._etiket_bag_oncesi = _mevcut_baglantilar(instance, reverse, pk_set)
+        return
+    if action == 'post_add':
+        degisen, fark = pk_set, 1
+    elif action in ('post_remove', 'post_clear'):
+        degisen, fark = instance.__dict__.pop('_etiket_bag_oncesi', []), -1
+    else:
+        return
+    if not degisen:
+        return
+    if reverse:
+        # etiket.mesajlar.add(...): pk_set mesaj id'leridir
+        sayaclar.etiket_sayaclarini_degistir([instance.pk], fark * len(degisen))
+        anahtarlar, gunler = set(), set()
+        for mesaj in Mesaj.objects.filter(pk__in=degisen).only('pk', 'kategori_id', 'tarih'):
+            onbellek.mesaj_degisti(mesaj, etiket_idleri=[instance.pk])
+            anahtarlar.update(beslemeler.gorev_anahtarlari(mesaj.pk, [mesaj.kategori_id], [instance.pk]))
+            gunler.add(istatistik.tarihin_gunu(mesaj.tarih))
+        gorevler.beslemeler_guncellensin(*anahtarlar)
+        gorevler.istatistik_guncellensin(*gunler)
+    else:
+        sayaclar.etiket_sayaclarini_degistir(degisen, fark)
+        onbellek.mesaj_degisti(instance, etiket_idleri=degisen)
+        # Girdilerde etiketler de yazılı olduğu için genel ve kategori beslemeleri de etkilenir
+        gorevler.beslemeler_guncellensin(
+            *beslemeler.gorev_anahtarlari(instance.pk, [instance.kategori_id], degisen)
+        )
+        gorevler.istatistik_guncellensin(istatistik.tarihin_gunu(instance.tarih))
+
+
+def _mevcut_baglantilar(instance, reverse, pk_set):
+    baglantilar = sayaclar.EtiketBaglantisi.objects
+    if reverse:
+        baglantilar = baglantilar.filter(etiket_id=instance.pk)
+        alan = 'mesaj_id'
+    else:
+        baglantilar = baglantilar.filter(mesaj_id=instance.pk)
+        alan = 'etiket_id'
+    if pk_set is not None:
+        baglantilar = baglantilar.filter(**{f'{alan}__in': pk_set})
+    return list(baglantilar.values_list(alan, flat=True))
+
+
+@receiver(post_save, sender=Kategori)
+@receiver(post_delete, sender=Kategori)
+def kategori_degisti(sender, instance, raw=False, created=False, **kwargs):
+    if not raw:
+        onbellek.kategori_degisti(instance)
+    if not raw and not created:
+        # Diğer kapsamlardaki girdiler eski adı BESLEME_SURESI dolana kadar gösterebilir
+        gorevler.beslemeler_guncellensin(beslemeler.TUM, beslemeler.kapsam(kategori_id=instance.pk))
+
+
+@receiver(post_delete, sender=Kategori)
+def kategori_silindi(sender, instance, **kwargs):
+    # Mesajların kategorisi sinyalsiz bir UPDATE ile NULL yapılır; genel havuz değişmez
+    havuz.havuzlari_sil([instance.pk], genel=False, yeniden_kur=False)
+    # Arşivin ilişkileri kısıtsızdır; SET_NULL burada elle uygulanır
+    ArsivMesaj.objects.filter(kategori_id=instance.pk).update(kategori=None)
+
+
+@receiver(post_delete, sender=User)
+def kullanici_silindi(sender, instance, **kwargs):
+    # Sıcak tablodaki mesajlar CASCADE ile silinir; arşivdekiler de silinir
+    arsivdekiler = ArsivMesaj.objects.filter(yazar_id=instance.pk)
+    gunler = {istatistik.tarihin_gunu(tarih) for tarih in arsivdekiler.values_list('tarih', flat=True)}
+    arsivdekiler.delete()
+    gorevler.istatistik_guncellensin(*gunler)
+
+
+@receiver(post_save, sender=Etiket)
+@receiver(post_delete, sender=Etiket)
+def etiket_degisti(sender, instance, raw=False, created=False, **kwargs):
+    if not raw:
+        onbellek.etiket_degisti(instance)
+    if not raw and not created:
+        gorevler.beslemeler_guncellensin(beslemeler.TUM, beslemeler.kapsam(etiket_id=instance.pk))
+
+
+@receiver(post_save, sender=Etiket)
+def etiket_kaydedildi(sender, instance, raw=False, **kwargs):
+    if not raw:
+        # Diğer süreçler yeni sürümü görünce dizini kurar; kayıt o sırada görünür olmalı
+        transaction.on_commit(lambda: etiket_servisi.etiket_degisti(instance.pk, instance.isim))
+
+
+@receiver(post_delete, sender=Etiket)
+def etiket_silindi(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: etiket_servisi.etiket_degisti(pk))
+
+
+@receiver(user_logged_in)
+def giris_yapildi(sender, request, user, **kwargs):
+    if request is not None:
+        oturum.ipucu_degistir(request, user)
+
+
+@receiver(user_logged_out)
+def cikis_yapildi(sender, request, user, **kwargs):
+    if request is not None:
+        oturum.ipucu_degistir(request, None)
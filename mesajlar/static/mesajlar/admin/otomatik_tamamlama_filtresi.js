@@ -0,0 +1,15 @@
+'use strict';
+// Otomatik tamamlama filtresinde seçim yapılınca değişen parametreyle listeyi yeniden yükler
+{
+    const $ = django.jQuery;
+
+    $(document).on('change', '.otomatik-tamamlama-filtresi', function() {
+        const parametreler = new URLSearchParams(window.location.search);
+        parametreler.delete(this.dataset.parametre);
+        parametreler.delete('p');
+        if (this.value) {
+            parametreler.set(this.dataset.parametre, this.value);
+        }
+        window.location.search = parametreler.toString();
+    });
+}
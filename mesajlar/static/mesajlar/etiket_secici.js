@@ -0,0 +1,81 @@
+'use strict';
+// Etiket seçici: seçili etiketler rozet olarak gösterilir, yenileri yazarken sunucudaki
+// dizinden önerilir. Asıl <select multiple> gizlenir ve form onunla gönderilir.
+document.querySelectorAll('select[data-tamamla-url]').forEach(function(secim) {
+    const kutu = document.createElement('div');
+    kutu.className = 'etiket-secici position-relative';
+    const rozetler = document.createElement('div');
+    rozetler.className = 'mb-2';
+    const girdi = document.createElement('input');
+    girdi.type = 'text';
+    girdi.className = 'form-control';
+    girdi.placeholder = 'Etiket ara...';
+    girdi.autocomplete = 'off';
+    const oneriler = document.createElement('div');
+    oneriler.className = 'list-group';
+
+    secim.classList.add('d-none');
+    secim.after(kutu);
+    kutu.append(rozetler, girdi, oneriler);
+
+    function rozetleriCiz() {
+        rozetler.replaceChildren();
+        for (const secenek of secim.selectedOptions) {
+            const rozet = document.createElement('span');
+            rozet.className = 'badge bg-secondary me-1';
+            rozet.textContent = secenek.textContent + ' ×';
+            rozet.title = 'Kaldır';
+            rozet.addEventListener('click', function() {
+                secenek.remove();
+                rozetleriCiz();
+            });
+            rozetler.append(rozet);
+        }
+    }
+
+    function ekle(id, isim) {
+        let secenek = secim.querySelector('option[value="' + id + '"]');
+        if (!secenek) {
+            secenek = new Option(isim, id);
+            secim.add(secenek);
+        }
+        secenek.selected = true;
+        girdi.value = '';
+        oneriler.replaceChildren();
+        rozetleriCiz();
+    }
+
+    let bekleyen = null;
+    let istek = null;
+    girdi.addEventListener('input', function() {
+        clearTimeout(bekleyen);
+        const q = girdi.value.trim();
+        if (!q) {
+            oneriler.replaceChildren();
+            return;
+        }
+        bekleyen = setTimeout(function() {
+            if (istek) {
+                istek.abort();
+            }
+            istek = new AbortController();
+            const url = secim.dataset.tamamlaUrl + '?' + new URLSearchParams({q: q});
+            fetch(url, {signal: istek.signal})
+                .then(function(yanit) { return yanit.json(); })
+                .then(function(veri) {
+                    oneriler.replaceChildren();
+                    for (const etiket of veri.sonuclar) {
+                        const oge = document.createElement('button');
+                        oge.type = 'button';
+                        oge.className = 'list-group-item list-group-item-action';
+                        oge.textContent = etiket.isim;
+                        oge.addEventListener('click', function() { ekle(etiket.id, etiket.isim); });
+                        oneriler.append(oge);
+                    }
+                })
+                .catch(function() {});
+        }, 150);
+    });
+
+    rozetleriCiz();
+});
@@ -0,0 +1,25 @@
+'use strict';
+// Herkese açık sayfalar herkese aynı, anonim gezinme çubuğuyla gelir. Giriş ipucu
+// çerezi varsa kullanıcı menüsü ayrıca yüklenir ve data-oturum ile işaretli öğeler
+// gösterilir: data-oturum="" giriş yapmış herkese, data-oturum="<id>" yalnızca o kullanıcıya.
+(function() {
+    const menu = document.getElementById('oturum-menusu');
+    const ipucu = document.cookie.match(/(?:^|;\s*)giris=(\d+)/);
+    if (!menu || !menu.dataset.url || !ipucu) {
+        return;
+    }
+    document.querySelectorAll('[data-oturum]').forEach(function(oge) {
+        if (oge.dataset.oturum === '' || oge.dataset.oturum === ipucu[1]) {
+            oge.classList.remove('d-none');
+        }
+    });
+    fetch(menu.dataset.url, {credentials: 'same-origin'})
+        .then(function(yanit) {
+            return yanit.ok ? yanit.text() : null;
+        })
+        .then(function(html) {
+            if (html !== null) {
+                menu.innerHTML = html;
+            }
+        });
+})();
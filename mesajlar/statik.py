@@ -0,0 +1,251 @@
+"""Üretim için statik dosya hattı: içerik özetli adlar, küçültme, ön sıkıştırma ve sunum.
+
+`manage.py collectstatic` SikistirilmisManifestDepolama ile CSS'i küçültür,
+her dosyayı içerik özetli bir adla (style.3f2a9c1b.css) kopyalar ve
+sıkıştırılabilir dosyaların .gz (ve brotli kuruluysa .br) sürümlerini yazar.
+Özet küçültülmüş içerikten hesaplanır; adı değişmeyen dosyanın baytları da değişmez.
+StatikMiddleware bu dosyaları STATIC_ROOT'tan, istemcinin Accept-Encoding
+başlığına göre en küçük sürümüyle sunar. Özetli adlar içerik değişince
+değiştiği için süresiz (immutable) önbelleğe alınabilir; tarayıcı sayfa
+başına yeniden doğrulama isteği göndermez.
+"""
+import gzip
+import logging
+import mimetypes
+import os
+import re
+from email.utils import formatdate
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_http_date_safe
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+SIKISTIRILABILIR = ('.css', '.js', '.mjs', '.map', '.svg', '.json', '.txt', '.html', '.xml', '.ico', '.ttf', '.otf', '.eot')
+# Kazancın bu oranın altında kaldığı sıkıştırılmış sürümler yazılmaz
+EN_AZ_KAZANC = 0.95
+
+# Accept-Encoding'de öncelik sırası
+KODLAMALAR = (('br', '.br'), ('gzip', '.gz'))
+
+SURESIZ = 'public, max-age=31536000, immutable'
+KISA = 'public, max-age=60'
+
+_CSS_PARCASI = re.compile(
+    r'(?P<metin>"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')'
+    r'|(?P<yorum>/\*(?!!).*?\*/)'
+    r'|(?P<bosluk>\s+)',
+    re.DOTALL,
+)
+_CSS_AYRACLARI = set('{};:,>')
+
+
+def css_kucult(css):
+    """Yorumları ve gereksiz boşlukları atar; dizgelere ve /*! */ yorumlarına dokunmaz.
+
+    Boşluk yalnızca { } ; : , > işaretlerinin çevresinde tamamen silinir.
+    ':' öncesindeki boşluk korunur, çünkü "a :hover" ile "a:hover" farklı seçicilerdir.
+    """
+    cikti = []
+    son = ''
+    konum = 0
+    for eslesme in _CSS_PARCASI.finditer(css):
+        arada = css[konum:eslesme.start()]
+        if arada:
+            cikti.append(arada)
+            son = arada[-1]
+        konum = eslesme.end()
+        if eslesme.lastgroup == 'metin':
+            cikti.append(eslesme.group())
+            son = eslesme.group()[-1]
+        elif eslesme.lastgroup == 'bosluk':
+            sonraki = css[konum:konum + 1]
+            if son and son != ' ' and son not in _CSS_AYRACLARI and (
+                    sonraki not in _CSS_AYRACLARI or sonraki == ':'):
+                cikti.append(' ')
+                son = ' '
+    cikti.append(css[konum:])
+    return ''.join(cikti).replace(';}', '}').strip()
+
+
+def sikistir(veri):
+    """{uzantı: sıkıştırılmış veri}; yeterince küçülmeyen sürümler atlanır"""
+    surumler = {'.gz': gzip.compress(veri, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        surumler['.br'] = brotli.compress(veri, quality=11)
+    return {uzanti: sikisik for uzanti, sikisik in surumler.items() if len(sikisik) < len(veri) * EN_AZ_KAZANC}
+
+
+class _KucultenKaynak:
+    """Kaynak depolamayı sarar; CSS dosyalarını küçültülmüş olarak açar"""
+
+    def __init__(self, depo):
+        self.depo = depo
+
+    def open(self, ad, mode='rb'):
+        dosya = self.depo.open(ad, mode)
+        if not ad.endswith('.css'):
+            return dosya
+        with dosya:
+            veri = dosya.read()
+        kucuk = css_kucult(veri.decode('utf-8')).encode('utf-8')
+        return ContentFile(kucuk if len(kucuk) < len(veri) else veri, name=ad)
+
+
+class SikistirilmisManifestDepolama(ManifestStaticFilesStorage):
+    """CSS'i özetlemeden önce küçültür, özetli dosyaları ön sıkıştırır"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        # Özet ve URL değiştirme küçültülmüş içerik üzerinde yapılır
+        kaynaklar = {ad: (_KucultenKaynak(depo), yol) for ad, (depo, yol) in paths.items()}
+        yield from super().post_process(kaynaklar, dry_run, **options)
+        if dry_run:
+            return
+        # Sıkıştırılmış sürümler ayrıca bildirilmez; her dosya yukarıda bir kez bildirildi
+        for ad in sorted(set(self.hashed_files.values())):
+            if not ad.endswith(SIKISTIRILABILIR) or not self.exists(ad):
+                continue
+            with self.open(ad) as dosya:
+                veri = dosya.read()
+            for uzanti, sikisik in sikistir(veri).items():
+                self._yaz(ad + uzanti, sikisik)
+
+    def _yaz(self, ad, veri):
+        # FileSystemStorage var olan dosyanın üzerine yazmaz, yeni bir ad üretir
+        if self.exists(ad):
+            self.delete(ad)
+        self._save(ad, ContentFile(veri))
+
+
+# -- Sunum ------------------------------------------------------------------------
+
+class _Dosya:
+    __slots__ = ('yol', 'tur', 'degisme', 'surumler', 'suresiz')
+
+    def __init__(self, yol, tur, degisme, surumler, suresiz):
+        self.yol = yol
+        self.tur = tur
+        self.degisme = degisme
+        self.surumler = surumler
+        self.suresiz = suresiz
+
+
+def dosya_dizini(kok, ozetli_adlar):
+    """STATIC_ROOT altındaki dosyaları {göreli ad: _Dosya} olarak bir kez tarar"""
+    dizin = {}
+    uzantilar = tuple(uzanti for _, uzanti in KODLAMALAR)
+    for klasor, _, dosyalar in os.walk(kok):
+        for dosya_adi in dosyalar:
+            yol = os.path.join(klasor, dosya_adi)
+            if yol.endswith(uzantilar) and os.path.exists(yol[:-3]):
+                continue
+            ad = os.path.relpath(yol, kok).replace(os.sep, '/')
+            surumler = {kodlama: yol + uzanti for kodlama, uzanti in KODLAMALAR if os.path.exists(yol + uzanti)}
+            tur = mimetypes.guess_type(dosya_adi)[0] or 'application/octet-stream'
+            if tur.startswith('text/') or tur in ('application/javascript', 'image/svg+xml'):
+                tur += '; charset=utf-8'
+            dizin[ad] = _Dosya(yol, tur, int(os.stat(yol).st_mtime), surumler, ad in ozetli_adlar)
+    return dizin
+
+
+def _kabul_edilenler(request):
+    kodlamalar = set()
+    for parca in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        ad, _, parametre = parca.strip().partition(';')
+        try:
+            agirlik = float(parametre.replace(' ', '').removeprefix('q=') or 1)
+        except ValueError:
+            agirlik = 1
+        if agirlik > 0:
+            kodlamalar.add(ad.strip().lower())
+    return kodlamalar
+
+
+def _oku(yol):
+    with open(yol, 'rb') as dosya:
+        return dosya.read()
+
+
+class StatikMiddleware:
+    """STATIC_URL altındaki istekleri diğer middleware'lere ve görünümlere uğramadan sunar.
+
+    settings.MESAJ_STATIK_SUN kapalıysa (varsayılan olarak DEBUG'da) devre dışıdır;
+    geliştirmede dosyaları runserver sunar.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'MESAJ_STATIK_SUN', not settings.DEBUG):
+            raise MiddlewareNotUsed
+        if not settings.STATIC_ROOT or not os.path.isdir(settings.STATIC_ROOT):
+            logger.warning('STATIC_ROOT bulunamadı; önce `manage.py collectstatic` çalıştırılmalı.')
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.onek = '/' + settings.STATIC_URL.lstrip('/')
+        # collectstatic sonrası dosyalar değişmez; süreç başına bir kez taranır
+        ozetli = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        self.dizin = dosya_dizini(settings.STATIC_ROOT, ozetli)
+
+    def _bul(self, request):
+        if not request.path_info.startswith(self.onek) or request.method not in ('GET', 'HEAD'):
+            return None
+        return self.dizin.get(request.path_info[len(self.onek):])
+
+    def _sec(self, request, dosya):
+        """Değişmemişse None, aksi halde (kodlama, sunulacak dosyanın yolu)"""
+        degisme = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        if degisme is not None and dosya.degisme <= degisme:
+            return None
+        kabul = _kabul_edilenler(request)
+        kodlama = next((ad for ad, _ in KODLAMALAR if ad in dosya.surumler and ad in kabul), None)
+        return kodlama, dosya.surumler[kodlama] if kodlama else dosya.yol
+
+    def _basliklar(self, response, dosya, kodlama=None):
+        if kodlama:
+            response['Content-Encoding'] = kodlama
+        response['Last-Modified'] = formatdate(dosya.degisme, usegmt=True)
+        response['Cache-Control'] = SURESIZ if dosya.suresiz else KISA
+        if dosya.surumler:
+            response['Vary'] = 'Accept-Encoding'
+        return response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        dosya = self._bul(request)
+        if dosya is None:
+            return self.get_response(request)
+        secim = self._sec(request, dosya)
+        if secim is None:
+            return self._basliklar(HttpResponseNotModified(), dosya)
+        kodlama, yol = secim
+        response = FileResponse(open(yol, 'rb'), content_type=dosya.tur)
+        # FileResponse dosya adını (.gz dahil) ekler; dosya sayfada kullanılır, indirilmez
+        del response['Content-Disposition']
+        return self._basliklar(response, dosya, kodlama)
+
+    async def __acall__(self, request):
+        dosya = self._bul(request)
+        if dosya is None:
+            return await self.get_response(request)
+        secim = self._sec(request, dosya)
+        if secim is None:
+            return self._basliklar(HttpResponseNotModified(), dosya)
+        kodlama, yol = secim
+        # Statik dosyalar küçüktür; olay döngüsü bloklanmasın diye iş parçacığında okunur
+        response = HttpResponse(await sync_to_async(_oku)(yol), content_type=dosya.tur)
+        return self._basliklar(response, dosya, kodlama)
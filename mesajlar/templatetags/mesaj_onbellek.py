@@ -0,0 +1,51 @@
+from django import template
+
+from mesajlar import kartlar, oturum
+from mesajlar.onbellek import parca as onbellekli_parca
+
+register = template.Library()
+
+
+class ParcaNode(template.Node):
+    def __init__(self, nodelist, ad, anahtarlar):
+        self.nodelist = nodelist
+        self.ad = ad
+        self.anahtarlar = anahtarlar
+
+    def render(self, context):
+        return onbellekli_parca(
+            self.ad.resolve(context),
+            [anahtar.resolve(context) for anahtar in self.anahtarlar],
+            lambda: self.nodelist.render(context),
+        )
+
+
+@register.tag
+def parca(parser, token):
+    """Şablon parçasını sürümlü anahtarla önbelleğe alır.
+
+    Kullanım: {% parca 'mesaj_karti' mesaj.kart_anahtari %} ... {% endparca %}
+    Anahtarlar, görünümde onbellek modülünün ürettiği sürüm imzalarını içermelidir.
+    """
+    bitler = token.split_contents()
+    if len(bitler) < 3:
+        raise template.TemplateSyntaxError(f"'{bitler[0]}' en az bir ad ve bir anahtar bekler.")
+    nodelist = parser.parse(('endparca',))
+    parser.delete_first_token()
+    return ParcaNode(nodelist, parser.compile_filter(bitler[1]), [parser.compile_filter(b) for b in bitler[2:]])
+
+
+@register.simple_tag(takes_context=True)
+def mesaj_karti(context, mesaj):
+    """Paylaşılan mesaj kartı; kart_anahtari varsa önbellekten gelir. Bkz. mesajlar/kartlar.py"""
+    # Parça şablonu ve URL kalıpları sayfa işlenirken bir kez hazırlanır ({% include %} gibi)
+    hazir = context.render_context.get(kartlar.KART_SABLONU)
+    if hazir is None:
+        hazir = context.render_context[kartlar.KART_SABLONU] = kartlar.kart_hazirligi()
+    return kartlar.kart_html(mesaj, *hazir)
+
+
+@register.simple_tag(takes_context=True)
+def oturum_menusu(context):
+    """Gezinme çubuğunun giriş durumuna bağlı kısmı. Bkz. mesajlar/oturum.py"""
+    return oturum.menu_html(context['user'])
@@ -0,0 +1,989 @@
+import gzip
+import hashlib
+import importlib
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.urls import clear_url_caches, reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from motivasyon import urls as motivasyon_urls
+
+from . import (
+    arama, arsiv, beslemeler, havuz, indeks_denetimi, istatistik, kartlar, kuyruk, replika, statik, urls,
+    views_async,
+)
+from .aktarim import IceAktarici
+from .models import ArsivMesaj, Etiket, Gorev, Kategori, Mesaj
+from .sayfalama import keyset_sayfala
+
+# Testler DEBUG=False çalışır; manifest depolaması collectstatic olmadan şablonları işleyemez
+OZETSIZ_STATIK = override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+
+
+@OZETSIZ_STATIK
+class ListeSorguSayisiTesti(TestCase):
+    """Liste görünümlerinin sorgu sayısı satır ve etiket sayısından bağımsız olmalı (N+1 yok)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.yazarlar = [User.objects.create_user(f'yazar{i}') for i in range(3)]
+        cls.kategori = Kategori.objects.create(isim='Azim')
+        cls.etiketler = [Etiket.objects.create(isim=f'etiket{i}') for i in range(5)]
+
+    def setUp(self):
+        # Anonim GET'ler sayfa önbelleğine girer; her ölçümde görünüm çalışmalı
+        cache.clear()
+
+    def mesaj_ekle(self, sayi, etiket_sayisi):
+        simdi = timezone.now()
+        for i in range(sayi):
+            mesaj = Mesaj.objects.create(
+                baslik=f'Mesaj {i}', icerik='kelime ' * 40, kategori=self.kategori,
+                yazar=self.yazarlar[i % len(self.yazarlar)], tarih=simdi - timedelta(minutes=i),
+            )
+            mesaj.etiketler.add(*self.etiketler[:etiket_sayisi])
+
+    def sorgu_sayisi(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as sorgular:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(sorgular)
+
+    def sabit_kalmali(self, url):
+        self.mesaj_ekle(2, etiket_sayisi=1)
+        beklenen = self.sorgu_sayisi(url)
+        self.mesaj_ekle(30, etiket_sayisi=5)
+        cache.clear()
+        with self.assertNumQueries(beklenen):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['mesajlar']), 12)
+
+    def test_mesaj_listesi(self):
+        self.sabit_kalmali(reverse('mesaj_listesi'))
+
+    def test_kategori_mesajlari(self):
+        self.sabit_kalmali(reverse('kategori_mesajlari', args=[self.kategori.pk]))
+
+    def test_etiket_mesajlari(self):
+        self.sabit_kalmali(reverse('etiket_mesajlari', args=[self.etiketler[0].pk]))
+
+
+class IceAktarimTesti(TestCase):
+    satirlar = [
+        {'baslik': 'Bir', 'icerik': 'Birinci mesaj', 'yazar': 'ayse'},
+        {'baslik': 'İki', 'icerik': 'İkinci mesaj', 'yazar': 'olmayan'},
+        {'baslik': '', 'icerik': 'Başlıksız', 'yazar': 'ayse'},
+        {'baslik': 'Dört', 'icerik': 'Dördüncü mesaj', 'yazar': 'ayse', 'etiketler': ['azim']},
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user('ayse')
+
+    def test_hatalar_satir_numarasini_korur(self):
+        aktarici = IceAktarici(parti_boyutu=10).calistir(self.satirlar)
+        self.assertEqual([satir for satir, _ in aktarici.hatalar], [2, 3])
+        self.assertIn("'olmayan'", aktarici.hatalar[0][1])
+        self.assertEqual(aktarici.yazilan, 2)
+        self.assertEqual(Mesaj.objects.count(), 2)
+
+    def test_kuru_calisma_ayni_hatalari_bulur(self):
+        kuru = IceAktarici(parti_boyutu=10, kuru_calisma=True).calistir(self.satirlar)
+        gercek = IceAktarici(parti_boyutu=10).calistir(self.satirlar)
+        self.assertEqual(kuru.hatalar, gercek.hatalar)
+        self.assertEqual(kuru.yazilan, 0)
+
+    def test_sayaclar_parti_isleminde_guncellenir(self):
+        etiket = Etiket.objects.create(isim='azim')
+        Mesaj.objects.create(baslik='Var olan', icerik='içerik', yazar=User.objects.get()).etiketler.add(etiket)
+        IceAktarici(parti_boyutu=10).calistir(self.satirlar)
+        etiket.refresh_from_db()
+        self.assertEqual(etiket.mesaj_sayisi, 2)
+
+
+class IndeksKullanimiTesti(TestCase):
+    """Sık çalışan sorgular indeks kullanmayı bırakırsa (indeks silindi, sorgu değişti) test düşer"""
+
+    def test_sicak_sorgular_indeks_kullanir(self):
+        if connection.vendor not in indeks_denetimi.DESTEKLENEN:
+            self.skipTest(f'{connection.vendor} için plan denetimi tanımlı değil')
+        for ad, queryset, siralama_serbest in indeks_denetimi.sicak_sorgular():
+            with self.subTest(ad):
+                plan = indeks_denetimi.plan(queryset)
+                self.assertEqual(indeks_denetimi.sorunlar(plan, siralama_serbest), [], plan)
+
+
+def gorevleri_isle():
+    while kuyruk.bir_parti_isle():
+        pass
+
+
+@mock.patch.object(havuz, 'PARCA_BOYUTU', 2)
+class HavuzTesti(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.yazar = User.objects.create_user('yazar')
+        cls.kategori = Kategori.objects.create(isim='Azim')
+
+    def setUp(self):
+        cache.clear()
+
+    def mesajlar(self, sayi, **kwargs):
+        return [Mesaj.objects.create(baslik=f'Mesaj {i}', icerik='içerik', yazar=self.yazar, **kwargs)
+                for i in range(sayi)]
+
+    def havuzdakiler(self, ad):
+        boy = cache.get(havuz._boy_anahtari(ad))
+        return [pk for no in range(havuz._parca_sayisi(boy)) for pk in cache.get(havuz._parca_anahtari(ad, no))]
+
+    def test_yeni_mesajlar_havuzun_sonuna_eklenir(self):
+        eski = self.mesajlar(3)
+        havuz.kur(havuz.TUM)
+        havuz.kur(havuz.kapsam(self.kategori.pk))
+        yeni = self.mesajlar(2, kategori=self.kategori)
+        gorevleri_isle()
+        self.assertEqual(self.havuzdakiler(havuz.TUM), [m.pk for m in eski + yeni])
+        self.assertEqual(self.havuzdakiler(havuz.kapsam(self.kategori.pk)), [m.pk for m in yeni])
+
+    def test_secim_yalnizca_bir_parca_okur(self):
+        self.mesajlar(7)
+        havuz.kur(havuz.TUM)
+        onbellek = havuz.onbellek()
+        okunan, asil = [], onbellek.get
+
+        def get(anahtar, *args, **kwargs):
+            okunan.append(anahtar)
+            return asil(anahtar, *args, **kwargs)
+
+        with mock.patch.object(onbellek, 'get', side_effect=get), self.assertNumQueries(1):
+            self.assertIsNotNone(havuz.rastgele_mesaj())
+        self.assertEqual(len(okunan), 2)
+        self.assertEqual(okunan[0], havuz._boy_anahtari(havuz.TUM))
+
+    def test_silinen_ve_tasinan_mesaj_secilmez(self):
+        mesajlar = self.mesajlar(4, kategori=self.kategori)
+        havuz.kur(havuz.TUM)
+        havuz.kur(havuz.kapsam(self.kategori.pk))
+        Mesaj.objects.filter(pk__in=[m.pk for m in mesajlar[:2]]).delete()
+        mesajlar[2].kategori = None
+        mesajlar[2].save()
+        for _ in range(20):
+            self.assertIn(havuz.rastgele_mesaj().pk, {mesajlar[2].pk, mesajlar[3].pk})
+            self.assertEqual(havuz.rastgele_mesaj(self.kategori.pk), mesajlar[3])
+
+    @OZETSIZ_STATIK
+    def test_okuma_istekleri_havuz_kurdurmaz(self):
+        self.mesajlar(3, kategori=self.kategori)
+        gorevleri_isle()
+        cache.clear()
+        for url in (reverse('gunun_mesaji'), reverse('rastgele_mesaj')):
+            for parametreler in ({}, {'kategori': self.kategori.pk}):
+                self.assertEqual(self.client.get(url, parametreler).status_code, 200)
+        self.assertFalse(Gorev.objects.exists())
+
+        # Kurulmamış havuza eklenecek mesaj gelince işçi havuzu kurdurur
+        self.mesajlar(1)
+        gorevleri_isle()
+        self.assertEqual(self.havuzdakiler(havuz.TUM), list(Mesaj.objects.order_by('pk').values_list('pk', flat=True)))
+
+
+class YazmaYoluTesti(TestCase):
+    """Mesaj yazan istekler görevleri tek INSERT ile ekler; ağır işler görevlerde yapılır"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.yazar = User.objects.create_user('yazar')
+        cls.kategori = Kategori.objects.create(isim='Azim')
+        cls.etiketler = [Etiket.objects.create(isim=f'etiket{i}') for i in range(5)]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.yazar)
+
+    def ekle(self, etiket_sayisi):
+        veri = {'baslik': 'Yeni', 'icerik': 'içerik', 'kategori': self.kategori.pk,
+                'etiketler': [e.pk for e in self.etiketler[:etiket_sayisi]]}
+        with CaptureQueriesContext(connection) as sorgular:
+            self.assertEqual(self.client.post(reverse('mesaj_ekle'), veri).status_code, 302)
+        gorev_yazmalari = [s for s in sorgular.captured_queries if 'INSERT' in s['sql'] and 'mesajlar_gorev' in s['sql']]
+        self.assertEqual(len(gorev_yazmalari), 1)
+        return len(sorgular)
+
+    def test_ekleme_sorgulari_etiket_sayisindan_bagimsiz(self):
+        self.assertEqual(self.ekle(1), self.ekle(5))
+
+    def test_duzenleme_beslemeye_gorevde_yansir(self):
+        self.ekle(2)
+        mesaj = Mesaj.objects.get()
+        gorevleri_isle()
+        url = reverse('etiket_beslemesi', args=[self.etiketler[0].pk, 'rss'])
+        self.assertContains(self.client.get(url), 'Yeni')
+        self.client.post(reverse('mesaj_duzenle', args=[mesaj.pk]), {
+            'baslik': 'Düzeltilmiş', 'icerik': 'içerik', 'kategori': self.kategori.pk,
+            'etiketler': [self.etiketler[0].pk],
+        })
+        gorevleri_isle()
+        self.assertContains(self.client.get(url), 'Düzeltilmiş')
+
+
+class SayacTesti(TestCase):
+    """Sayaçlar yazan işlemde F() farkıyla güncellenir; görev işçisini beklemez"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.yazar = User.objects.create_user('yazar')
+        cls.kategoriler = [Kategori.objects.create(isim=f'Kategori {i}') for i in range(2)]
+        cls.etiketler = [Etiket.objects.create(isim=f'etiket{i}') for i in range(2)]
+
+    def sayilar(self):
+        return (
+            list(Kategori.objects.order_by('pk').values_list('mesaj_sayisi', flat=True)),
+            list(Etiket.objects.order_by('pk').values_list('mesaj_sayisi', flat=True)),
+        )
+
+    def test_sayaclar_islemde_tam_kalir(self):
+        birinci, ikinci = self.kategoriler
+        mesaj = Mesaj.objects.create(baslik='Bir', icerik='içerik', yazar=self.yazar, kategori=birinci)
+        mesaj.etiketler.add(*self.etiketler)
+        diger = Mesaj.objects.create(baslik='İki', icerik='içerik', yazar=self.yazar, kategori=birinci)
+        self.etiketler[0].mesajlar.add(diger)
+        self.assertEqual(self.sayilar(), ([2, 0], [2, 1]))
+
+        mesaj.kategori = ikinci
+        mesaj.save()
+        mesaj.etiketler.remove(self.etiketler[1])
+        self.assertEqual(self.sayilar(), ([1, 1], [2, 0]))
+
+        diger.delete()
+        self.assertEqual(self.sayilar(), ([0, 1], [1, 0]))
+        self.assertFalse(Gorev.objects.filter(tur__in=['kategori_sayaci', 'etiket_sayaci']).exists())
+
+    def test_onarim_sayaclari_bastan_hesaplar(self):
+        Mesaj.objects.create(baslik='Bir', icerik='içerik', yazar=self.yazar, kategori=self.kategoriler[0])
+        Kategori.objects.update(mesaj_sayisi=7)
+        call_command('mesaj_sayaclari', '--kuyruk', stdout=StringIO())
+        gorevleri_isle()
+        self.assertEqual(self.sayilar()[0], [1, 0])
+
+
+class AramaTesti(TestCase):
+    """Arama indeksi kuyruktaki görevlerle güncellenir"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.yazar = User.objects.create_user('yazar')
+
+    def bulunanlar(self, sorgu):
+        return list(arama.arama_motoru().filtrele(Mesaj.objects.all(), sorgu).values_list('pk', flat=True))
+
+    def test_motor_arayuzu_eksik_birakilamaz(self):
+        with self.assertRaises(TypeError):
+            arama.AramaMotoru()
+
+    def test_kaydedilen_mesaj_gorevden_sonra_bulunur(self):
+        mesaj = Mesaj.objects.create(baslik='Başarılı sabah', icerik='Güne erken başla', yazar=self.yazar)
+        gorevleri_isle()
+        self.assertEqual(self.bulunanlar('başarı'), [mesaj.pk])
+
+        mesaj.baslik = 'Sakin akşam'
+        mesaj.save()
+        gorevleri_isle()
+        self.assertEqual(self.bulunanlar('başarı'), [])
+        self.assertEqual(self.bulunanlar('aksam'), [mesaj.pk])
+
+
+class ArsivTesti(TestCase):
+    databases = {'default', arsiv.ARSIV_VERITABANI}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.yazar = User.objects.create_user('yazar')
+        cls.kategori = Kategori.objects.create(isim='Azim')
+        cls.etiket = Etiket.objects.create(isim='sabir')
+
+    def test_sicak_tabloda_olan_mesaj_geri_yuklenmez(self):
+        eski = timezone.now() - timedelta(days=arsiv.ARSIV_YASI + 1)
+        mesajlar = [Mesaj.objects.create(baslik=f'Mesaj {i}', icerik='içerik', yazar=self.yazar,
+                                         kategori=self.kategori, tarih=eski) for i in range(2)]
+        for mesaj in mesajlar:
+            mesaj.etiketler.add(self.etiket)
+        self.assertEqual(arsiv.arsivle(), 2)
+        # Sıcak taraftaki silmesi başarısız olmuş bir arşivleme
+        kalan = Mesaj.objects.create(pk=mesajlar[0].pk, baslik='Sıcak kopya', icerik='içerik', yazar=self.yazar,
+                                     kategori=self.kategori, tarih=eski)
+
+        self.assertEqual(arsiv.geri_yukle([m.pk for m in mesajlar]), (1, [kalan.pk]))
+        gorevleri_isle()
+        self.assertEqual(Mesaj.objects.get(pk=kalan.pk).baslik, 'Sıcak kopya')
+        self.assertEqual(list(ArsivMesaj.objects.values_list('pk', flat=True)), [kalan.pk])
+        self.kategori.refresh_from_db()
+        self.etiket.refresh_from_db()
+        self.assertEqual((self.kategori.mesaj_sayisi, self.etiket.mesaj_sayisi), (2, 1))
+
+    def test_geri_yuklenen_mesaj_guncellenmesini_korur(self):
+        eski = timezone.now() - timedelta(days=arsiv.ARSIV_YASI + 1)
+        mesaj = Mesaj.objects.create(baslik='Eski', icerik='içerik', yazar=self.yazar, tarih=eski)
+        Mesaj.objects.filter(pk=mesaj.pk).update(guncellenme=eski)
+        arsiv.arsivle()
+
+        with self.assertNumQueries(3):
+            arsivdeki = arsiv.mesaj_getir(mesaj.pk)
+            self.assertEqual(arsivdeki.yazar.username, 'yazar')
+
+        self.assertEqual(arsiv.geri_yukle([mesaj.pk]), (1, []))
+        with self.assertNumQueries(1):
+            geri_gelen = arsiv.mesaj_getir(mesaj.pk)
+            self.assertEqual(geri_gelen.yazar.username, 'yazar')
+        self.assertEqual(geri_gelen.guncellenme, eski)
+
+
+class BeslemeTesti(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        yazar = User.objects.create_user('yazar')
+        cls.mesajlar = [Mesaj.objects.create(baslik=f'Mesaj {i}', icerik='içerik', yazar=yazar) for i in range(3)]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_son_degisiklik_en_son_guncellenen_girdidir(self):
+        Mesaj.objects.filter(pk=self.mesajlar[0].pk).update(guncellenme=timezone.now() + timedelta(hours=1))
+        yanit = self.client.get(reverse('besleme', args=['rss']))
+        en_son = Mesaj.objects.get(pk=self.mesajlar[0].pk).guncellenme
+        self.assertEqual(yanit['Last-Modified'], http_date(int(en_son.timestamp())))
+
+    def test_etkilenenler_govdeleri_okumaz(self):
+        beslemeler.kur(beslemeler.TUM)
+        okunan, asil = [], beslemeler.onbellek().get_many
+
+        def get_many(anahtarlar, *args, **kwargs):
+            okunan.extend(anahtarlar)
+            return asil(anahtarlar, *args, **kwargs)
+
+        with mock.patch.object(beslemeler.onbellek(), 'get_many', side_effect=get_many):
+            etkilenen = beslemeler.etkilenen_kapsamlar([f'{beslemeler.TUM}@{self.mesajlar[1].pk}'])
+        self.assertEqual(etkilenen, [beslemeler.TUM])
+        self.assertEqual(okunan, [beslemeler._ozet_anahtari(beslemeler.TUM)])
+
+    def test_kurulu_besleme_kayittan_sonra_yenilenir(self):
+        kategoriler = [Kategori.objects.create(isim=f'Kategori {i}') for i in range(2)]
+        urller = [reverse('kategori_beslemesi', args=[k.pk, 'json']) for k in kategoriler]
+
+        def basliklar(url):
+            with self.assertNumQueries(0):
+                yanit = self.client.get(url)
+            return [girdi['title'] for girdi in json.loads(yanit.content)['items']]
+
+        for kategori in kategoriler:
+            beslemeler.kur(beslemeler.kapsam(kategori_id=kategori.pk))
+        etag = self.client.get(urller[0])['ETag']
+        mesaj = Mesaj.objects.create(baslik='Taze', icerik='içerik', yazar=self.mesajlar[0].yazar,
+                                     kategori=kategoriler[0])
+        gorevleri_isle()
+        self.assertEqual(basliklar(urller[0]), ['Taze'])
+        self.assertNotEqual(self.client.get(urller[0])['ETag'], etag)
+
+        mesaj.kategori = kategoriler[1]
+        mesaj.save()
+        gorevleri_isle()
+        self.assertEqual(basliklar(urller[0]), [])
+        self.assertEqual(basliklar(urller[1]), ['Taze'])
+
+        mesaj.delete()
+        gorevleri_isle()
+        self.assertEqual(basliklar(urller[1]), [])
+
+
+@OZETSIZ_STATIK
+class AkisTesti(TestCase):
+    """Büyük liste sayfaları önbelleğe girmeden akışla gönderilir; baş, sayfa sorgusundan önce gelir"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.yazar = User.objects.create_user('yazar')
+        cls.kategori = Kategori.objects.create(isim='Akış')
+        simdi = timezone.now()
+        # Aynı tarihli mesajlar da id ile sıralanır
+        Mesaj.objects.bulk_create([
+            Mesaj(baslik=f'Mesaj {i}', icerik='içerik', yazar=cls.yazar, kategori=cls.kategori,
+                  tarih=simdi - timedelta(minutes=i // 2))
+            for i in range(kartlar.AKIS_ESIGI + 5)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.yazar)
+
+    def parcalar(self, url):
+        """(ilk parça, kalan parçalar); ilk parça gelene kadar sayfa sorgusu çalışmamış olmalı"""
+        with CaptureQueriesContext(connection) as sorgular:
+            yanit = self.client.get(url)
+            self.assertTrue(yanit.streaming)
+            sayfa_sorgusu = lambda: [s for s in sorgular.captured_queries if 'ORDER BY "mesajlar_mesaj"."tarih"' in s['sql']]
+            parcalar = iter(yanit.streaming_content)
+            bas = next(parcalar).decode()
+            self.assertEqual(sayfa_sorgusu(), [])
+            kalan = [parca.decode() for parca in parcalar]
+            self.assertEqual(len(sayfa_sorgusu()), 1)
+        return bas, kalan
+
+    def test_bas_kartlardan_once_gelir(self):
+        bas, kalan = self.parcalar(f'/?boyut={kartlar.AKIS_ESIGI}')
+        self.assertIn('<head>', bas)
+        self.assertNotIn('card-title', bas)
+        self.assertGreater(len(kalan), 2)
+        govde = ''.join(kalan)
+        self.assertEqual(govde.count('card-title'), kartlar.AKIS_ESIGI)
+        self.assertIn('Daha Eski', govde)
+        self.assertTrue(govde.rstrip().endswith('</html>'))
+
+    def test_kategori_sayfasi_akista_sonraki_ve_onceki_sayfaya_gecer(self):
+        url = reverse('kategori_mesajlari', args=[self.kategori.pk])
+        sira = list(Mesaj.objects.order_by('-tarih', '-id').values_list('baslik', flat=True))
+        _, kalan = self.parcalar(f'{url}?boyut={kartlar.AKIS_ESIGI}')
+        sonraki = re.search(r'href="(\?[^"]*)"[^>]*>Daha Eski', ''.join(kalan)).group(1).replace('&amp;', '&')
+        _, kalan = self.parcalar(url + sonraki)
+        govde = ''.join(kalan)
+        self.assertEqual(re.findall(r'>(Mesaj \d+)<', govde), sira[kartlar.AKIS_ESIGI:])
+
+        # ?once= satırları ters sırada okur; sayfa yine yeniden eskiye gönderilir
+        onceki = re.search(r'href="(\?[^"]*)"[^>]*>&laquo; Daha Yeni', govde).group(1).replace('&amp;', '&')
+        _, kalan = self.parcalar(url + onceki)
+        self.assertEqual(re.findall(r'>(Mesaj \d+)<', ''.join(kalan)), sira[:kartlar.AKIS_ESIGI])
+
+
+@OZETSIZ_STATIK
+class ReplikaTesti(TestCase):
+    """Okuma görünümleri replikaya, yazmalar ve yazmadan sonraki okumalar birinciye gider"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.yazar = User.objects.create_user('yazar')
+        cls.kategori = Kategori.objects.create(isim='Azim')
+        cls.mesaj = Mesaj.objects.create(baslik='Bir', icerik='içerik', yazar=cls.yazar, kategori=cls.kategori)
+
+    def setUp(self):
+        cache.clear()
+        self.okumalar = []
+        secim = replika.ReplikaYonlendirici.db_for_read
+
+        def kaydet(yonlendirici, model, **hints):
+            # Testte replika bağlantısı yoktur: yönlendiricinin kararı kaydedilir, sorgu birinciye gider
+            self.okumalar.append((model._meta.label, secim(yonlendirici, model, **hints)))
+            return DEFAULT_DB_ALIAS
+
+        for yama in (mock.patch.object(replika, 'REPLIKALAR', {'replika1': 1}),
+                     mock.patch.object(replika.ReplikaYonlendirici, 'db_for_read', kaydet)):
+            yama.start()
+            self.addCleanup(yama.stop)
+
+    def okunan_veritabanlari(self, yanit_al):
+        self.okumalar.clear()
+        yanit = yanit_al()
+        return yanit, {db for label, db in self.okumalar if label.startswith('mesajlar.')}
+
+    def test_okuma_gorunumleri_replikadan_okur(self):
+        for url in (reverse('mesaj_listesi'), reverse('mesaj_detay', args=[self.mesaj.pk]),
+                    reverse('kategori_mesajlari', args=[self.kategori.pk])):
+            yanit, veritabanlari = self.okunan_veritabanlari(lambda: self.client.get(url))
+            self.assertEqual(yanit.status_code, 200)
+            self.assertEqual(veritabanlari, {'replika1'}, url)
+
+    def test_yazmalar_birinciye_gider_ve_cerez_birincide_tutar(self):
+        self.client.force_login(self.yazar)
+        istekler = [
+            lambda: self.client.post(reverse('mesaj_ekle'), {'baslik': 'Yeni', 'icerik': 'içerik',
+                                                            'kategori': self.kategori.pk}),
+            lambda: self.client.post(reverse('kategori_duzenle', args=[self.kategori.pk]), {'isim': 'Sabır'}),
+        ]
+        for istek in istekler:
+            yanit, veritabanlari = self.okunan_veritabanlari(istek)
+            self.assertEqual(yanit.status_code, 302)
+            self.assertEqual(veritabanlari, {DEFAULT_DB_ALIAS})
+            self.assertEqual(yanit.cookies[replika.YAZMA_CEREZI]['max-age'], replika.YAZMA_SURESI)
+        self.assertTrue(Mesaj.objects.filter(baslik='Yeni').exists())
+        self.assertEqual(Kategori.objects.get().isim, 'Sabır')
+
+        # Çerez süresince yazan kullanıcının okumaları birinciden yapılır
+        _, veritabanlari = self.okunan_veritabanlari(lambda: self.client.get(reverse('mesaj_listesi')))
+        self.assertEqual(veritabanlari, {DEFAULT_DB_ALIAS})
+
+        # Süre dolup çerez düşünce replikaya dönülür
+        del self.client.cookies[replika.YAZMA_CEREZI]
+        _, veritabanlari = self.okunan_veritabanlari(lambda: self.client.get(reverse('mesaj_listesi')))
+        self.assertEqual(veritabanlari, {'replika1'})
+
+
+@OZETSIZ_STATIK
+class AsenkronGorunumTesti(TestCase):
+    """MESAJ_ASYNC_GORUNUMLER açıkken okuma yolları views_async'e gider ve ASGI altında çalışır"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.yazar = User.objects.create_user('yazar')
+        cls.kategori = Kategori.objects.create(isim='Azim')
+        eski = timezone.now() - timedelta(days=arsiv.ARSIV_YASI + 1)
+        cls.arsivdeki = Mesaj.objects.create(baslik='Arşivdeki', icerik='içerik', yazar=cls.yazar, tarih=eski)
+        cls.mesajlar = [Mesaj.objects.create(baslik=f'Mesaj {i}', icerik='içerik', yazar=cls.yazar,
+                                             kategori=cls.kategori) for i in range(kartlar.AKIS_ESIGI + 2)]
+        arsiv.arsivle()
+
+    def setUp(self):
+        cache.clear()
+        with override_settings(MESAJ_ASYNC_GORUNUMLER=True):
+            self.url_yukle()
+        self.addCleanup(self.url_yukle)
+
+    def url_yukle(self):
+        # Kök URL yapılandırması include() ile mesajlar.urls'in çözücüsünü tutar
+        importlib.reload(urls)
+        importlib.reload(motivasyon_urls)
+        clear_url_caches()
+
+    async def test_liste_ve_kategori_sayfasi(self):
+        yanit = await self.async_client.get(reverse('mesaj_listesi'))
+        self.assertIs(yanit.resolver_match.func, views_async.mesaj_listesi)
+        self.assertContains(yanit, self.mesajlar[-1].baslik)
+        self.assertContains(yanit, 'Daha Eski')
+
+        yanit = await self.async_client.get(reverse('kategori_mesajlari', args=[self.kategori.pk]))
+        self.assertIs(yanit.resolver_match.func, views_async.kategori_mesajlari)
+        self.assertContains(yanit, 'Azim')
+
+    async def test_buyuk_liste_akisla_gonderilir(self):
+        yanit = await self.async_client.get(f'{reverse("mesaj_listesi")}?boyut={kartlar.AKIS_ESIGI}')
+        self.assertTrue(yanit.streaming)
+        parcalar = [parca.decode() async for parca in yanit.streaming_content]
+        self.assertNotIn('card-title', parcalar[0])
+        self.assertEqual(''.join(parcalar).count('card-title'), kartlar.AKIS_ESIGI)
+
+    async def test_detay_arsive_duser(self):
+        yanit = await self.async_client.get(reverse('mesaj_detay', args=[self.mesajlar[0].pk]))
+        self.assertIs(yanit.resolver_match.func, views_async.mesaj_detay)
+        self.assertContains(yanit, 'Mesaj 0')
+
+        yanit = await self.async_client.get(reverse('mesaj_detay', args=[self.arsivdeki.pk]))
+        self.assertContains(yanit, 'Arşivdeki')
+        yanit = await self.async_client.get(reverse('mesaj_detay', args=[self.arsivdeki.pk + 1000]))
+        self.assertEqual(yanit.status_code, 404)
+
+    async def test_ndjson_disa_aktarim(self):
+        yanit = await self.async_client.get(reverse('api_mesajlar_disa_aktar'))
+        self.assertIs(yanit.resolver_match.func, views_async.mesajlar_disa_aktar)
+        satirlar = [json.loads(satir) for parca in [p async for p in yanit.streaming_content]
+                    for satir in parca.decode().splitlines()]
+        self.assertEqual([s['baslik'] for s in satirlar], [m.baslik for m in self.mesajlar])
+
+
+@OZETSIZ_STATIK
+class KosulluGetTesti(TestCase):
+    """Değişmemiş sayfalar ETag/Last-Modified ile 304 döner; yazmalardan sonra doğrulayıcı değişir"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.yazar = User.objects.create_user('yazar')
+        cls.kategori = Kategori.objects.create(isim='Azim')
+        cls.mesaj = Mesaj.objects.create(baslik='Bir', icerik='içerik', yazar=cls.yazar, kategori=cls.kategori)
+
+    def setUp(self):
+        cache.clear()
+
+    def dogrulayicilar(self, url):
+        yanit = self.client.get(url)
+        self.assertEqual(yanit.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=yanit['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=yanit['Last-Modified']).status_code, 304)
+        return yanit['ETag'], yanit['Last-Modified']
+
+    def test_mesaj_duzenlenince_etag_degisir(self):
+        url = reverse('mesaj_detay', args=[self.mesaj.pk])
+        etag, _ = self.dogrulayicilar(url)
+        self.mesaj.baslik = 'Düzeltilmiş'
+        self.mesaj.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertNotEqual(self.dogrulayicilar(url)[0], etag)
+
+    def test_listeler_kategori_adi_degisince_yenilenir(self):
+        urller = [reverse('mesaj_listesi'), reverse('kategori_mesajlari', args=[self.kategori.pk])]
+        oncekiler = {url: self.dogrulayicilar(url) for url in urller}
+        with mock.patch('time.time', return_value=time.time() + 5):
+            self.kategori.isim = 'Sabır'
+            self.kategori.save()
+        for url, (etag, son_degisiklik) in oncekiler.items():
+            yanit = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertContains(yanit, 'Sabır')
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=son_degisiklik).status_code, 200)
+            self.assertNotEqual(self.dogrulayicilar(url), (etag, son_degisiklik))
+
+
+class StatikDosyaTesti(TestCase):
+    """collectstatic küçültülmüş içeriği özetler; StatikMiddleware en küçük sürümü sunar"""
+
+    def setUp(self):
+        kok = tempfile.TemporaryDirectory()
+        self.addCleanup(kok.cleanup)
+        ayar = override_settings(STATIC_ROOT=kok.name, MESAJ_STATIK_SUN=True, STORAGES={
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'mesajlar.statik.SikistirilmisManifestDepolama'},
+        })
+        ayar.enable()
+        self.addCleanup(ayar.disable)
+        self.cikti = StringIO()
+        call_command('collectstatic', interactive=False, stdout=self.cikti)
+        self.kok = kok.name
+        with open(os.path.join(self.kok, 'staticfiles.json')) as dosya:
+            self.adlar = json.load(dosya)['paths']
+
+    def test_ozet_sunulan_kucuk_icerikten_hesaplanir(self):
+        ozetli = self.adlar['mesajlar/css/style.css']
+        with open(os.path.join(self.kok, ozetli), 'rb') as dosya:
+            veri = dosya.read()
+        with open(settings.BASE_DIR / 'mesajlar/static/mesajlar/css/style.css', encoding='utf-8') as kaynak:
+            self.assertEqual(veri.decode(), statik.css_kucult(kaynak.read()))
+        self.assertEqual(ozetli.split('.')[-2], hashlib.md5(veri).hexdigest()[:12])
+        with open(os.path.join(self.kok, ozetli + '.gz'), 'rb') as dosya:
+            self.assertEqual(gzip.decompress(dosya.read()), veri)
+
+    def test_her_dosya_bir_kez_bildirilir(self):
+        self.assertIn(f'{len(self.adlar)} post-processed', self.cikti.getvalue())
+
+    def test_middleware_kodlamaya_ve_ada_gore_sunar(self):
+        url = settings.STATIC_URL + self.adlar['mesajlar/css/style.css']
+        yanit = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+        self.assertEqual(yanit['Content-Encoding'], 'gzip')
+        self.assertEqual(yanit['Cache-Control'], statik.SURESIZ)
+        self.assertEqual(yanit['Vary'], 'Accept-Encoding')
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=yanit['Last-Modified']).status_code, 304)
+
+        yanit = self.client.get(url)
+        self.assertFalse(yanit.has_header('Content-Encoding'))
+        with open(os.path.join(self.kok, self.adlar['mesajlar/css/style.css']), 'rb') as dosya:
+            self.assertEqual(b''.join(yanit.streaming_content), dosya.read())
+
+        yanit = self.client.get(settings.STATIC_URL + 'mesajlar/css/style.css')
+        self.assertEqual(yanit['Cache-Control'], statik.KISA)
+
+
+@OZETSIZ_STATIK
+class HizSiniriTesti(TestCase):
+    """Boşalan istemci kovası 429 ve Retry-After döndürür; genel kova boşsa hafif moda geçilir"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.yazar = User.objects.create_user('yazar')
+        Mesaj.objects.create(baslik='Azim', icerik='Azimle çalışan kazanır', yazar=cls.yazar)
+
+    def setUp(self):
+        cache.clear()
+
+    def aramalar(self, sayi, url=None):
+        url = url or reverse('mesaj_listesi')
+        return [self.client.get(url, {'arama': f'azim {i}'}) for i in range(sayi)]
+
+    @override_settings(MESAJ_HIZ_SINIRLARI={'mesaj_listesi': {'parametre': 'arama', 'ip': '2/m'},
+                                            'api_mesajlar': {'parametre': 'arama', 'ip': '1/m'}})
+    def test_bos_kova_429_ve_retry_after_dondurur(self):
+        yanitlar = self.aramalar(3)
+        self.assertEqual([y.status_code for y in yanitlar], [200, 200, 429])
+        self.assertGreaterEqual(int(yanitlar[-1]['Retry-After']), 1)
+        # Oturum çerezi olmayan istemcinin oturumu açılmaz
+        self.assertNotIn('Cookie', yanitlar[-1].get('Vary', ''))
+        # Kural yalnızca arama yapan istekleri sayar
+        self.assertEqual(self.client.get(reverse('mesaj_listesi')).status_code, 200)
+
+        yanit = self.aramalar(2, reverse('api_mesajlar'))[-1]
+        self.assertEqual(yanit.status_code, 429)
+        self.assertEqual(yanit.json()['bekleme'], int(yanit['Retry-After']))
+
+    @override_settings(MESAJ_HIZ_SINIRLARI={'mesaj_listesi': {'parametre': 'arama', 'ip': '1/m',
+                                                              'kullanici': '5/m'}})
+    def test_giris_yapan_kullanici_kendi_kovasini_kullanir(self):
+        self.assertEqual([y.status_code for y in self.aramalar(2)], [200, 429])
+        self.client.force_login(self.yazar)
+        self.assertEqual([y.status_code for y in self.aramalar(2)], [200, 200])
+
+    @override_settings(MESAJ_HIZ_SINIRLARI={'mesaj_listesi': {'parametre': 'arama', 'genel': '1/m'}})
+    def test_genel_kova_bosalinca_hafif_mod(self):
+        ilk, ikinci = self.aramalar(2)
+        self.assertFalse(ilk.has_header('X-Hafif-Mod'))
+        self.assertEqual(ikinci.status_code, 200)
+        self.assertEqual(ikinci['X-Hafif-Mod'], '1')
+        self.assertEqual(ikinci['Cache-Control'], 'no-store')
+        self.assertContains(ikinci, 'yalnızca mesaj başlıklarında')
+
+
+class KeysetSayfalamaTesti(TestCase):
+    """İmleçli sayfalar ileri geri tutarlı gezilir; aynı tarihli mesajlar id ile ayrılır"""
+
+    @classmethod
+    def setUpTestData(cls):
+        yazar = User.objects.create_user('yazar')
+        simdi = timezone.now()
+        # Üçer üçer aynı tarihli mesajlar; sayfa sınırları aynı tarihin ortasına düşer
+        Mesaj.objects.bulk_create([
+            Mesaj(baslik=f'Mesaj {i}', icerik='içerik', yazar=yazar, tarih=simdi - timedelta(minutes=i // 3))
+            for i in range(10)
+        ])
+        cls.sira = list(Mesaj.objects.order_by('-tarih', '-id').values_list('pk', flat=True))
+
+    def sayfa(self, sorgu_dizesi='?', boyut=4):
+        request = RequestFactory().get(f'/{sorgu_dizesi}&boyut={boyut}&kategori=3')
+        return keyset_sayfala(Mesaj.objects.all(), request, sonra_param='ileri', once_param='geri')
+
+    def idler(self, sayfa):
+        return [mesaj.pk for mesaj in sayfa]
+
+    def test_ileri_ve_geri_gezinti(self):
+        sayfalar = [self.sayfa()]
+        while sayfalar[-1].sonraki_link:
+            link = sayfalar[-1].sonraki_link
+            self.assertNotIn('geri=', link)
+            self.assertIn('kategori=3', link)
+            sayfalar.append(self.sayfa(link))
+        self.assertEqual([pk for sayfa in sayfalar for pk in self.idler(sayfa)], self.sira)
+        self.assertEqual([len(sayfa) for sayfa in sayfalar], [4, 4, 2])
+
+        geri = sayfalar[-1]
+        for beklenen in reversed(sayfalar[:-1]):
+            self.assertNotIn('ileri=', geri.onceki_link)
+            geri = self.sayfa(geri.onceki_link)
+            self.assertEqual(self.idler(geri), self.idler(beklenen))
+        self.assertEqual(geri.onceki_link, '')
+
+    def test_gecersiz_imlec_ilk_sayfaya_duser(self):
+        for sorgu_dizesi in ('?ileri=bozuk', '?geri=bozuk', '?ileri=Zm9v', '?ileri=ş'):
+            sayfa = self.sayfa(sorgu_dizesi)
+            self.assertEqual(self.idler(sayfa), self.sira[:4], sorgu_dizesi)
+            self.assertEqual(sayfa.onceki_link, '')
+            self.assertNotIn('bozuk', sayfa.sonraki_link)
+
+
+@OZETSIZ_STATIK
+class SayfaOnbellegiTesti(TestCase):
+    """Düzenlenen mesaj, önbellekteki sayfalarda bir sonraki istekte görünür; ilgisiz sayfalar önbellekte kalır"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.yazar = User.objects.create_user('yazar')
+        cls.kategoriler = [Kategori.objects.create(isim=f'Kategori {i}') for i in range(2)]
+        cls.mesaj = Mesaj.objects.create(baslik='Eski başlık', icerik='içerik', yazar=cls.yazar,
+                                         kategori=cls.kategoriler[0])
+        Mesaj.objects.create(baslik='Diğer', icerik='içerik', yazar=cls.yazar, kategori=cls.kategoriler[1])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_duzenleme_ilgili_sayfalari_gecersiz_kilar(self):
+        ilgili = [reverse('mesaj_detay', args=[self.mesaj.pk]), reverse('mesaj_listesi'),
+                  reverse('kategori_mesajlari', args=[self.kategoriler[0].pk])]
+        ilgisiz = reverse('kategori_mesajlari', args=[self.kategoriler[1].pk])
+        for url in [*ilgili, ilgisiz]:
+            self.assertEqual(self.client.get(url)['X-Onbellek'], 'MISS')
+            self.assertEqual(self.client.get(url)['X-Onbellek'], 'HIT')
+
+        self.client.force_login(self.yazar)
+        self.client.post(reverse('mesaj_duzenle', args=[self.mesaj.pk]), {
+            'baslik': 'Yeni başlık', 'icerik': 'içerik', 'kategori': self.kategoriler[0].pk,
+        })
+        self.client.logout()
+
+        for url in ilgili:
+            yanit = self.client.get(url)
+            self.assertEqual(yanit['X-Onbellek'], 'MISS', url)
+            self.assertContains(yanit, 'Yeni başlık')
+            self.assertNotContains(yanit, 'Eski başlık')
+        self.assertEqual(self.client.get(ilgisiz)['X-Onbellek'], 'HIT')
+
+
+@OZETSIZ_STATIK
+class MesajAdminTesti(TestCase):
+    """Değişiklik listesi filtreleri doğru satırları seçer; yazar filtresi yalnızca seçili yazarı yükler"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.yonetici = User.objects.create_superuser('yonetici', 'yonetici@example.com', 'parola')
+        cls.yazarlar = [User.objects.create_user(f'yazar{i}') for i in range(3)]
+        simdi = timezone.now()
+        cls.bugun_kisa = Mesaj.objects.create(baslik='Bugün kısa', icerik='kısa', yazar=cls.yazarlar[0])
+        cls.bugun_uzun = Mesaj.objects.create(baslik='Bugün uzun', icerik='u' * 400, yazar=cls.yazarlar[1])
+        cls.eski_uzun = Mesaj.objects.create(baslik='Eski uzun', icerik='u' * 400, yazar=cls.yazarlar[1],
+                                             tarih=simdi - timedelta(days=40))
+
+    def setUp(self):
+        self.client.force_login(self.yonetici)
+
+    def liste(self, **parametreler):
+        yanit = self.client.get(reverse('admin:mesajlar_mesaj_changelist'), parametreler)
+        self.assertEqual(yanit.status_code, 200)
+        return yanit, {mesaj.pk for mesaj in yanit.context['cl'].result_list}
+
+    def test_filtreler(self):
+        _, bugun = self.liste(tarih_araligi='today')
+        self.assertEqual(bugun, {self.bugun_kisa.pk, self.bugun_uzun.pk})
+        _, uzun = self.liste(icerik_uzunlugu='long')
+        self.assertEqual(uzun, {self.bugun_uzun.pk, self.eski_uzun.pk})
+        _, ikisi = self.liste(tarih_araligi='today', icerik_uzunlugu='long')
+        self.assertEqual(ikisi, {self.bugun_uzun.pk})
+
+    def test_yazar_filtresi_yalnizca_seciliyi_yukler(self):
+        secili = self.yazarlar[1]
+        yanit, mesajlar = self.liste(yazar__id__exact=secili.pk)
+        self.assertEqual(mesajlar, {self.bugun_uzun.pk, self.eski_uzun.pk})
+        filtre = next(f for f in yanit.context['cl'].filter_specs if getattr(f, 'field_path', None) == 'yazar')
+        self.assertEqual(filtre.lookup_choices, [(secili.pk, secili.username)])
+
+
+class EtiketTamamlamaTesti(TestCase):
+    """Önek araması Türkçe katlamayla yapılır, etiket değişikliklerini izler ve veritabanına gitmez"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.etiketler = {isim: Etiket.objects.create(isim=isim) for isim in ('Azim', 'azimli', 'Başarı', 'İnanç', 'sabır')}
+
+    def setUp(self):
+        cache.clear()
+
+    def tamamla(self, q, **parametreler):
+        yanit = self.client.get(reverse('api_etiket_tamamla'), {'q': q, **parametreler})
+        self.assertEqual(yanit.status_code, 200)
+        return [sonuc['isim'] for sonuc in yanit.json()['sonuclar']]
+
+    def test_onek_aramasi(self):
+        self.assertEqual(self.tamamla('az'), ['Azim', 'azimli'])
+        self.assertEqual(self.tamamla('AZ', boyut=1), ['Azim'])
+        self.assertEqual(self.tamamla('bas'), ['Başarı'])
+        self.assertEqual(self.tamamla('in'), ['İnanç'])
+        self.assertEqual(self.tamamla(' '), [])
+        with self.assertNumQueries(0):
+            self.tamamla('sab')
+
+    def test_degisiklikler_dizine_yansir(self):
+        self.assertEqual(self.tamamla('az'), ['Azim', 'azimli'])
+        with self.captureOnCommitCallbacks(execute=True):
+            etiket = self.etiketler['Azim']
+            etiket.isim = 'Kararlılık'
+            etiket.save()
+            self.etiketler['azimli'].delete()
+            Etiket.objects.create(isim='Azmetmek')
+        self.assertEqual(self.tamamla('az'), ['Azmetmek'])
+        self.assertEqual(self.tamamla('kar'), ['Kararlılık'])
+
+
+@OZETSIZ_STATIK
+class HerkeseAcikSayfaTesti(TestCase):
+    """Herkese açık sayfalar oturumu okumaz: Vary: Cookie ve oturum çerezi eklenmez"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.yazar = User.objects.create_user('yazar')
+        cls.mesaj = Mesaj.objects.create(baslik='Açık mesaj', icerik='içerik', yazar=cls.yazar)
+
+    def setUp(self):
+        cache.clear()
+
+    def oturumsuz_olmali(self, yanit):
+        self.assertEqual(yanit.status_code, 200)
+        self.assertNotIn('cookie', yanit.get('Vary', '').lower())
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, yanit.cookies)
+
+    def test_anonim_ve_uye_ayni_sayfayi_alir(self):
+        urller = [reverse('mesaj_listesi'), reverse('mesaj_detay', args=[self.mesaj.pk])]
+        anonim = [self.client.get(url) for url in urller]
+        for yanit in anonim:
+            self.oturumsuz_olmali(yanit)
+
+        self.client.force_login(self.yazar)
+        for url, anonim_yanit in zip(urller, anonim):
+            yanit = self.client.get(url)
+            self.oturumsuz_olmali(yanit)
+            self.assertEqual(yanit['X-Onbellek'], 'HIT')
+            self.assertEqual(yanit.content, anonim_yanit.content)
+
+        # Kullanıcıya özel sayfalar oturumu okumaya devam eder
+        self.assertIn('Cookie', self.client.get(reverse('mesaj_ekle'))['Vary'])
+
+    def test_bekleyen_flash_mesaji_normal_yoldan_gosterilir(self):
+        self.client.force_login(self.yazar)
+        self.client.post(reverse('mesaj_sil', args=[self.mesaj.pk]))
+        yanit = self.client.get(reverse('mesaj_listesi'))
+        self.assertIn('Cookie', yanit['Vary'])
+        self.assertContains(yanit, 'silindi')
+
+
+class IstatistikTesti(TestCase):
+    """Günlük özetlerden hesaplanan toplamlar Mesaj tablosundan sayılanlarla aynı kalır"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.yonetici = User.objects.create_superuser('yonetici', 'yonetici@example.com', 'parola')
+        cls.yazarlar = [User.objects.create_user(f'yazar{i}') for i in range(2)]
+        cls.kategoriler = [Kategori.objects.create(isim=f'Kategori {i}') for i in range(2)]
+        cls.etiketler = [Etiket.objects.create(isim=f'etiket{i}') for i in range(2)]
+
+    def beklenen(self, bas, bit):
+        mesajlar = [m for m in Mesaj.objects.prefetch_related('etiketler')
+                    if bas <= istatistik.tarihin_gunu(m.tarih) <= bit]
+        kategoriler, etiketler = {}, {}
+        for mesaj in mesajlar:
+            kategoriler[mesaj.kategori_id] = kategoriler.get(mesaj.kategori_id, 0) + 1
+            for etiket in mesaj.etiketler.all():
+                etiketler[etiket.pk] = etiketler.get(etiket.pk, 0) + 1
+        uzun = sum(1 for m in mesajlar if len(m.icerik) > 300)
+        return len(mesajlar), kategoriler, etiketler, uzun
+
+    def hesaplanan(self, bas, bit):
+        sonuc = istatistik.ozet(bas, bit)
+        return (
+            sonuc['toplam'],
+            {k['id']: k['sayi'] for k in sonuc['kategoriler']},
+            {e['id']: e['sayi'] for e in sonuc['etiketler']},
+            next(g['sayi'] for g in sonuc['uzunluk_gruplari'] if g['ad'].startswith('Uzun')),
+        )
+
+    def test_toplamlar_degisikliklerle_tutarli_kalir(self):
+        simdi = timezone.now()
+        mesajlar = []
+        for i in range(6):
+            mesaj = Mesaj.objects.create(
+                baslik=f'Mesaj {i}', icerik='k' * (50 + i * 100), yazar=self.yazarlar[i % 2],
+                kategori=self.kategoriler[i % 2] if i < 5 else None, tarih=simdi - timedelta(days=i % 3),
+            )
+            mesaj.etiketler.add(*self.etiketler[:i % 3])
+            mesajlar.append(mesaj)
+        gorevleri_isle()
+        bas, bit = istatistik.tarihin_gunu(simdi - timedelta(days=2)), istatistik.tarihin_gunu(simdi)
+        self.assertEqual(self.hesaplanan(bas, bit), self.beklenen(bas, bit))
+        # Tek günlük aralık da yalnızca o günü toplar
+        self.assertEqual(self.hesaplanan(bit, bit), self.beklenen(bit, bit))
+
+        mesajlar[0].kategori = self.kategoriler[1]
+        mesajlar[0].icerik = 'k' * 500
+        mesajlar[0].save()
+        mesajlar[1].etiketler.clear()
+        mesajlar[2].delete()
+        gorevleri_isle()
+        self.assertEqual(self.hesaplanan(bas, bit), self.beklenen(bas, bit))
+
+        self.client.force_login(self.yonetici)
+        parametreler = {'baslangic': bas.isoformat(), 'bitis': bit.isoformat()}
+        self.assertEqual(self.client.get(reverse('api_istatistikler'), parametreler).json()['toplam'], 5)
@@ -1,10 +1,17 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, views
+
+# ASGI altında salt okunur görünümlerin asenkron sürümleri kullanılır
+if settings.MESAJ_ASYNC_GORUNUMLER:
+    from . import views_async as okuma, views_async as okuma_api
+else:
+    okuma, okuma_api = views, api
 
 urlpatterns = [
-    path('', views.mesaj_listesi, name='mesaj_listesi'),
+    path('', okuma.mesaj_listesi, name='mesaj_listesi'),
     path('ekle/', views.mesaj_ekle, name='mesaj_ekle'),
-    path('mesaj/<int:pk>/', views.mesaj_detay, name='mesaj_detay'),
+    path('mesaj/<int:pk>/', okuma.mesaj_detay, name='mesaj_detay'),
     path('mesaj/<int:pk>/duzenle/', views.mesaj_duzenle, name='mesaj_duzenle'),
     path('mesaj/<int:pk>/sil/', views.mesaj_sil, name='mesaj_sil'),
     
@@ -13,8 +20,36 @@ urlpatterns = [
     path('kategoriler/ekle/', views.kategori_ekle, name='kategori_ekle'),
     path('kategoriler/<int:pk>/duzenle/', views.kategori_duzenle, name='kategori_duzenle'),
     path('kategoriler/<int:pk>/sil/', views.kategori_sil, name='kategori_sil'),
-    path('kategoriler/<int:kategori_id>/mesajlar/', views.kategori_mesajlari, name='kategori_mesajlari'),
+    path('kategoriler/<int:kategori_id>/mesajlar/', okuma.kategori_mesajlari, name='kategori_mesajlari'),
+    
+    # Tek mesaj gösteren sayfalar
+    path('gunun-mesaji/', views.gunun_mesaji, name='gunun_mesaji'),
+    path('rastgele/', views.rastgele, name='rastgele_mesaj'),
     
     # Etiket URL'leri
-    path('etiket/<int:etiket_id>/mesajlar/', views.etiket_mesajlari, name='etiket_mesajlari'),
+    path('etiketler/', views.etiket_bulutu, name='etiket_bulutu'),
+    path('etiket/<int:etiket_id>/mesajlar/', okuma.etiket_mesajlari, name='etiket_mesajlari'),
+    
+    # Arşive taşınmış eski mesajlarda arama
+    path('arsiv/', views.arsiv_arama, name='arsiv'),
+    
+    # RSS/Atom/JSON beslemeleri: bicim rss, atom ya da json
+    path('besleme/<str:bicim>/', views.besleme, name='besleme'),
+    path('kategoriler/<int:kategori_id>/besleme/<str:bicim>/', views.besleme, name='kategori_beslemesi'),
+    path('etiket/<int:etiket_id>/besleme/<str:bicim>/', views.besleme, name='etiket_beslemesi'),
+    
+    # Herkese açık sayfalarda giriş durumuna bağlı gezinme menüsü
+    path('oturum/menu/', views.oturum_menusu, name='oturum_menusu'),
+    
+    # Personel için istek profili ve istatistik paneli
+    path('profil/', views.profil_paneli, name='profil_paneli'),
+    path('istatistikler/', views.istatistik_paneli, name='istatistik_paneli'),
+    
+    # JSON API (v1)
+    path('api/v1/mesajlar/', okuma_api.mesajlar, name='api_mesajlar'),
+    path('api/v1/mesajlar/export.ndjson', okuma_api.mesajlar_disa_aktar, name='api_mesajlar_disa_aktar'),
+    path('api/v1/kategoriler/', okuma_api.kategoriler, name='api_kategoriler'),
+    path('api/v1/etiketler/', okuma_api.etiketler, name='api_etiketler'),
+    path('api/v1/etiketler/tamamla/', api.etiket_tamamla, name='api_etiket_tamamla'),
+    path('api/v1/istatistikler/', api.istatistikler, name='api_istatistikler'),
 ]
\ No newline at end of file
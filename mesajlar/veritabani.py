@@ -0,0 +1,31 @@
+"""Veritabanı bağlantısı açılırken uygulanan ayarlar.
+
+SQLite için her yeni bağlantıda PRAGMA'lar çalıştırılır: WAL günlüğü
+okuyucuların yazıcıyı beklemesini önler, busy_timeout kilitli veritabanında
+hemen "database is locked" hatası vermek yerine bekler. journal_mode=WAL
+dosyaya kalıcı yazılır, diğerleri bağlantı başınadır.
+"""
+from django.conf import settings
+
+VARSAYILAN_SQLITE_PRAGMALARI = {
+    # Önce: WAL'a geçiş de kilit gerektirir
+    'busy_timeout': 20000,
+    'journal_mode': 'WAL',
+    # WAL ile güvenli; her işlemde değil yalnızca checkpoint'te fsync yapılır
+    'synchronous': 'NORMAL',
+    'foreign_keys': 'ON',
+    'temp_store': 'MEMORY',
+    # Negatif değer KiB cinsindendir: 64 MB sayfa önbelleği
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+}
+SQLITE_PRAGMALARI = getattr(settings, 'MESAJ_SQLITE_PRAGMALARI', VARSAYILAN_SQLITE_PRAGMALARI)
+
+
+def baglanti_ayarla(sender, connection, **kwargs):
+    """connection_created sinyali alıcısı"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for ad, deger in SQLITE_PRAGMALARI.items():
+            cursor.execute(f'PRAGMA {ad} = {deger}')
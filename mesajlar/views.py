@@ -1,23 +1,45 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_safe
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import Q, Count
 from django.utils import timezone
 from datetime import timedelta
-from .models import Mesaj, Kategori, Etiket
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from .models import ArsivMesaj, Mesaj, Kategori, Etiket
 from .forms import MesajForm, KategoriForm
+from .sayfalama import KeysetSayfasi, keyset_sayfala, sayfa_boyutu_al, yaklasik_sayi
+from .arama import arama_motoru
+from . import arsiv, beslemeler, etiket_servisi, havuz, hiz_siniri, istatistik, kartlar, kuyruk, oturum, profil
+from .kosullu import liste_kosullu_get, mesaj_kosullu_get
+from .onbellek import anonim_sayfa_onbellegi, kart_anahtarlarini_ekle, surum_imzasi
+from .oturum import herkese_acik
+from .replika import replikadan_okunabilir
 
+def ilgiye_gore_sayfa(mesajlar, arama_sorgusu, boyut):
+    """Arama sonuçlarından en ilgili `boyut` mesajı alaka sırasıyla döndürür"""
+    idler = arama_motoru().en_ilgili(arama_sorgusu, boyut)
+    bulunanlar = {mesaj.pk: mesaj for mesaj in mesajlar.filter(pk__in=idler)}
+    return KeysetSayfasi([bulunanlar[pk] for pk in idler if pk in bulunanlar], None, None, boyut)
+
+@herkese_acik
+@replikadan_okunabilir
+@liste_kosullu_get('liste', 'kategoriler', 'adlar')
+@anonim_sayfa_onbellegi('liste', 'kategoriler', 'adlar', haric=kartlar.akis_kullanilsin)
 def mesaj_listesi(request):
-    mesajlar = Mesaj.objects.all()
+    mesajlar = Mesaj.objects.listing()
     
-    # Arama işlevi
+    # Arama işlevi (tam metin arama motoru üzerinden); yük altında yalnızca başlıkta aranır
     arama_sorgusu = request.GET.get('arama', '')
+    hafif = hiz_siniri.hafif_mod(request)
     if arama_sorgusu:
-        mesajlar = mesajlar.filter(
-            Q(baslik__icontains=arama_sorgusu) | 
-            Q(icerik__icontains=arama_sorgusu)
-        )
+        mesajlar = arama_motoru().filtrele(mesajlar, arama_sorgusu, hafif=hafif)
     
     # Kategori filtresi
     kategori_id = request.GET.get('kategori', '')
@@ -30,30 +52,48 @@ def mesaj_listesi(request):
     # Tüm kategorileri al (filtreleme için)
     kategoriler = Kategori.objects.all()
     
-    # kisaltilmis_icerik fonksiyonunu çağırabilmeniz için emin olun
-    for mesaj in mesajlar:
-        if not hasattr(mesaj, 'kisaltilmis_icerik_value'):
-            mesaj.kisaltilmis_icerik_value = mesaj.kisaltilmis_icerik()
-            
+    # Toplam sayı sınırlı okunur, mesajlar (tarih, id) üzerinden keyset ile sayfalanır.
+    # Yalnızca kategori filtresi varsa kategorinin sayacı tam sayıyı verir.
+    if kategori_id.isdigit() and not arama_sorgusu:
+        sayac = kategoriler.filter(pk=int(kategori_id)).values_list('mesaj_sayisi', flat=True).first()
+        toplam_sayi, sayi_tam = sayac or 0, True
+    else:
+        toplam_sayi, sayi_tam = yaklasik_sayi(mesajlar)
     context = {
-        'mesajlar': mesajlar,
+        'toplam_sayi': toplam_sayi,
+        'sayi_tam': sayi_tam,
         'arama_sorgusu': arama_sorgusu,
-        'kategoriler': kategoriler
+        'hafif_arama': hafif and bool(arama_sorgusu),
+        'kategoriler': kategoriler,
+        'kategori_surumu': surum_imzasi(['kategoriler', 'adlar'])
     }
-    
-    return render(request, 'mesajlar/mesaj_listesi.html', context)
+
+    ilgiye_gore = arama_sorgusu and request.GET.get('sirala') == 'ilgi' and not hafif
+    if not ilgiye_gore and kartlar.akis_kullanilsin(request):
+        response = kartlar.akis_yaniti(request, 'mesajlar/mesaj_listesi.html', context, mesajlar)
+    else:
+        if ilgiye_gore:
+            # Alaka sıralamasında yalnızca en ilgili ilk sayfa gösterilir
+            sayfa = ilgiye_gore_sayfa(mesajlar, arama_sorgusu, sayfa_boyutu_al(request))
+        else:
+            sayfa = keyset_sayfala(mesajlar, request)
+        kart_anahtarlarini_ekle(sayfa)
+        response = render(request, 'mesajlar/mesaj_listesi.html', {**context, 'mesajlar': sayfa, 'sayfa': sayfa})
+    return hiz_siniri.hafif_yanit(response) if hafif else response
 
 @login_required
 def mesaj_ekle(request):
     if request.method == 'POST':
         form = MesajForm(request.POST)
         if form.is_valid():
-            mesaj = form.save(commit=False)
-            mesaj.yazar = request.user
-            mesaj.save()
-            
-            # ManyToMany ilişkisi için save_m2m() çağrılmalı
-            form.save_m2m()
+            # Mesaj, etiketleri ve sinyallerin eklediği görevler tek işlemde yazılır
+            with transaction.atomic(), kuyruk.toplu():
+                mesaj = form.save(commit=False)
+                mesaj.yazar = request.user
+                mesaj.save()
+
+                # ManyToMany ilişkisi için save_m2m() çağrılmalı
+                form.save_m2m()
             
             messages.success(request, "Motivasyon mesajınız başarıyla eklendi!")
             return redirect('mesaj_listesi')
@@ -62,8 +102,15 @@ def mesaj_ekle(request):
     
     return render(request, 'mesajlar/mesaj_form.html', {'form': form})
 
+@herkese_acik
+@replikadan_okunabilir
+@mesaj_kosullu_get
+@anonim_sayfa_onbellegi('mesaj:{pk}')
 def mesaj_detay(request, pk):
-    mesaj = get_object_or_404(Mesaj, pk=pk)
+    # Sıcak tabloda olmayan id arşivde aranır
+    mesaj = arsiv.mesaj_getir(pk)
+    if mesaj is None:
+        raise Http404("Mesaj bulunamadı")
     return render(request, 'mesajlar/mesaj_detay.html', {'mesaj': mesaj})
 
 @login_required
@@ -78,7 +125,8 @@ def mesaj_duzenle(request, pk):
     if request.method == 'POST':
         form = MesajForm(request.POST, instance=mesaj)
         if form.is_valid():
-            form.save()
+            with transaction.atomic(), kuyruk.toplu():
+                form.save()
             messages.success(request, "Mesajınız başarıyla güncellendi!")
             return redirect('mesaj_detay', pk=pk)
     else:
@@ -100,12 +148,16 @@ def mesaj_sil(request, pk):
         return redirect('mesaj_detay', pk=pk)
     
     if request.method == 'POST':
-        mesaj.delete()
+        with transaction.atomic(), kuyruk.toplu():
+            mesaj.delete()
         messages.success(request, "Mesajınız başarıyla silindi!")
         return redirect('mesaj_listesi')
     
     return render(request, 'mesajlar/mesaj_sil.html', {'mesaj': mesaj})
 
+@herkese_acik
+@replikadan_okunabilir
+@liste_kosullu_get('kategoriler')
 def kategori_listesi(request):
     kategoriler = Kategori.objects.all()
     return render(request, 'mesajlar/kategori_listesi.html', {'kategoriler': kategoriler})
@@ -115,7 +167,8 @@ def kategori_ekle(request):
     if request.method == 'POST':
         form = KategoriForm(request.POST)
         if form.is_valid():
-            form.save()
+            with transaction.atomic(), kuyruk.toplu():
+                form.save()
             messages.success(request, "Yeni kategori başarıyla eklendi!")
             return redirect('kategori_listesi')
     else:
@@ -130,7 +183,8 @@ def kategori_duzenle(request, pk):
     if request.method == 'POST':
         form = KategoriForm(request.POST, instance=kategori)
         if form.is_valid():
-            form.save()
+            with transaction.atomic(), kuyruk.toplu():
+                form.save()
             messages.success(request, "Kategori başarıyla güncellendi!")
             return redirect('kategori_listesi')
     else:
@@ -147,30 +201,163 @@ def kategori_sil(request, pk):
     kategori = get_object_or_404(Kategori, pk=pk)
     
     if request.method == 'POST':
-        kategori.delete()
+        with transaction.atomic(), kuyruk.toplu():
+            kategori.delete()
         messages.success(request, "Kategori başarıyla silindi!")
         return redirect('kategori_listesi')
     
     return render(request, 'mesajlar/kategori_sil.html', {'kategori': kategori})
 
+@herkese_acik
+@replikadan_okunabilir
+@liste_kosullu_get('kategori:{kategori_id}', 'adlar')
+@anonim_sayfa_onbellegi('kategori:{kategori_id}', 'adlar', haric=kartlar.akis_kullanilsin)
 def kategori_mesajlari(request, kategori_id):
     kategori = get_object_or_404(Kategori, pk=kategori_id)
-    mesajlar = Mesaj.objects.filter(kategori=kategori)
+    mesajlar = Mesaj.objects.listing().filter(kategori=kategori)
+    if kartlar.akis_kullanilsin(request):
+        return kartlar.akis_yaniti(request, 'mesajlar/kategori_mesajlari.html', {'kategori': kategori}, mesajlar)
+    sayfa = keyset_sayfala(mesajlar, request)
+    kart_anahtarlarini_ekle(sayfa)
     
     context = {
         'kategori': kategori,
-        'mesajlar': mesajlar
+        'mesajlar': sayfa,
+        'sayfa': sayfa
     }
     
     return render(request, 'mesajlar/kategori_mesajlari.html', context)
 
+@herkese_acik
+@replikadan_okunabilir
+@liste_kosullu_get('etiket:{etiket_id}', 'adlar')
+@anonim_sayfa_onbellegi('etiket:{etiket_id}', 'adlar', haric=kartlar.akis_kullanilsin)
 def etiket_mesajlari(request, etiket_id):
     etiket = get_object_or_404(Etiket, pk=etiket_id)
-    mesajlar = Mesaj.objects.filter(etiketler=etiket)
+    mesajlar = Mesaj.objects.listing().filter(etiketler=etiket)
+    if kartlar.akis_kullanilsin(request):
+        return kartlar.akis_yaniti(request, 'mesajlar/etiket_mesajlari.html', {'etiket': etiket}, mesajlar)
+    sayfa = keyset_sayfala(mesajlar, request)
+    kart_anahtarlarini_ekle(sayfa)
     
     context = {
         'etiket': etiket,
-        'mesajlar': mesajlar
+        'mesajlar': sayfa,
+        'sayfa': sayfa
     }
     
-    return render(request, 'mesajlar/etiket_mesajlari.html', context)
\ No newline at end of file
+    return render(request, 'mesajlar/etiket_mesajlari.html', context)
+
+def _kategori_al(request):
+    kategori_id = request.GET.get('kategori', '')
+    if kategori_id.isdigit():
+        return Kategori.objects.filter(pk=int(kategori_id)).first()
+    return None
+
+def _yerel_tarih(request):
+    """?tz= ile verilen saat dilimindeki bugünün tarihi; geçersizse varsayılan saat dilimi"""
+    try:
+        return timezone.localdate(timezone=ZoneInfo(request.GET.get('tz', '')))
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.localdate()
+
+@herkese_acik
+@replikadan_okunabilir
+@never_cache
+def gunun_mesaji(request):
+    kategori = _kategori_al(request)
+    tarih = _yerel_tarih(request)
+    mesaj = havuz.gunun_mesaji(kategori.pk if kategori else None, tarih)
+    return render(request, 'mesajlar/gunun_mesaji.html', {
+        'mesaj': mesaj,
+        'kategori': kategori,
+        'baslik': 'Günün Mesajı',
+        'tarih': tarih,
+    })
+
+@herkese_acik
+@replikadan_okunabilir
+@never_cache
+def rastgele(request):
+    kategori = _kategori_al(request)
+    mesaj = havuz.rastgele_mesaj(kategori.pk if kategori else None)
+    return render(request, 'mesajlar/gunun_mesaji.html', {
+        'mesaj': mesaj,
+        'kategori': kategori,
+        'baslik': 'Rastgele Mesaj',
+    })
+
+@herkese_acik
+@replikadan_okunabilir
+def etiket_bulutu(request):
+    return render(request, 'mesajlar/etiket_bulutu.html', {'etiketler': etiket_servisi.etiket_bulutu()})
+
+@herkese_acik
+@require_safe
+def arsiv_arama(request):
+    """Arşive taşınmış eski mesajlarda başlık ve içerik araması (bkz. mesajlar/arsiv.py)"""
+    arama_sorgusu = request.GET.get('arama', '')
+    mesajlar = ArsivMesaj.objects.only('baslik', 'icerik', 'tarih', 'yazar_id')
+    if arama_sorgusu:
+        mesajlar = arsiv.ara(mesajlar, arama_sorgusu)
+    sayfa = keyset_sayfala(mesajlar, request)
+    arsiv.yazarlari_ekle(sayfa.mesajlar)
+    return render(request, 'mesajlar/arsiv.html', {
+        'mesajlar': sayfa,
+        'sayfa': sayfa,
+        'arama_sorgusu': arama_sorgusu,
+    })
+
+@herkese_acik
+@require_safe
+def besleme(request, bicim, kategori_id=None, etiket_id=None):
+    """Önbellekte hazır tutulan RSS, Atom ya da JSON beslemesi (bkz. mesajlar/beslemeler.py)"""
+    if bicim not in beslemeler.ICERIK_TURLERI:
+        raise Http404('Bilinmeyen besleme biçimi.')
+    kayit = beslemeler.kayit_al(beslemeler.kapsam(kategori_id, etiket_id))
+    if kayit is None:
+        raise Http404('Besleme bulunamadı.')
+    icerik, etag = kayit['bicimler'][bicim]
+    son_degisiklik = kayit['son_degisiklik']
+    response = get_conditional_response(request, etag=etag, last_modified=son_degisiklik)
+    if response is None:
+        response = HttpResponse(icerik, content_type=beslemeler.ICERIK_TURLERI[bicim])
+    response['ETag'] = etag
+    if son_degisiklik:
+        response['Last-Modified'] = http_date(son_degisiklik)
+    return response
+
+@never_cache
+def oturum_menusu(request):
+    """Herkese açık sayfalarda oturum.js'in yüklediği kullanıcı menüsü"""
+    return HttpResponse(oturum.menu_html(request.user))
+
+@staff_member_required
+def profil_paneli(request):
+    if request.method == 'POST':
+        profil.sifirla()
+        hiz_siniri.istatistikleri_sifirla()
+        messages.success(request, "Profil örnekleri ve hız sınırı sayaçları sıfırlandı.")
+        return redirect('profil_paneli')
+    
+    return render(request, 'mesajlar/profil_paneli.html', {
+        'gorunumler': profil.ozet(),
+        'profil_orani': profil.PROFIL_ORANI,
+        'tampon_boyutu': profil.TAMPON_BOYUTU,
+        'hiz_siniri': hiz_siniri.istatistikler(),
+    })
+
+@staff_member_required
+def istatistik_paneli(request):
+    """Özet tablolarından tarih aralığı istatistikleri (bkz. mesajlar/istatistik.py)"""
+    try:
+        baslangic, bitis = istatistik.aralik_al(request.GET)
+    except ValueError as hata:
+        messages.error(request, str(hata))
+        baslangic, bitis = istatistik.aralik_al({})
+    ozet = istatistik.ozet(baslangic, bitis)
+    return render(request, 'mesajlar/istatistik_paneli.html', {
+        'ozet': ozet,
+        'en_yogun_gun': max((g['sayi'] for g in ozet['gunluk']), default=0),
+        'en_buyuk_dilim': max((d['sayi'] for d in ozet['uzunluk']), default=0),
+    })
@@ -0,0 +1,194 @@
+"""Salt okunur sayfaların ve JSON uç noktalarının asenkron (ASGI) sürümleri.
+
+Bu görünümler ORM'e aget/afirst/acount/async for ile, önbelleğe a* metotlarıyla
+erişir; böylece ASGI altında her istek bir iş parçacığını meşgul etmez.
+Şablonlar işlenmeden önce şablonun ihtiyaç duyduğu her şey (kullanıcı,
+kategori listesi, ilişkiler) yüklenir, çünkü şablon motoru senkrondur.
+URL'ler settings.MESAJ_ASYNC_GORUNUMLER açıksa bu modüle yönlendirilir.
+"""
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.shortcuts import render
+from django.views.decorators.http import require_GET
+
+from . import api, arsiv, hiz_siniri, kartlar
+from .arama import arama_motoru
+from .kosullu import liste_kosullu_get, mesaj_kosullu_get
+from .models import Etiket, Kategori, Mesaj
+from .onbellek import akart_anahtarlarini_ekle, anonim_sayfa_onbellegi, asurum_imzasi
+from .oturum import herkese_acik
+from .replika import replikadan_okunabilir
+from .sayfalama import KeysetSayfasi, akeyset_sayfala, ayaklasik_sayi, sayfa_boyutu_al
+
+
+async def _aget_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(f'{queryset.model._meta.verbose_name} bulunamadı.')
+
+
+async def _kullaniciyi_yukle(request):
+    # Şablondaki {{ user }} senkron tembel nesneye erişmesin diye önceden yüklenir
+    request.user = await request.auser()
+
+
+async def _ailgiye_gore_sayfa(mesajlar, arama_sorgusu, boyut):
+    idler = await sync_to_async(arama_motoru().en_ilgili)(arama_sorgusu, boyut)
+    bulunanlar = {mesaj.pk: mesaj async for mesaj in mesajlar.filter(pk__in=idler)}
+    return KeysetSayfasi([bulunanlar[pk] for pk in idler if pk in bulunanlar], None, None, boyut)
+
+
+@herkese_acik
+@replikadan_okunabilir
+@liste_kosullu_get('liste', 'kategoriler', 'adlar')
+@anonim_sayfa_onbellegi('liste', 'kategoriler', 'adlar', haric=kartlar.akis_kullanilsin)
+async def mesaj_listesi(request):
+    mesajlar = Mesaj.objects.listing()
+
+    arama_sorgusu = request.GET.get('arama', '')
+    hafif = hiz_siniri.hafif_mod(request)
+    if arama_sorgusu:
+        mesajlar = arama_motoru().filtrele(mesajlar, arama_sorgusu, hafif=hafif)
+
+    kategori_id = request.GET.get('kategori', '')
+    if kategori_id.isdigit():
+        mesajlar = mesajlar.filter(kategori_id=int(kategori_id))
+
+    kategoriler = [kategori async for kategori in Kategori.objects.all()]
+
+    if kategori_id.isdigit() and not arama_sorgusu:
+        sayac = next((k.mesaj_sayisi for k in kategoriler if k.pk == int(kategori_id)), 0)
+        toplam_sayi, sayi_tam = sayac, True
+    else:
+        toplam_sayi, sayi_tam = await ayaklasik_sayi(mesajlar)
+    await _kullaniciyi_yukle(request)
+    context = {
+        'toplam_sayi': toplam_sayi,
+        'sayi_tam': sayi_tam,
+        'arama_sorgusu': arama_sorgusu,
+        'hafif_arama': hafif and bool(arama_sorgusu),
+        'kategoriler': kategoriler,
+        'kategori_surumu': await asurum_imzasi(['kategoriler', 'adlar']),
+    }
+
+    ilgiye_gore = arama_sorgusu and request.GET.get('sirala') == 'ilgi' and not hafif
+    if not ilgiye_gore and kartlar.akis_kullanilsin(request):
+        response = await kartlar.aakis_yaniti(request, 'mesajlar/mesaj_listesi.html', context, mesajlar)
+    else:
+        if ilgiye_gore:
+            sayfa = await _ailgiye_gore_sayfa(mesajlar, arama_sorgusu, sayfa_boyutu_al(request))
+        else:
+            sayfa = await akeyset_sayfala(mesajlar, request)
+        await akart_anahtarlarini_ekle(sayfa)
+        response = render(request, 'mesajlar/mesaj_listesi.html', {**context, 'mesajlar': sayfa, 'sayfa': sayfa})
+    return hiz_siniri.hafif_yanit(response) if hafif else response
+
+
+@herkese_acik
+@replikadan_okunabilir
+@mesaj_kosullu_get
+@anonim_sayfa_onbellegi('mesaj:{pk}')
+async def mesaj_detay(request, pk):
+    mesaj = await arsiv.amesaj_getir(pk)
+    if mesaj is None:
+        raise Http404(f'{Mesaj._meta.verbose_name} bulunamadı.')
+    await _kullaniciyi_yukle(request)
+    return render(request, 'mesajlar/mesaj_detay.html', {'mesaj': mesaj})
+
+
+@herkese_acik
+@replikadan_okunabilir
+@liste_kosullu_get('kategori:{kategori_id}', 'adlar')
+@anonim_sayfa_onbellegi('kategori:{kategori_id}', 'adlar', haric=kartlar.akis_kullanilsin)
+async def kategori_mesajlari(request, kategori_id):
+    kategori = await _aget_or_404(Kategori.objects.all(), pk=kategori_id)
+    mesajlar = Mesaj.objects.listing().filter(kategori=kategori)
+    await _kullaniciyi_yukle(request)
+    if kartlar.akis_kullanilsin(request):
+        return await kartlar.aakis_yaniti(request, 'mesajlar/kategori_mesajlari.html', {'kategori': kategori}, mesajlar)
+    sayfa = await akeyset_sayfala(mesajlar, request)
+    await akart_anahtarlarini_ekle(sayfa)
+    return render(request, 'mesajlar/kategori_mesajlari.html', {
+        'kategori': kategori,
+        'mesajlar': sayfa,
+        'sayfa': sayfa,
+    })
+
+
+@herkese_acik
+@replikadan_okunabilir
+@liste_kosullu_get('etiket:{etiket_id}', 'adlar')
+@anonim_sayfa_onbellegi('etiket:{etiket_id}', 'adlar', haric=kartlar.akis_kullanilsin)
+async def etiket_mesajlari(request, etiket_id):
+    etiket = await _aget_or_404(Etiket.objects.all(), pk=etiket_id)
+    mesajlar = Mesaj.objects.listing().filter(etiketler=etiket)
+    await _kullaniciyi_yukle(request)
+    if kartlar.akis_kullanilsin(request):
+        return await kartlar.aakis_yaniti(request, 'mesajlar/etiket_mesajlari.html', {'etiket': etiket}, mesajlar)
+    sayfa = await akeyset_sayfala(mesajlar, request)
+    await akart_anahtarlarini_ekle(sayfa)
+    return render(request, 'mesajlar/etiket_mesajlari.html', {
+        'etiket': etiket,
+        'mesajlar': sayfa,
+        'sayfa': sayfa,
+    })
+
+
+# -- JSON API --------------------------------------------------------------------
+
+@herkese_acik
+@replikadan_okunabilir
+@require_GET
+@liste_kosullu_get('liste', 'adlar')
+async def mesajlar(request):
+    try:
+        alanlar = api.alanlari_al(request)
+    except api.GecersizAlan as hata:
+        return api.hata_yaniti(f'Bilinmeyen alan: {hata}')
+    sayfa = await akeyset_sayfala(api.mesaj_sorgusu(request, alanlar), request)
+    response = api.sayfa_yaniti(
+        request,
+        [api.mesaji_serilestir(mesaj, alanlar) for mesaj in sayfa],
+        sayfa.sonraki_link,
+        sayfa.onceki_link,
+    )
+    return hiz_siniri.hafif_yanit(response) if hiz_siniri.hafif_mod(request) else response
+
+
+@herkese_acik
+@replikadan_okunabilir
+@require_GET
+@liste_kosullu_get('kategoriler')
+async def kategoriler(request):
+    sorgu, boyut = api.id_sayfa_sorgusu(request, Kategori.objects.all())
+    satirlar, sonraki_link = api.id_sayfasi(request, [k async for k in sorgu], boyut)
+    return api.sayfa_yaniti(request, [api.kategoriyi_serilestir(k) for k in satirlar], sonraki_link, None)
+
+
+@herkese_acik
+@replikadan_okunabilir
+@require_GET
+async def etiketler(request):
+    sorgu, boyut = api.id_sayfa_sorgusu(request, Etiket.objects.all())
+    satirlar, sonraki_link = api.id_sayfasi(request, [e async for e in sorgu], boyut)
+    return api.sayfa_yaniti(request, [api.etiketi_serilestir(e) for e in satirlar], sonraki_link, None)
+
+
+@herkese_acik
+@replikadan_okunabilir
+@require_GET
+async def mesajlar_disa_aktar(request):
+    try:
+        alanlar = api.alanlari_al(request)
+    except api.GecersizAlan as hata:
+        return api.hata_yaniti(f'Bilinmeyen alan: {hata}')
+    mesajlar = api.mesaj_sorgusu(request, alanlar).order_by('pk')
+    # Satırlar middleware'ler bittikten sonra okunur; veritabanı seçimi şimdi sabitlenir
+    mesajlar = mesajlar.using(mesajlar.db)
+
+    async def satirlar():
+        async for mesaj in mesajlar.aiterator(chunk_size=api.DISA_AKTARIM_PARCA_BOYUTU):
+            yield api.ndjson_satiri(mesaj, alanlar)
+
+    return api.ndjson_yaniti(satirlar())
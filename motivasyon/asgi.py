@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'motivasyon.settings')
+# Salt okunur görünümlerin asenkron sürümlerini kullan (bkz. mesajlar/views_async.py)
+os.environ.setdefault('MESAJ_ASYNC_GORUNUMLER', '1')
+# Kalıcı bağlantılar ASGI altında istekler arasında paylaşılamaz
+os.environ.setdefault('MESAJ_DB_BAGLANTI_OMRU', '0')
 
 application = get_asgi_application()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,22 +43,36 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'mesajlar.statik.StatikMiddleware',
+    'mesajlar.profil.ProfilMiddleware',
+    'mesajlar.replika.ReplikaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'mesajlar.hiz_siniri.HizSiniriMiddleware',
+    'mesajlar.oturum.HerkeseAcikMiddleware',
 ]
 
 ROOT_URLCONF = 'motivasyon.urls'
 
+# Şablonlar DEBUG dışında bir kez derlenip bellekte tutulur; geliştirmede her
+# istekte diskten okunur, böylece değişiklikler yeniden başlatmadan görünür.
+_SABLON_YUKLEYICILERI = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': _SABLON_YUKLEYICILERI if DEBUG else [
+                ('django.template.loaders.cached.Loader', _SABLON_YUKLEYICILERI),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -74,13 +89,116 @@ WSGI_APPLICATION = 'motivasyon.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Bağlantı başına PRAGMA'lar (WAL, busy_timeout, mmap...) mesajlar/veritabani.py'de
+# connection_created ile uygulanır; MESAJ_SQLITE_PRAGMALARI ile değiştirilebilir.
+# CONN_MAX_AGE bağlantıları istekler arasında yeniden kullanır; ASGI altında
+# (motivasyon/asgi.py) bağlantılar istek bağlamına bağlı olduğundan 0'dır.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': int(os.environ.get('MESAJ_DB_BAGLANTI_OMRU', '60')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Yazma işlemleri kilidi baştan alır; okuma kilidinden yazmaya geçerken
+            # busy_timeout'u atlayan "database is locked" hataları oluşmaz
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
+# Okuma replikaları: MESAJ_REPLIKALAR="yol@ağırlık,yol@ağırlık" (ağırlık varsayılan 1).
+# Her biri birincinin ayarlarıyla replika1, replika2... adıyla eklenir. Yerel denemede
+# SQLite kopyaları kullanılabilir: python manage.py mesaj_replika_kopyala
+# Yönlendirme kuralları mesajlar/replika.py'dedir.
+MESAJ_REPLIKALAR = {}
+for _sira, _tanim in enumerate(filter(None, os.environ.get('MESAJ_REPLIKALAR', '').split(',')), start=1):
+    _yol, _ayrac, _agirlik = _tanim.strip().rpartition('@')
+    if not _ayrac:
+        _yol, _agirlik = _agirlik, '1'
+    DATABASES[f'replika{_sira}'] = {**DATABASES['default'], 'NAME': _yol, 'TEST': {'MIRROR': 'default'}}
+    MESAJ_REPLIKALAR[f'replika{_sira}'] = int(_agirlik)
+
+# Eski mesajların arşivi (mesajlar/arsiv.py): MESAJ_ARSIV bir SQLite yolu ise arşiv
+# tablosu ayrı bir veritabanında tutulur ve `migrate --database arsiv` ile kurulur;
+# tanımlı değilse birincil veritabanındadır. Arşiv yönlendiricisi önce gelmelidir.
+MESAJ_ARSIV_VERITABANI = 'default'
+if os.environ.get('MESAJ_ARSIV'):
+    DATABASES['arsiv'] = {**DATABASES['default'], 'NAME': os.environ['MESAJ_ARSIV']}
+    MESAJ_ARSIV_VERITABANI = 'arsiv'
+# `manage.py mesaj_arsivle` bu kadar günden eski mesajları arşive taşır
+MESAJ_ARSIV_YASI = 365
+
+DATABASE_ROUTERS = ['mesajlar.arsiv.ArsivYonlendirici', 'mesajlar.replika.ReplikaYonlendirici']
+# Yazma isteğinden sonra kullanıcının birincil veritabanından okuyacağı süre (saniye)
+MESAJ_REPLIKA_YAZMA_SURESI = 10
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+#
+# Geliştirme ve testlerde yerel bellek kullanılır. Üretimde birden çok işlem
+# aynı önbelleği paylaşmalıdır, örneğin:
+#   'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+#   'LOCATION': BASE_DIR / 'cache',
+# ya da Redis uyumlu bir sunucu için:
+#   'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#   'LOCATION': 'redis://127.0.0.1:6379',
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'motivasyon',
+    }
+}
+
+MESAJ_ONBELLEK = 'default'
+MESAJ_ONBELLEK_SURESI = 300
+
+# Salt okunur sayfalar ve JSON API için asenkron görünümler kullanılsın mı?
+# ASGI altında (motivasyon/asgi.py) varsayılan olarak açıktır; WSGI altında
+# asenkron görünümler her istekte ayrı bir olay döngüsü gerektirdiğinden kapalıdır.
+MESAJ_ASYNC_GORUNUMLER = os.environ.get('MESAJ_ASYNC_GORUNUMLER', '') == '1'
+
+# İstek profili: ölçülecek isteklerin oranı (0 kapalı, 1 hepsi) ve görünüm başına
+# saklanan son örnek sayısı. Özet personel için /profil/ adresindedir.
+MESAJ_PROFIL_ORANI = float(os.environ.get('MESAJ_PROFIL_ORANI', '0'))
+MESAJ_PROFIL_TAMPON_BOYUTU = 500
+
+# Mesaj yazmalarının yan etkileri (arama indeksi, kategori/etiket sayaçları) için
+# görev kuyruğu: açıkken görevler veritabanına yazılır ve `manage.py mesaj_worker`
+# işler; kapalıyken (MESAJ_GOREV_KUYRUGU=0) işlem tamamlanınca istek içinde çalışır.
+MESAJ_GOREV_KUYRUGU = os.environ.get('MESAJ_GOREV_KUYRUGU', '1') == '1'
+
+# URL adı başına hız sınırları (kural biçimi mesajlar/hiz_siniri.py'dedir). Kovalar
+# MESAJ_ONBELLEK'te tutulur; sınırların tüm işçilerde geçerli olması için önbellek
+# paylaşılmalıdır (Redis gibi atomik incr destekleyen bir arka uç önerilir).
+# 'genel' kova boşalınca arama yalnızca başlıkta yapılır.
+MESAJ_HIZ_SINIRLARI = {
+    'mesaj_ekle': {'yontemler': ['POST'], 'ip': '10/m', 'kullanici': '10/m'},
+    'kategori_ekle': {'yontemler': ['POST'], 'ip': '10/m', 'kullanici': '10/m'},
+    'mesaj_listesi': {'parametre': 'arama', 'ip': '30/m', 'kullanici': '60/m', 'genel': '20/s'},
+    'api_mesajlar': {'parametre': 'arama', 'ip': '30/m', 'kullanici': '60/m', 'genel': '20/s'},
+    # Arşivin tam metin indeksi yoktur; arama tabloyu tarar
+    'arsiv': {'parametre': 'arama', 'ip': '10/m', 'kullanici': '20/m'},
+}
+# İstemci IP'sinin okunacağı META anahtarı; vekil arkasında ör. 'HTTP_X_FORWARDED_FOR'
+MESAJ_IP_BASLIGI = 'REMOTE_ADDR'
+
+
+# En az bu kadar kart isteyen (?boyut=) liste sayfaları sayfa önbelleğine girmez,
+# akışla gönderilir: sayfanın başı sorgudan önce, kartlar MESAJ_AKIS_PARCA_BOYUTU'luk parçalarla.
+MESAJ_AKIS_ESIGI = 30
+MESAJ_AKIS_PARCA_BOYUTU = 10
+
+# RSS/Atom/JSON beslemeleri (mesajlar/beslemeler.py): kapsam başına son
+# MESAJ_BESLEME_BOYUTU mesaj önbellekte hazır tutulur. Bağlantılar görev işçisinde
+# de üretildiği için sitenin adresi istekten değil bu ayardan alınır.
+MESAJ_SITE_ADRESI = os.environ.get('MESAJ_SITE_ADRESI', 'http://localhost:8000')
+MESAJ_BESLEME_BOYUTU = 20
+MESAJ_BESLEME_SURESI = 86400
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -120,6 +238,17 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [
     BASE_DIR / "mesajlar" / "static",
 ]
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# collectstatic dosyaları içerik özetli adlarla kopyalar, CSS'i küçültür ve .gz/.br
+# sürümlerini yazar (brotli paketi kuruluysa). DEBUG'da {% static %} özetsiz adları verir.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'mesajlar.statik.SikistirilmisManifestDepolama'},
+}
+# STATIC_ROOT'taki dosyalar uygulama tarafından sunulsun mu (mesajlar/statik.py)?
+# Önde statik dosyaları sunan bir web sunucusu varsa kapatılabilir.
+MESAJ_STATIK_SUN = not DEBUG
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -128,4 +257,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = '/giris/'
 LOGIN_REDIRECT_URL = '/'  # Giriş sonrası ana sayfaya yönlendir
-LOGOUT_REDIRECT_URL = '/'  # Çıkış sonrası ana sayfaya yönlendir
\ No newline at end of file
+LOGOUT_REDIRECT_URL = '/'  # Çıkış sonrası ana sayfaya yönlendir
+
+# Oturumlar ve flash mesajları imzalı çerezlerde tutulur; istekler django_session
+# tablosuna hiç gitmez. Oturum yalnızca içine bir şey yazıldığında (giriş) oluşturulur.
+# Çerezler SECRET_KEY ile imzalanır; anahtarın değişmesi tüm oturumları kapatır.
+SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
\ No newline at end of file